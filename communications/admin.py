@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Message, Notification
+from .models import Message, Notification, OutgoingEmail
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
@@ -12,3 +12,9 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ['user', 'type', 'title', 'is_read', 'created_at']
     list_filter = ['type', 'is_read', 'created_at']
     search_fields = ['title', 'message']
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'last_error']
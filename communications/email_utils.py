@@ -1,55 +1,48 @@
 # communications/email_utils.py
 # Système centralisé de notifications par email
 
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
-from django.conf import settings
-from django.utils import timezone
-from .models import Notification
+from .outbox import build_email, enqueue
 
 
-def send_notification_email(recipients, subject, template, context, attachments=None):
+def render_notification_email(recipients, subject, template, context, attachments=None):
     """
-    Fonction centralisée pour envoyer des emails de notification.
+    Prépare un email de notification pour la file d'envoi (sans l'enregistrer).
     
     Args:
         recipients: Liste d'emails (strings)
         subject: Objet du mail
         template: Chemin du template HTML (ex: 'emails/new_subject.html')
         context: Contexte pour le template (dict)
-        attachments: Liste de tuples (filename, content, mimetype) optionnel
+        attachments: Liste de tuples (filename, chemin dans le stockage, mimetype) optionnel
+    
+    Returns:
+        OutgoingEmail non enregistré
+    """
+    html_content = render_to_string(template, context)
+    return build_email(
+        recipients if isinstance(recipients, list) else [recipients],
+        subject,
+        html_content,
+        attachments=attachments
+    )
+
+
+def send_notification_email(recipients, subject, template, context, attachments=None):
+    """
+    Fonction centralisée pour envoyer des emails de notification.
+    
+    L'email est seulement mis en file d'envoi: la commande
+    `send_queued_emails` se charge de l'envoi SMTP, hors de la requête.
+    
+    Args:
+        voir render_notification_email
     
     Returns:
-        bool: True si envoyé avec succès
+        bool: True si mis en file avec succès
     """
     try:
-        # Rendre le template HTML
-        html_content = render_to_string(template, context)
-        
-        # Créer l'email
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=html_content,  # Fallback texte
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=recipients if isinstance(recipients, list) else [recipients]
-        )
-        email.attach_alternative(html_content, "text/html")
-        
-        # Ajouter les pièces jointes
-        if attachments:
-            for filename, content, mimetype in attachments:
-                email.attach(filename, content, mimetype)
-        
-        # Envoyer
-        email.send()
-        
-        # Enregistrer dans la base
-        Notification.objects.create(
-            recipients=recipients if isinstance(recipients, list) else [recipients],
-            subject=subject,
-            sent_at=timezone.now()
-        )
-        
+        enqueue([render_notification_email(recipients, subject, template, context, attachments)])
         return True
     
     except Exception as e:
@@ -65,8 +58,8 @@ def notify_thesis_deadline_reminder(students, deadline):
         students: QuerySet d'étudiants
         deadline: Date limite
     """
-    for student in students:
-        send_notification_email(
+    enqueue([
+        render_notification_email(
             recipients=[student.email],
             subject="Rappel : Date limite de dépôt du mémoire",
             template='emails/thesis_deadline_reminder.html',
@@ -75,27 +68,32 @@ def notify_thesis_deadline_reminder(students, deadline):
                 'deadline': deadline
             }
         )
+        for student in students
+    ])
 
 
 def distribute_thesis_to_jury(project):
     """
     Envoie le mémoire à tous les membres du jury.
     
+    Chaque membre reçoit un lien de téléchargement signé et temporaire
+    plutôt qu'une pièce jointe: le fichier n'est ni lu ni encodé à l'envoi,
+    et n'est transmis qu'aux membres qui l'ouvrent.
+    
     Args:
         project: Instance de Project
     """
+    from projects.thesis_links import thesis_download_url, thesis_link_expiry
+    
     if not project.thesis_file:
         return False
     
     defense = project.defense
-    jury_members = defense.defense_jury_members.all()
-    
-    # Préparer la pièce jointe
-    with project.thesis_file.open('rb') as f:
-        thesis_content = f.read()
+    jury_members = defense.defense_jury_members.select_related('teacher')
+    expires_at = thesis_link_expiry()
     
-    for member in jury_members:
-        send_notification_email(
+    enqueue([
+        render_notification_email(
             recipients=[member.teacher.email],
             subject=f"Mémoire à évaluer - {project.title}",
             template='emails/thesis_distribution.html',
@@ -103,12 +101,13 @@ def distribute_thesis_to_jury(project):
                 'teacher': member.teacher,
                 'project': project,
                 'defense': defense,
-                'role': member.get_role_display()
-            },
-            attachments=[
-                (f'memoire_{project.id}.pdf', thesis_content, 'application/pdf')
-            ]
+                'role': member.get_role_display(),
+                'download_url': thesis_download_url(project, member.teacher),
+                'expires_at': expires_at,
+            }
         )
+        for member in jury_members
+    ])
     
     return True
 
@@ -160,8 +159,8 @@ def notify_defense_result(defense):
     project = defense.project
     team = project.team
     
-    # Calculer la note finale
-    final_grade = defense.calculate_final_grade() if hasattr(defense, 'calculate_final_grade') else defense.final_grade
+    # Note finale maintenue à chaque note du jury
+    final_grade = defense.final_grade
     
     # Étudiants
     students_emails = [team.student1.email]
@@ -221,11 +220,11 @@ def notify_assignment(assignment):
 
 def notify_milestone_validated(milestone):
     """Notification quand un jalon est validé."""
+    from .notifications import project_students
     project = milestone.project
-    team = project.team
     
     send_notification_email(
-        recipients=[team.student1.email] + ([team.student2.email] if team.student2 else []),
+        recipients=[student.email for student in project_students(project)],
         subject=f"Jalon validé - {milestone.title}",
         template='emails/milestone_validated.html',
         context={'milestone': milestone, 'project': project}
@@ -234,11 +233,11 @@ def notify_milestone_validated(milestone):
 
 def notify_milestone_rejected(milestone):
     """Notification quand un jalon est rejeté."""
+    from .notifications import project_students
     project = milestone.project
-    team = project.team
     
     send_notification_email(
-        recipients=[team.student1.email] + ([team.student2.email] if team.student2 else []),
+        recipients=[student.email for student in project_students(project)],
         subject=f"Jalon à revoir - {milestone.title}",
         template='emails/milestone_rejected.html',
         context={'milestone': milestone, 'project': project}
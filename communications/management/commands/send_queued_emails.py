@@ -0,0 +1,52 @@
+"""
+Commande Django d'envoi des emails de la file d'envoi.
+
+Usage:
+    python manage.py send_queued_emails
+    python manage.py send_queued_emails --loop --interval 30
+
+Chaque lot est envoyé sur une seule connexion SMTP. En cas d'échec, l'email
+est retenté plus tard (délai doublé à chaque tentative) puis marqué en
+échec après --max-attempts tentatives. Sans --loop, la file est vidée puis
+la commande s'arrête (adapté à une tâche planifiée).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from communications.outbox import MAX_ATTEMPTS, send_batch
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails en attente dans la file d'envoi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Nombre d'emails par connexion SMTP")
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help='Tentatives avant abandon')
+        parser.add_argument('--loop', action='store_true', help='Surveiller la file en continu')
+        parser.add_argument('--interval', type=int, default=30, help='Pause entre deux passages (secondes, avec --loop)')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                totals = self._drain(options['batch_size'], options['max_attempts'])
+                if any(totals.values()):
+                    self.stdout.write(
+                        f"📧 Envoyés: {totals['sent']}  |  À retenter: {totals['retried']}  |  "
+                        f"Échecs définitifs: {totals['failed']}"
+                    )
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⏹️  Arrêt du worker'))
+
+    def _drain(self, batch_size, max_attempts):
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            stats = send_batch(batch_size=batch_size, max_attempts=max_attempts)
+            for key, value in stats.items():
+                totals[key] += value
+            if sum(stats.values()) < batch_size:
+                return totals
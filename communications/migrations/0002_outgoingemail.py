@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:29
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipients', models.JSONField(default=list, verbose_name='destinataires')),
+                ('subject', models.CharField(max_length=255, verbose_name='objet')),
+                ('body', models.TextField(verbose_name='contenu texte')),
+                ('html_body', models.TextField(blank=True, verbose_name='contenu HTML')),
+                ('attachments', models.JSONField(blank=True, default=list, verbose_name='pièces jointes')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('sending', "En cours d'envoi"), ('sent', 'Envoyé'), ('failed', 'Échec')], default='pending', max_length=10, verbose_name='statut')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='tentatives')),
+                ('last_error', models.TextField(blank=True, verbose_name='dernière erreur')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='prochaine tentative')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='envoyé le')),
+            ],
+            options={
+                'verbose_name': 'email en attente',
+                'verbose_name_plural': "file d'envoi des emails",
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='communicati_status_e487d3_idx')],
+            },
+        ),
+    ]
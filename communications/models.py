@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
 from users.models import User
 from projects.models import Project
 
@@ -57,3 +58,47 @@ class Notification(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
+
+
+class OutgoingEmail(models.Model):
+    """
+    Email en attente d'envoi (file d'envoi).
+
+    Les vues et signaux ne font qu'enregistrer l'email; la commande
+    `send_queued_emails` les envoie par lots sur une connexion SMTP unique,
+    avec nouvelles tentatives espacées en cas d'échec.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('sending', 'En cours d\'envoi'),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    ]
+    
+    recipients = models.JSONField(_('destinataires'), default=list)
+    subject = models.CharField(_('objet'), max_length=255)
+    body = models.TextField(_('contenu texte'))
+    html_body = models.TextField(_('contenu HTML'), blank=True)
+    # Pièces jointes: [[nom, chemin dans le stockage des médias, type MIME], ...]
+    attachments = models.JSONField(_('pièces jointes'), default=list, blank=True)
+    
+    status = models.CharField(_('statut'), max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(_('tentatives'), default=0)
+    last_error = models.TextField(_('dernière erreur'), blank=True)
+    # Prochaine tentative (ou fin du verrou d'un envoi en cours)
+    next_attempt_at = models.DateTimeField(_('prochaine tentative'), default=timezone.now)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(_('envoyé le'), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('email en attente')
+        verbose_name_plural = _('file d\'envoi des emails')
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
@@ -0,0 +1,73 @@
+# communications/notifications.py
+# Envoi groupé des notifications: une seule requête INSERT par événement
+
+from django.db import transaction
+
+from .models import Notification
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+def build_notifications(users, type, title, message, link=''):
+    """
+    Prépare (sans les enregistrer) des notifications identiques pour
+    plusieurs destinataires.
+
+    Args:
+        users: utilisateurs ou identifiants (les doublons et None sont ignorés)
+    """
+    notifications = []
+    seen = set()
+    for user in users:
+        user_id = _user_id(user)
+        if user_id is None or user_id in seen:
+            continue
+        seen.add(user_id)
+        notifications.append(Notification(
+            user_id=user_id, type=type, title=title, message=message, link=link
+        ))
+    return notifications
+
+
+def dispatch(notifications):
+    """
+    Enregistre des notifications en une seule requête (bulk_create) dans une
+    transaction.
+
+    bulk_create n'émet pas de signal post_save: les compteurs des tableaux de
+    bord des destinataires sont invalidés ici.
+
+    Returns:
+        list: notifications créées
+    """
+    from users.statistics import invalidate_user_dashboard_statistics
+
+    notifications = [notification for notification in notifications if notification.user_id]
+    if not notifications:
+        return []
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(notifications)
+    invalidate_user_dashboard_statistics(*(notification.user_id for notification in notifications))
+    return created
+
+
+def notify(users, type, title, message, link=''):
+    """
+    Envoie la même notification à plusieurs destinataires en une requête.
+
+    Exemple:
+        notify(defense.jury_members.values_list('user_id', flat=True),
+               'defense', 'Soutenance annulée', message, link='/defenses/')
+    """
+    return dispatch(build_notifications(users, type, title, message, link))
+
+
+def project_students(project):
+    """Étudiants d'un projet: l'étudiant affecté et, pour un binôme, son partenaire."""
+    students = [project.assignment.student]
+    team = getattr(project, 'team', None)
+    if team is not None and team.student2_id:
+        students.append(team.student2)
+    return students
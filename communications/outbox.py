@@ -0,0 +1,150 @@
+# communications/outbox.py
+# File d'envoi des emails: mise en file par les vues, envoi par un worker
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+# Nombre maximal de tentatives avant abandon
+MAX_ATTEMPTS = 5
+
+# Délai avant la première nouvelle tentative (doublé à chaque échec, plafonné)
+RETRY_DELAY = timedelta(minutes=1)
+MAX_RETRY_DELAY = timedelta(hours=2)
+
+# Durée du verrou posé sur un email en cours d'envoi: passé ce délai
+# (worker interrompu), l'email est repris par le worker suivant
+SENDING_LEASE = timedelta(minutes=10)
+
+
+def build_email(recipients, subject, html_body, body=None, attachments=None):
+    """
+    Prépare (sans l'enregistrer) un email de la file d'envoi.
+
+    Args:
+        recipients: adresse ou liste d'adresses (les adresses vides sont ignorées)
+        attachments: liste de tuples (nom, chemin dans le stockage, type MIME)
+    """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    return OutgoingEmail(
+        recipients=[address for address in recipients if address],
+        subject=subject,
+        body=body if body is not None else html_body,
+        html_body=html_body,
+        attachments=[list(attachment) for attachment in attachments or []],
+    )
+
+
+def enqueue(emails):
+    """
+    Enregistre des emails dans la file d'envoi en une seule requête.
+
+    Returns:
+        int: nombre d'emails mis en file
+    """
+    emails = [email for email in emails if email.recipients]
+    OutgoingEmail.objects.bulk_create(emails)
+    return len(emails)
+
+
+def retry_delay(attempts):
+    """Délai avant la tentative suivante: 1, 2, 4, 8... minutes (plafonné)."""
+    return min(RETRY_DELAY * (2 ** max(attempts - 1, 0)), MAX_RETRY_DELAY)
+
+
+def claim_batch(batch_size):
+    """
+    Réserve un lot d'emails à envoyer: en attente et échus, ou en cours
+    d'envoi depuis plus longtemps que SENDING_LEASE.
+
+    La réservation (passage à 'sending') est conditionnelle, ce qui évite
+    qu'un même email soit pris par deux workers.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(OutgoingEmail.objects.filter(
+            Q(status='pending') | Q(status='sending'),
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at').values_list('pk', flat=True)[:batch_size])
+        OutgoingEmail.objects.filter(
+            pk__in=ids, status__in=['pending', 'sending'], next_attempt_at__lte=now
+        ).update(status='sending', next_attempt_at=now + SENDING_LEASE)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=ids, status='sending', next_attempt_at=now + SENDING_LEASE
+    ))
+
+
+def _to_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    for filename, path, mimetype in email.attachments:
+        with default_storage.open(path, 'rb') as attachment:
+            message.attach(filename, attachment.read(), mimetype)
+    return message
+
+
+def _record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_batch(batch_size=50, max_attempts=MAX_ATTEMPTS):
+    """
+    Envoie un lot d'emails de la file sur une seule connexion SMTP.
+
+    Returns:
+        dict: {'sent': n, 'retried': n, 'failed': n}
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    emails = claim_batch(batch_size)
+    if not emails:
+        return stats
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Serveur injoignable: tout le lot sera retenté plus tard
+        for email in emails:
+            _record_failure(email, e, max_attempts)
+            stats['failed' if email.status == 'failed' else 'retried'] += 1
+        return stats
+
+    sent_ids = []
+    try:
+        for email in emails:
+            try:
+                _to_message(email, connection).send()
+            except Exception as e:
+                _record_failure(email, e, max_attempts)
+                stats['failed' if email.status == 'failed' else 'retried'] += 1
+            else:
+                sent_ids.append(email.pk)
+    finally:
+        connection.close()
+        OutgoingEmail.objects.filter(pk__in=sent_ids).update(
+            status='sent', sent_at=timezone.now(), last_error=''
+        )
+    stats['sent'] = len(sent_ids)
+    return stats
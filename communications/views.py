@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.db.models import Q
 from .models import Message, Notification
 from .forms import MessageForm, ReplyForm
+from users.statistics import invalidate_user_dashboard_statistics
 
 @login_required
 def inbox_view(request):
@@ -18,6 +19,8 @@ def inbox_view(request):
         type='message',
         is_read=False
     ).update(is_read=True)
+    # update() ne déclenche pas les signaux
+    invalidate_user_dashboard_statistics(request.user.pk)
     
     context = {
         'messages': received_messages,
@@ -169,5 +172,6 @@ def mark_notification_read_view(request, pk):
 def mark_all_notifications_read_view(request):
     """Marquer toutes les notifications comme lues"""
     Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    invalidate_user_dashboard_statistics(request.user.pk)
     messages.success(request, "Toutes les notifications ont été marquées comme lues.")
     return redirect('communications:notifications')
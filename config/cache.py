@@ -0,0 +1,62 @@
+"""
+Invalidation des caches par numéro de version.
+
+Les entrées mises en cache incluent dans leur clé la version courante d'un
+espace de noms; incrémenter cette version rend obsolètes toutes ses entrées
+d'un coup (elles expirent ensuite d'elles-mêmes), sans connaître leurs clés.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _new_version():
+    # Version jamais utilisée, même si la clé a été évincée du cache
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """Version courante d'un espace de noms."""
+    return get_versions(namespace)[0]
+
+
+def get_versions(*namespaces):
+    """
+    Versions courantes de plusieurs espaces de noms, lues ensemble
+    (un seul get_many: une requête avec DatabaseCache).
+
+    Returns:
+        list: versions, dans l'ordre des espaces de noms
+    """
+    keys = [f'{namespace}:version' for namespace in namespaces]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(namespace):
+    """Invalide toutes les entrées d'un espace de noms."""
+    try:
+        cache.incr(f'{namespace}:version')
+    except ValueError:
+        cache.set(f'{namespace}:version', _new_version(), None)
+
+
+def cached(namespace, key, compute, timeout, depends_on=()):
+    """
+    Retourne la valeur en cache pour `key`, ou la calcule avec `compute()`
+    et la met en cache pour `timeout` secondes.
+
+    `depends_on`: autres espaces de noms dont la valeur dépend aussi (leur
+    version entre dans la clé). Toutes les versions sont lues en un get_many.
+    """
+    versions = '.'.join(str(version) for version in get_versions(namespace, *depends_on))
+    full_key = f'{namespace}:{versions}:{key}'
+    value = cache.get(full_key)
+    if value is None:
+        value = compute()
+        cache.set(full_key, value, timeout)
+    return value
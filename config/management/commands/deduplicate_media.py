@@ -0,0 +1,124 @@
+"""
+Commande Django de déduplication des fichiers envoyés (MEDIA_ROOT).
+
+Usage:
+    python manage.py deduplicate_media
+    python manage.py deduplicate_media --dry-run
+    python manage.py deduplicate_media --verify
+
+Rattache chaque fichier existant au blob de son contenu (config/storage.py):
+les copies identiques sont remplacées par des liens physiques vers un seul
+exemplaire, puis les blobs qui ne sont plus référencés sont supprimés.
+La commande peut être relancée: les fichiers déjà rattachés sont ignorés.
+
+--dry-run calcule seulement la place récupérable.
+--verify relit chaque blob une fois pour contrôler son empreinte et vérifie,
+par inode, que chaque fichier est bien rattaché à un blob.
+"""
+
+import os
+import time as _time
+
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from config.storage import ContentAddressedStorage, path_digest
+
+
+def _size(count):
+    for unit in ('o', 'Ko', 'Mo', 'Go'):
+        if count < 1024 or unit == 'Go':
+            return f'{count:.0f} {unit}' if unit == 'o' else f'{count:.1f} {unit}'
+        count /= 1024
+
+
+class Command(BaseCommand):
+    help = 'Déduplique les fichiers envoyés par contenu (liens vers un blob unique)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Mesurer la place récupérable sans rien modifier')
+        parser.add_argument('--verify', action='store_true', help="Contrôler l'intégrité des blobs et des fichiers")
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError(
+                "Le stockage par défaut n'est pas config.storage.ContentAddressedStorage (voir STORAGES)."
+            )
+        if not os.path.isdir(storage.location):
+            raise CommandError(f"Répertoire des médias introuvable : {storage.location}")
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   🗂️  Déduplication des fichiers envoyés'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if options['verify']:
+            self._verify(storage)
+        else:
+            self._deduplicate(storage, options['dry_run'])
+
+    def _deduplicate(self, storage, dry_run):
+        started = _time.perf_counter()
+        files = 0
+        scanned = 0
+        freed = 0
+        contents = set()
+        for name in storage.media_files():
+            if dry_run:
+                digest, size = path_digest(storage.path(name))
+                blob = storage.blob_path(digest)
+                duplicate = digest in contents or (
+                    os.path.exists(blob) and not os.path.samefile(blob, storage.path(name))
+                )
+                saved = size if duplicate else 0
+            else:
+                digest, saved = storage.deduplicate(name)
+            files += 1
+            scanned += storage.size(name)
+            freed += saved
+            contents.add(digest)
+        orphans = storage.collect_garbage(dry_run=dry_run)
+        elapsed = _time.perf_counter() - started
+
+        self.stdout.write(f'\n📊 Fichiers : {files}  |  Contenus distincts : {len(contents)}')
+        self.stdout.write(f'   Volume analysé : {_size(scanned)}')
+        self.stdout.write(f'   Doublons {"récupérables" if dry_run else "libérés"} : {_size(freed)}')
+        self.stdout.write(f'   Blobs orphelins {"à supprimer" if dry_run else "supprimés"} : {_size(orphans)}')
+        self.stdout.write(
+            f'   Durée : {elapsed:.2f} s ({_size(scanned / elapsed if elapsed else 0)}/s)\n'
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING('ℹ️  Aperçu uniquement: relancez sans --dry-run pour dédupliquer.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Médias dédupliqués'))
+
+    def _verify(self, storage):
+        started = _time.perf_counter()
+
+        # Chaque blob est relu une seule fois, quel que soit son nombre de références
+        blobs = storage.blobs()
+        corrupted = [digest for digest, path in blobs.items() if path_digest(path)[0] != digest]
+
+        inodes = storage.blob_inodes()
+        detached = []
+        for name in storage.media_files():
+            stat = os.stat(storage.path(name))
+            if (stat.st_dev, stat.st_ino) not in inodes:
+                detached.append(name)
+        elapsed = _time.perf_counter() - started
+
+        self.stdout.write(f'\n📊 Blobs contrôlés : {len(blobs)}  |  Durée : {elapsed:.2f} s')
+        for digest in corrupted:
+            self.stdout.write(self.style.ERROR(
+                f'   ❌ Blob corrompu : {digest} ({storage.references(digest)} fichier(s) concerné(s))'
+            ))
+        if detached:
+            self.stdout.write(self.style.WARNING(
+                f'   ⚠️  {len(detached)} fichier(s) non rattaché(s) à un blob '
+                f'(copies ou fichiers antérieurs: lancer deduplicate_media)'
+            ))
+            for name in detached[:20]:
+                self.stdout.write(f'      {name}')
+        if corrupted:
+            raise CommandError(f'{len(corrupted)} blob(s) corrompu(s)')
+        self.stdout.write(self.style.SUCCESS('✅ Intégrité vérifiée'))
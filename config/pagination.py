@@ -0,0 +1,88 @@
+"""
+Pagination par curseur (keyset) sur un champ date et la clé primaire.
+
+Contrairement à OFFSET/LIMIT, chaque page est lue directement depuis l'index
+(champ, id): le coût ne dépend pas du numéro de page et aucun COUNT n'est
+nécessaire pour naviguer.
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(value, pk):
+    """Curseur opaque d'une ligne: '<date ISO>_<id>'."""
+    return f"{value.isoformat()}_{pk}"
+
+
+def decode_cursor(cursor):
+    """Décode un curseur; retourne None s'il est absent ou invalide."""
+    if not cursor:
+        return None
+    value, _, pk = cursor.rpartition('_')
+    try:
+        value = parse_datetime(value)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+class KeysetPage:
+    """Page de résultats avec les curseurs des pages voisines."""
+
+    def __init__(self, items, field, has_next, has_previous):
+        self.items = items
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = encode_cursor(getattr(items[-1], field), items[-1].pk) if has_next else None
+        self.previous_cursor = encode_cursor(getattr(items[0], field), items[0].pk) if has_previous else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def keyset_paginate(queryset, after=None, before=None, field='created_at', per_page=DEFAULT_PAGE_SIZE):
+    """
+    Pagine un QuerySet par ordre décroissant de (field, id).
+
+    Args:
+        queryset: QuerySet à paginer (son tri est remplacé)
+        after: curseur de la dernière ligne de la page précédente (page suivante)
+        before: curseur de la première ligne de la page suivante (page précédente)
+        field: champ date servant de clé de tri
+        per_page: nombre de lignes par page
+
+    Returns:
+        KeysetPage
+    """
+    after = decode_cursor(after)
+    before = decode_cursor(before)
+
+    if before:
+        value, pk = before
+        rows = list(queryset.filter(
+            Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pk__gt': pk})
+        ).order_by(field, 'pk')[:per_page + 1])
+        has_previous = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        return KeysetPage(items, field, has_next=bool(items), has_previous=has_previous)
+
+    if after:
+        value, pk = after
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk})
+        )
+    rows = list(queryset.order_by(f'-{field}', '-pk')[:per_page + 1])
+    items = rows[:per_page]
+    return KeysetPage(
+        items, field,
+        has_next=len(rows) > per_page,
+        has_previous=bool(after and items),
+    )
@@ -99,6 +99,17 @@ DATABASES = {
     }
 }
 
+# Cache en mémoire du processus (développement: un seul processus). Les
+# compteurs des tableaux de bord, la grille des salles et le catalogue des
+# sujets y sont invalidés par numéro de version (config/cache.py), ce qui
+# suppose que tous les workers lisent le même cache: la production utilise
+# un cache partagé (voir settings_production.py).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -142,6 +153,12 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Fichiers envoyés stockés une seule fois par contenu (config/storage.py)
+STORAGES = {
+    'default': {'BACKEND': 'config.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -180,3 +197,9 @@ EMAIL_SUBJECT_PREFIX = '[GradEase] '
 
 # Password Reset Settings
 PASSWORD_RESET_TIMEOUT = 3600  # 1 heure en secondes
+
+# Adresse publique du site (liens absolus dans les emails)
+SITE_URL = os.getenv('SITE_URL', 'http://127.0.0.1:8000')
+
+# Validité des liens de téléchargement du mémoire envoyés au jury (secondes)
+THESIS_LINK_MAX_AGE = 60 * 60 * 24 * 30  # 30 jours
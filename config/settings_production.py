@@ -65,6 +65,9 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
 
+# Adresse publique du site (liens absolus dans les emails)
+SITE_URL = os.environ.get('SITE_URL', 'https://ac7.pythonanywhere.com')
+
 # Sécurité HTTPS
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
@@ -114,7 +117,16 @@ LOGGING = {
     },
 }
 
-# Cache avec Redis (optionnel, nécessite compte payant sur PythonAnywhere)
+# Cache partagé par tous les workers (invalidation par version, config/cache.py).
+# La table se crée avec: python manage.py createcachetable --settings=config.settings_production
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
+# Alternative: Redis (optionnel, nécessite compte payant sur PythonAnywhere)
 # CACHES = {
 #     'default': {
 #         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
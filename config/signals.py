@@ -1,14 +1,21 @@
 """
 Signaux Django pour automatiser les interactions entre rôles
 """
-from django.db.models.signals import post_save, pre_save, pre_delete
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
-from subjects.models import Application, Assignment
+from subjects.models import Subject, Application, Assignment, StudentProposal
 from projects.models import Project, Milestone, Deliverable
-from defenses.models import Defense, DefenseChangeRequest, JuryMember
+from defenses.models import Defense, DefenseChangeRequest, DefenseJury, JuryMember, Room
 from communications.models import Notification, Message
+from communications.notifications import build_notifications, dispatch, notify, project_students
+from users.models import User
+from users.statistics import invalidate_dashboard_statistics, invalidate_user_dashboard_statistics
+from subjects.catalogue import invalidate_subject_list
+from defenses.grading import refresh_grading_state
+from defenses.room_grid import invalidate_all_room_grids, invalidate_project_room_grids, invalidate_room_grid
 
 
 @receiver(post_save, sender=Application)
@@ -16,8 +23,8 @@ def handle_application_notification(sender, instance, created, **kwargs):
     """Notifier l'encadreur quand un étudiant candidate"""
     if created:
         # Notification à l'encadreur
-        Notification.objects.create(
-            user=instance.subject.supervisor,
+        notify(
+            [instance.subject.supervisor],
             type='application',
             title='Nouvelle candidature',
             message=f"{instance.student.get_full_name()} a candidaté au sujet '{instance.subject.title}'.",
@@ -37,8 +44,8 @@ def handle_application_review_notification(sender, instance, created, **kwargs):
             message = f"Votre candidature au sujet '{instance.subject.title}' a été rejetée."
             notif_type = 'application_status'
         
-        Notification.objects.create(
-            user=instance.student,
+        notify(
+            [instance.student],
             type=notif_type,
             title='Réponse à votre candidature',
             message=message,
@@ -50,22 +57,21 @@ def handle_application_review_notification(sender, instance, created, **kwargs):
 def handle_assignment_creation(sender, instance, created, **kwargs):
     """Actions automatiques après affectation d'un sujet"""
     if created:
-        # 1. Notification à l'étudiant
-        Notification.objects.create(
-            user=instance.student,
-            type='project',
-            title='Sujet affecté!',
-            message=f"Le sujet '{instance.subject.title}' vous a été affecté. Vous pouvez maintenant créer votre projet.",
-            link=f"/subjects/{instance.subject.pk}/"
-        )
-        
-        # 2. Notification à l'encadreur
-        Notification.objects.create(
-            user=instance.subject.supervisor,
-            type='project',
-            title='Nouveau projet à encadrer',
-            message=f"L'étudiant {instance.student.get_full_name()} vous a été affecté pour le sujet '{instance.subject.title}'.",
-            link=f"/subjects/{instance.subject.pk}/"
+        # 1. Notifications à l'étudiant et à l'encadreur (une seule requête)
+        dispatch(
+            build_notifications(
+                [instance.student],
+                type='project',
+                title='Sujet affecté!',
+                message=f"Le sujet '{instance.subject.title}' vous a été affecté. Vous pouvez maintenant créer votre projet.",
+                link=f"/subjects/{instance.subject.pk}/"
+            ) + build_notifications(
+                [instance.subject.supervisor],
+                type='project',
+                title='Nouveau projet à encadrer',
+                message=f"L'étudiant {instance.student.get_full_name()} vous a été affecté pour le sujet '{instance.subject.title}'.",
+                link=f"/subjects/{instance.subject.pk}/"
+            )
         )
         
         # 3. Créer automatiquement le projet avec statut "awaiting_kickoff"
@@ -86,14 +92,13 @@ def handle_student_proposal(sender, instance, created, **kwargs):
     
     if created:
         # Notifier les encadreurs choisis
-        for supervisor in instance.get_preferred_supervisors():
-            Notification.objects.create(
-                user=supervisor,
-                type='proposal',
-                title='Nouvelle proposition d\'étudiant',
-                message=f"{instance.student.get_full_name()} vous propose d'encadrer son projet: {instance.title}",
-                link=f"/subjects/proposals/"
-            )
+        notify(
+            instance.get_preferred_supervisors(),
+            type='proposal',
+            title='Nouvelle proposition d\'étudiant',
+            message=f"{instance.student.get_full_name()} vous propose d'encadrer son projet: {instance.title}",
+            link=f"/subjects/proposals/"
+        )
     
     elif instance.status == 'accepted' and instance.accepted_by:
         # Créer un sujet basé sur la proposition
@@ -117,8 +122,8 @@ def handle_student_proposal(sender, instance, created, **kwargs):
         )
         
         # Notifier l'étudiant
-        Notification.objects.create(
-            user=instance.student,
+        notify(
+            [instance.student],
             type='proposal',
             title='Proposition acceptée!',
             message=f"Votre proposition '{instance.title}' a été acceptée par {instance.accepted_by.get_full_name()}. Votre projet a été créé.",
@@ -130,8 +135,8 @@ def handle_student_proposal(sender, instance, created, **kwargs):
 def handle_milestone_notification(sender, instance, created, **kwargs):
     """Notifier l'encadreur quand un jalon est ajouté/modifié"""
     if created:
-        Notification.objects.create(
-            user=instance.project.assignment.subject.supervisor,
+        notify(
+            [instance.project.assignment.subject.supervisor],
             type='milestone',
             title='Nouveau jalon ajouté',
             message=f"{instance.project.assignment.student.get_full_name()} a ajouté un jalon: {instance.title}",
@@ -143,8 +148,8 @@ def handle_milestone_notification(sender, instance, created, **kwargs):
 def handle_deliverable_notification(sender, instance, created, **kwargs):
     """Notifier l'encadreur quand un livrable est déposé"""
     if created:
-        Notification.objects.create(
-            user=instance.project.assignment.subject.supervisor,
+        notify(
+            [instance.project.assignment.subject.supervisor],
             type='deliverable',
             title='Nouveau livrable',
             message=f"{instance.project.assignment.student.get_full_name()} a déposé: {instance.title}",
@@ -156,22 +161,21 @@ def handle_deliverable_notification(sender, instance, created, **kwargs):
 def handle_defense_notification(sender, instance, created, **kwargs):
     """Notifier toutes les parties concernées lors de la planification d'une soutenance"""
     if created:
-        # Notification à l'étudiant
-        Notification.objects.create(
-            user=instance.project.assignment.student,
-            type='defense',
-            title='Soutenance planifiée',
-            message=f"Votre soutenance a été planifiée le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')} en salle {instance.room}.",
-            link=f"/defenses/{instance.pk}/"
-        )
-        
-        # Notification à l'encadreur
-        Notification.objects.create(
-            user=instance.project.assignment.subject.supervisor,
-            type='defense',
-            title='Soutenance planifiée',
-            message=f"Soutenance de {instance.project.assignment.student.get_full_name()} planifiée le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')}.",
-            link=f"/defenses/{instance.pk}/"
+        # Notifications aux étudiants (binôme compris) et à l'encadreur
+        dispatch(
+            build_notifications(
+                project_students(instance.project),
+                type='defense',
+                title='Soutenance planifiée',
+                message=f"Votre soutenance a été planifiée le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')} en salle {instance.room}.",
+                link=f"/defenses/{instance.pk}/"
+            ) + build_notifications(
+                [instance.project.assignment.subject.supervisor],
+                type='defense',
+                title='Soutenance planifiée',
+                message=f"Soutenance de {instance.project.assignment.student.get_full_name()} planifiée le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')}.",
+                link=f"/defenses/{instance.pk}/"
+            )
         )
 
 
@@ -179,8 +183,8 @@ def handle_defense_notification(sender, instance, created, **kwargs):
 def handle_jury_member_notification(sender, instance, created, **kwargs):
     """Notifier les membres du jury quand ils sont ajoutés"""
     if created:
-        Notification.objects.create(
-            user=instance.user,
+        notify(
+            [instance.user],
             type='defense',
             title='Invitation au jury',
             message=f"Vous avez été désigné comme {instance.get_role_display()} pour la soutenance de {instance.defense.project.assignment.student.get_full_name()} le {instance.defense.date.strftime('%d/%m/%Y')}.",
@@ -192,17 +196,19 @@ def handle_jury_member_notification(sender, instance, created, **kwargs):
 def handle_defense_change_request_notification(sender, instance, created, **kwargs):
     """Notifier l'admin des demandes de modification"""
     if created:
-        # Notifier tous les admins
-        from users.models import User
-        admins = User.objects.filter(role='admin')
-        for admin in admins:
-            Notification.objects.create(
-                user=admin,
-                type='defense',
-                title='Demande de modification de soutenance',
-                message=f"{instance.requested_by.get_full_name()} demande une modification pour la soutenance du {instance.defense.date.strftime('%d/%m/%Y')}.",
-                link=f"/defenses/change-requests/{instance.pk}/review/"
-            )
+        # Notifier tous les admins concernés (admins généraux et admins de la filière)
+        filiere = instance.defense.project.assignment.subject.filiere
+        admins = User.objects.filter(
+            Q(role='admin_general') | Q(role='admin_filiere', filiere_admin=filiere),
+            is_active=True
+        ).values_list('pk', flat=True)
+        notify(
+            admins,
+            type='defense',
+            title='Demande de modification de soutenance',
+            message=f"{instance.requested_by.get_full_name()} demande une modification pour la soutenance du {instance.defense.date.strftime('%d/%m/%Y')}.",
+            link=f"/defenses/change-requests/{instance.pk}/review/"
+        )
     
     # Notifier le demandeur du résultat
     elif instance.status in ['approved', 'rejected']:
@@ -211,8 +217,8 @@ def handle_defense_change_request_notification(sender, instance, created, **kwar
         else:
             message = f"Votre demande de modification a été rejetée. Raison: {instance.review_comment}"
         
-        Notification.objects.create(
-            user=instance.requested_by,
+        notifications = build_notifications(
+            [instance.requested_by],
             type='defense',
             title='Réponse à votre demande',
             message=message,
@@ -221,34 +227,38 @@ def handle_defense_change_request_notification(sender, instance, created, **kwar
         
         # Si approuvé, notifier toutes les parties
         if instance.status == 'approved':
-            # Notifier l'étudiant
-            Notification.objects.create(
-                user=instance.defense.project.assignment.student,
+            defense = instance.defense
+            supervisor = defense.project.assignment.subject.supervisor
+            
+            # Notifier les étudiants (binôme compris)
+            notifications += build_notifications(
+                project_students(defense.project),
                 type='defense',
                 title='Modification de soutenance',
-                message=f"Votre soutenance a été reprogrammée au {instance.defense.date.strftime('%d/%m/%Y')} à {instance.defense.time.strftime('%H:%M')}.",
-                link=f"/defenses/{instance.defense.pk}/"
+                message=f"Votre soutenance a été reprogrammée au {defense.date.strftime('%d/%m/%Y')} à {defense.time.strftime('%H:%M')}.",
+                link=f"/defenses/{defense.pk}/"
             )
             
             # Notifier l'encadreur si ce n'est pas lui qui a demandé
-            if instance.requested_by != instance.defense.project.assignment.subject.supervisor:
-                Notification.objects.create(
-                    user=instance.defense.project.assignment.subject.supervisor,
+            if instance.requested_by != supervisor:
+                notifications += build_notifications(
+                    [supervisor],
                     type='defense',
                     title='Modification de soutenance',
-                    message=f"La soutenance de {instance.defense.project.assignment.student.get_full_name()} a été reprogrammée au {instance.defense.date.strftime('%d/%m/%Y')}.",
-                    link=f"/defenses/{instance.defense.pk}/"
+                    message=f"La soutenance de {defense.project.assignment.student.get_full_name()} a été reprogrammée au {defense.date.strftime('%d/%m/%Y')}.",
+                    link=f"/defenses/{defense.pk}/"
                 )
             
             # Notifier les membres du jury
-            for jury_member in instance.defense.jury_members.all():
-                Notification.objects.create(
-                    user=jury_member.user,
-                    type='defense',
-                    title='Modification de soutenance',
-                    message=f"La soutenance a été reprogrammée au {instance.defense.date.strftime('%d/%m/%Y')} à {instance.defense.time.strftime('%H:%M')}.",
-                    link=f"/defenses/{instance.defense.pk}/"
-                )
+            notifications += build_notifications(
+                defense.jury_members.values_list('user_id', flat=True),
+                type='defense',
+                title='Modification de soutenance',
+                message=f"La soutenance a été reprogrammée au {defense.date.strftime('%d/%m/%Y')} à {defense.time.strftime('%H:%M')}.",
+                link=f"/defenses/{defense.pk}/"
+            )
+        
+        dispatch(notifications)
 
 
 @receiver(post_save, sender=Deliverable)
@@ -264,8 +274,8 @@ def handle_deliverable_review_notification(sender, instance, created, **kwargs):
             if instance.review_comments:
                 message += f"\nRaison: {instance.review_comments}"
         
-        Notification.objects.create(
-            user=instance.submitted_by,
+        notify(
+            [instance.submitted_by],
             type='deliverable',
             title='Évaluation de livrable',
             message=message,
@@ -277,8 +287,8 @@ def handle_deliverable_review_notification(sender, instance, created, **kwargs):
 def handle_milestone_status_change_notification(sender, instance, created, **kwargs):
     """Notifier l'encadreur quand un jalon change de statut"""
     if not created and instance.status == 'completed':
-        Notification.objects.create(
-            user=instance.project.assignment.subject.supervisor,
+        notify(
+            [instance.project.assignment.subject.supervisor],
             type='milestone',
             title='Jalon complété',
             message=f"{instance.project.assignment.student.get_full_name()} a marqué le jalon '{instance.title}' comme complété.",
@@ -292,8 +302,8 @@ def handle_project_status_change_notification(sender, instance, created, **kwarg
     if not created and instance.status in ['submitted', 'under_review', 'approved', 'rejected', 'completed']:
         # Notifier l'encadreur sauf si c'est lui qui a changé le statut
         if instance.status == 'submitted':
-            Notification.objects.create(
-                user=instance.assignment.subject.supervisor,
+            notify(
+                [instance.assignment.subject.supervisor],
                 type='project',
                 title='Projet soumis',
                 message=f"{instance.assignment.student.get_full_name()} a soumis le projet '{instance.title}' pour révision.",
@@ -312,8 +322,8 @@ def handle_project_status_change_notification(sender, instance, created, **kwarg
             if instance.supervisor_notes:
                 message += f"\nNote de l'encadreur: {instance.supervisor_notes}"
             
-            Notification.objects.create(
-                user=instance.assignment.student,
+            notify(
+                project_students(instance),
                 type='project',
                 title='Mise à jour du projet',
                 message=message,
@@ -324,8 +334,8 @@ def handle_project_status_change_notification(sender, instance, created, **kwarg
 @receiver(pre_delete, sender=JuryMember)
 def handle_jury_member_removal_notification(sender, instance, **kwargs):
     """Notifier un membre du jury quand il est retiré d'une soutenance"""
-    Notification.objects.create(
-        user=instance.user,
+    notify(
+        [instance.user],
         type='defense',
         title='Retrait du jury',
         message=f"Vous avez été retiré du jury de la soutenance de {instance.defense.project.assignment.student.get_full_name()} prévue le {instance.defense.date.strftime('%d/%m/%Y')}.",
@@ -337,8 +347,8 @@ def handle_jury_member_removal_notification(sender, instance, **kwargs):
 def handle_new_message_notification(sender, instance, created, **kwargs):
     """Notifier le destinataire quand il reçoit un nouveau message"""
     if created:
-        Notification.objects.create(
-            user=instance.recipient,
+        notify(
+            [instance.recipient],
             type='message',
             title='Nouveau message',
             message=f"{instance.sender.get_full_name()} vous a envoyé un message: \"{instance.subject}\"",
@@ -349,52 +359,130 @@ def handle_new_message_notification(sender, instance, created, **kwargs):
 @receiver(pre_delete, sender=Assignment)
 def handle_assignment_cancellation_notification(sender, instance, **kwargs):
     """Notifier l'étudiant et l'encadreur en cas d'annulation d'affectation"""
-    # Notifier l'étudiant
-    Notification.objects.create(
-        user=instance.student,
-        type='project',
-        title='Affectation annulée',
-        message=f"Votre affectation au sujet '{instance.subject.title}' a été annulée.",
-        link=f"/subjects/"
-    )
-    
-    # Notifier l'encadreur
-    Notification.objects.create(
-        user=instance.subject.supervisor,
-        type='project',
-        title='Affectation annulée',
-        message=f"L'affectation de {instance.student.get_full_name()} au sujet '{instance.subject.title}' a été annulée.",
-        link=f"/subjects/"
+    dispatch(
+        # Notifier l'étudiant
+        build_notifications(
+            [instance.student],
+            type='project',
+            title='Affectation annulée',
+            message=f"Votre affectation au sujet '{instance.subject.title}' a été annulée.",
+            link=f"/subjects/"
+        )
+        # Notifier l'encadreur
+        + build_notifications(
+            [instance.subject.supervisor],
+            type='project',
+            title='Affectation annulée',
+            message=f"L'affectation de {instance.student.get_full_name()} au sujet '{instance.subject.title}' a été annulée.",
+            link=f"/subjects/"
+        )
     )
 
 
 @receiver(pre_delete, sender=Defense)
 def handle_defense_cancellation_notification(sender, instance, **kwargs):
     """Notifier toutes les parties en cas d'annulation de soutenance"""
-    # Notifier l'étudiant
-    Notification.objects.create(
-        user=instance.project.assignment.student,
-        type='defense',
-        title='Soutenance annulée',
-        message=f"La soutenance prévue le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')} a été annulée.",
-        link=f"/defenses/"
-    )
-    
-    # Notifier l'encadreur
-    Notification.objects.create(
-        user=instance.project.assignment.subject.supervisor,
-        type='defense',
-        title='Soutenance annulée',
-        message=f"La soutenance de {instance.project.assignment.student.get_full_name()} prévue le {instance.date.strftime('%d/%m/%Y')} a été annulée.",
-        link=f"/defenses/"
-    )
-    
-    # Notifier tous les membres du jury
-    for jury_member in instance.jury_members.all():
-        Notification.objects.create(
-            user=jury_member.user,
+    dispatch(
+        # Notifier les étudiants (binôme compris)
+        build_notifications(
+            project_students(instance.project),
+            type='defense',
+            title='Soutenance annulée',
+            message=f"La soutenance prévue le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')} a été annulée.",
+            link=f"/defenses/"
+        )
+        # Notifier l'encadreur
+        + build_notifications(
+            [instance.project.assignment.subject.supervisor],
+            type='defense',
+            title='Soutenance annulée',
+            message=f"La soutenance de {instance.project.assignment.student.get_full_name()} prévue le {instance.date.strftime('%d/%m/%Y')} a été annulée.",
+            link=f"/defenses/"
+        )
+        # Notifier tous les membres du jury
+        + build_notifications(
+            instance.jury_members.values_list('user_id', flat=True),
             type='defense',
             title='Soutenance annulée',
             message=f"La soutenance prévue le {instance.date.strftime('%d/%m/%Y')} à {instance.time.strftime('%H:%M')} a été annulée.",
             link=f"/defenses/"
         )
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Application)
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=StudentProposal)
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Defense)
+def handle_dashboard_statistics_invalidation(sender, **kwargs):
+    """Invalider les compteurs des tableaux de bord après une modification"""
+    update_fields = kwargs.get('update_fields')
+    if sender is User and update_fields and set(update_fields) <= {'last_login'}:
+        # Connexion d'un utilisateur: aucun compteur ne change
+        return
+    invalidate_dashboard_statistics()
+
+
+@receiver([post_save, post_delete], sender=Message)
+@receiver([post_save, post_delete], sender=Notification)
+def handle_user_dashboard_statistics_invalidation(sender, instance, **kwargs):
+    """Invalider les compteurs personnels du destinataire d'un message ou d'une notification"""
+    if sender is Message:
+        invalidate_user_dashboard_statistics(instance.recipient_id)
+    else:
+        invalidate_user_dashboard_statistics(instance.user_id)
+
+
+@receiver(post_delete, sender=Subject)
+def handle_subject_search_unindex(sender, instance, **kwargs):
+    """Retirer un sujet supprimé de l'index de recherche plein texte"""
+    from subjects.search import unindex_subject
+    unindex_subject(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Application)
+@receiver([post_save, post_delete], sender=Assignment)
+def handle_subject_list_invalidation(sender, **kwargs):
+    """Invalider les pages du catalogue des sujets en cache"""
+    invalidate_subject_list()
+
+
+@receiver([post_save, post_delete], sender=JuryMember)
+@receiver([post_save, post_delete], sender=DefenseJury)
+def handle_defense_grading_state(sender, instance, **kwargs):
+    """Recalculer la note finale et l'état de notation de la soutenance"""
+    refresh_grading_state(instance.defense_id)
+
+
+@receiver([post_save, post_delete], sender=Defense)
+def handle_room_grid_invalidation(sender, instance, **kwargs):
+    """Invalider la grille d'occupation des salles des jours concernés"""
+    invalidate_room_grid(instance.date, getattr(instance, '_stored_date', None))
+    instance._stored_date = instance.date
+
+
+@receiver([post_save, post_delete], sender=Room)
+def handle_room_change_grid_invalidation(sender, **kwargs):
+    """Invalider toutes les grilles d'occupation après une modification de salle"""
+    invalidate_all_room_grids()
+
+
+@receiver(post_save, sender=Project)
+def handle_project_room_grid_invalidation(sender, instance, created, **kwargs):
+    """Invalider les grilles où figure le titre d'un projet modifié"""
+    if not created:
+        invalidate_project_room_grids([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def handle_student_room_grid_invalidation(sender, instance, created, update_fields=None, **kwargs):
+    """Invalider les grilles où figure le nom d'un étudiant modifié"""
+    if created or instance.role != 'student':
+        return
+    if update_fields and not set(update_fields) & {'first_name', 'last_name'}:
+        return
+    invalidate_project_room_grids(Project.objects.filter(assignment__student=instance))
@@ -0,0 +1,205 @@
+"""
+Stockage des fichiers envoyés, dédupliqué par contenu.
+
+Chaque contenu est écrit une seule fois, sous le nom de son empreinte SHA-256
+(MEDIA_ROOT/.blobs/ab/cd/<empreinte>); le fichier rangé à son chemin habituel
+(upload_to) n'est qu'un lien physique vers ce blob. Un PDF renvoyé à
+l'identique ou une pièce jointe envoyée à plusieurs destinataires ne coûte
+aucun espace disque supplémentaire, et les noms, chemins et URL des fichiers
+ne changent pas (le serveur web les sert comme avant).
+
+Le compteur de références d'un blob est tenu par le système de fichiers:
+nombre de liens moins un. Supprimer un fichier retire une référence, et le
+blob disparaît avec sa dernière référence. Le contrôle d'intégrité relit
+chaque blob une seule fois (et non chaque copie) et rattache les fichiers à
+leur blob par inode, sans les relire.
+
+Si le lien physique est impossible (autre système de fichiers), le fichier
+est copié: le stockage reste correct, sans gain de place.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Répertoire des blobs, à la racine des médias
+BLOB_DIR = '.blobs'
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(content):
+    """Empreinte SHA-256 (hexadécimale) et taille d'un fichier Django (File)."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks(CHUNK_SIZE):
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def path_digest(path):
+    with open(path, 'rb') as handle:
+        return file_digest(File(handle))
+
+
+def _link_or_copy(source, destination):
+    """Lien physique source -> destination, ou copie si le lien est impossible."""
+    try:
+        os.link(source, destination)
+        return True
+    except FileExistsError:
+        raise
+    except OSError:
+        with open(source, 'rb') as src, open(destination, 'xb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+        return False
+
+
+@deconstructible(path='config.storage.ContentAddressedStorage')
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage dont chaque fichier est un lien vers un blob unique par contenu."""
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest[2:4], digest)
+
+    def _makedirs(self, directory):
+        if self.directory_permissions_mode is not None:
+            # Comme FileSystemStorage: mode des répertoires indépendant de l'umask
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _store_blob(self, content, digest):
+        """Écrit le blob d'un contenu s'il n'existe pas encore (écriture atomique)."""
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            return path
+        directory = os.path.dirname(path)
+        self._makedirs(directory)
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    output.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            # Deux envois simultanés du même contenu écrivent le même blob
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        return path
+
+    def _save(self, name, content):
+        digest, _size = file_digest(content)
+        blob = self._store_blob(content, digest)
+        while True:
+            full_path = self.path(name)
+            self._makedirs(os.path.dirname(full_path))
+            try:
+                _link_or_copy(blob, full_path)
+            except FileExistsError:
+                # Nom pris entre-temps par un autre envoi
+                name = self.get_available_name(name)
+                continue
+            break
+        return str(name).replace('\\', '/')
+
+    def delete(self, name):
+        """Supprime le fichier, puis son blob s'il n'est plus référencé."""
+        path = self.path(name)
+        blob = None
+        try:
+            if os.stat(path).st_nlink == 2:
+                # Dernière référence: le blob deviendra orphelin
+                blob = self.blob_path(path_digest(path)[0])
+        except FileNotFoundError:
+            pass
+        super().delete(name)
+        if blob and os.path.exists(blob) and os.stat(blob).st_nlink == 1:
+            os.remove(blob)
+
+    # Maintenance (commande deduplicate_media)
+
+    def media_files(self):
+        """Chemins relatifs de tous les fichiers stockés, hors blobs."""
+        for root, directories, files in os.walk(self.location):
+            if root == self.location and BLOB_DIR in directories:
+                directories.remove(BLOB_DIR)
+            for filename in files:
+                if filename.startswith('.dedup-'):
+                    # Remplacement interrompu: le fichier d'origine est intact
+                    continue
+                yield os.path.relpath(os.path.join(root, filename), self.location).replace('\\', '/')
+
+    def blobs(self):
+        """{empreinte: chemin absolu} de tous les blobs."""
+        found = {}
+        for root, _directories, files in os.walk(os.path.join(self.location, BLOB_DIR)):
+            for filename in files:
+                if not filename.startswith('.upload-'):
+                    found[filename] = os.path.join(root, filename)
+        return found
+
+    def blob_inodes(self):
+        """{(périphérique, inode): empreinte}: rattache un fichier à son blob sans le relire."""
+        inodes = {}
+        for digest, path in self.blobs().items():
+            stat = os.stat(path)
+            inodes[(stat.st_dev, stat.st_ino)] = digest
+        return inodes
+
+    def references(self, digest):
+        """Nombre de fichiers qui partagent un blob."""
+        try:
+            return os.stat(self.blob_path(digest)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def deduplicate(self, name):
+        """
+        Rattache un fichier existant au blob de son contenu.
+
+        Returns:
+            tuple: (empreinte, octets libérés)
+        """
+        path = self.path(name)
+        digest, size = path_digest(path)
+        blob = self.blob_path(digest)
+        if not os.path.exists(blob):
+            # Premier exemplaire: il devient le blob, sans copie
+            self._makedirs(os.path.dirname(blob))
+            _link_or_copy(path, blob)
+            return digest, 0
+        if os.path.samefile(blob, path):
+            return digest, 0
+        # Doublon: remplacé atomiquement par un lien vers le blob
+        temporary = os.path.join(os.path.dirname(path), f'.dedup-{digest}')
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        linked = _link_or_copy(blob, temporary)
+        os.replace(temporary, path)
+        return digest, size if linked else 0
+
+    def collect_garbage(self, dry_run=False):
+        """Supprime les blobs qui ne sont plus référencés; retourne les octets libérés."""
+        freed = 0
+        for path in self.blobs().values():
+            stat = os.stat(path)
+            if stat.st_nlink == 1:
+                freed += stat.st_size
+                if not dry_run:
+                    os.remove(path)
+        return freed
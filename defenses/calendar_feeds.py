@@ -0,0 +1,221 @@
+# defenses/calendar_feeds.py
+# Flux iCalendar (RFC 5545) des soutenances et réunions de suivi
+#
+# Deux flux, accessibles sans session par un lien signé (les applications
+# d'agenda ne savent pas s'authentifier):
+# - flux personnel: soutenances de ses projets, participations au jury et
+#   réunions de suivi de ses projets;
+# - flux d'une salle: soutenances programmées dans la salle.
+#
+# Le flux est produit au fil de l'eau (StreamingHttpResponse). Son empreinte
+# (nombre d'événements et dernière modification, deux requêtes agrégées)
+# fournit ETag et Last-Modified: les clients qui interrogent le flux toutes
+# les quelques minutes reçoivent un 304 sans que le calendrier soit regénéré.
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Max, Q
+from django.urls import reverse
+from django.utils import timezone
+
+SALT = 'defenses.calendar-feed'
+
+PRODID = '-//Gestion PFE//Soutenances//FR'
+
+JURY_ROLE_LABELS = {
+    'president': 'Président',
+    'examiner': 'Examinateur',
+    'rapporteur': 'Rapporteur',
+    'supervisor': 'Encadreur',
+    'guest': 'Invité',
+}
+
+
+def make_feed_token(kind, pk):
+    """Jeton signé (sans expiration) d'un flux: kind vaut 'user' ou 'room'."""
+    return signing.dumps({'kind': kind, 'pk': pk}, salt=SALT)
+
+
+def read_feed_token(token):
+    """
+    Vérifie un jeton de flux.
+
+    Returns:
+        tuple: (kind, pk)
+
+    Raises:
+        signing.BadSignature: lien invalide ou modifié
+    """
+    data = signing.loads(token, salt=SALT)
+    return data['kind'], data['pk']
+
+
+def feed_url(kind, pk):
+    """URL absolue d'abonnement à un flux."""
+    path = reverse('defenses:calendar_feed', args=[make_feed_token(kind, pk)])
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def user_feed(user):
+    """
+    Soutenances et réunions du flux personnel d'un utilisateur.
+
+    Returns:
+        tuple: (QuerySet de Defense, QuerySet de Meeting)
+    """
+    from projects.models import Meeting, Project
+    from .models import Defense, DefenseJury, JuryMember
+
+    projects = Project.objects.filter(
+        Q(assignment__student=user) |
+        Q(team__student2=user) |
+        Q(assignment__subject__supervisor=user) |
+        Q(assignment__subject__co_supervisor=user)
+    ).values('pk')
+    defenses = Defense.objects.filter(
+        Q(project__in=projects) |
+        Q(pk__in=DefenseJury.objects.filter(teacher=user).values('defense')) |
+        Q(pk__in=JuryMember.objects.filter(user=user).values('defense'))
+    )
+    meetings = Meeting.objects.filter(project__in=projects)
+    return defenses, meetings
+
+
+def room_feed(room):
+    """Soutenances du flux d'une salle (pas de réunions)."""
+    from projects.models import Meeting
+    from .models import Defense
+
+    return Defense.objects.filter(room_obj=room), Meeting.objects.none()
+
+
+def jury_roles(user):
+    """Rôle de l'utilisateur dans chaque jury: {defense_id: libellé}."""
+    from .models import DefenseJury, JuryMember
+
+    roles = dict(JuryMember.objects.filter(user=user).values_list('defense_id', 'role'))
+    roles.update(DefenseJury.objects.filter(teacher=user).values_list('defense_id', 'role'))
+    return {defense_id: JURY_ROLE_LABELS.get(role, role) for defense_id, role in roles.items()}
+
+
+def feed_fingerprint(defenses, meetings):
+    """
+    Empreinte d'un flux: (ETag, date de dernière modification).
+
+    Le nombre d'événements fait partie de l'ETag, pour qu'une suppression
+    change aussi l'empreinte.
+    """
+    parts = []
+    last_modified = None
+    for queryset in (defenses, meetings):
+        stats = queryset.order_by().aggregate(total=Count('pk'), last=Max('updated_at'))
+        parts.append(f"{stats['total']}-{stats['last'].timestamp() if stats['last'] else 0}")
+        if stats['last'] and (last_modified is None or stats['last'] > last_modified):
+            last_modified = stats['last']
+    return '"%s"' % '.'.join(parts), last_modified
+
+
+def _escape(text):
+    return (
+        str(text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Coupe une ligne à 75 octets (continuation par une espace), en CRLF."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    chunks = []
+    while encoded:
+        size = 75 if not chunks else 74
+        # Ne pas couper au milieu d'un caractère UTF-8
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        chunks.append(encoded[:size].decode('utf-8'))
+        encoded = encoded[size:]
+    return '\r\n '.join(chunks) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _event(uid, start, end, summary, stamp, location='', description='', url='', cancelled=False):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{_utc(stamp)}',
+        f'DTSTART:{_utc(start)}',
+        f'DTEND:{_utc(end)}',
+        f'SUMMARY:{_escape(summary)}',
+    ]
+    if location:
+        lines.append(f'LOCATION:{_escape(location)}')
+    if description:
+        lines.append(f'DESCRIPTION:{_escape(description)}')
+    if url:
+        lines.append(f'URL:{url}')
+    lines.append('STATUS:CANCELLED' if cancelled else 'STATUS:CONFIRMED')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+def iter_calendar(name, defenses, meetings, roles=None):
+    """
+    Génère le calendrier morceau par morceau (un événement à la fois).
+
+    Args:
+        name: nom affiché du calendrier
+        roles: rôles de jury de l'abonné ({defense_id: libellé}, voir jury_roles)
+    """
+    roles = roles or {}
+    site = settings.SITE_URL.rstrip('/')
+    domain = urlparse(site).hostname
+
+    yield ''.join(_fold(line) for line in [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+        f'X-WR-TIMEZONE:{settings.TIME_ZONE}',
+    ])
+
+    defenses = defenses.select_related(
+        'project__assignment__student', 'room_obj'
+    ).order_by('date', 'time')
+    for defense in defenses.iterator(chunk_size=500):
+        start = timezone.make_aware(datetime.combine(defense.date, defense.time))
+        title = defense.project.title
+        summary = f'Jury ({roles[defense.pk]}) : {title}' if defense.pk in roles else f'Soutenance : {title}'
+        yield _event(
+            uid=f'defense-{defense.pk}@{domain}',
+            start=start,
+            end=start + timedelta(minutes=defense.duration),
+            summary=summary,
+            stamp=defense.updated_at,
+            location=defense.room_obj.name if defense.room_obj else defense.room,
+            description=f'Étudiant : {defense.project.assignment.student.get_full_name()}',
+            url=site + reverse('defenses:detail', args=[defense.pk]),
+            cancelled=defense.status == 'cancelled',
+        )
+
+    for meeting in meetings.order_by('scheduled_date').iterator(chunk_size=500):
+        yield _event(
+            uid=f'meeting-{meeting.pk}@{domain}',
+            start=meeting.scheduled_date,
+            end=meeting.scheduled_date + timedelta(minutes=meeting.duration_minutes),
+            summary=f'{meeting.get_type_display()} : {meeting.title}',
+            stamp=meeting.updated_at,
+            location=meeting.location,
+            description=meeting.description,
+            cancelled=meeting.status == 'cancelled',
+        )
+
+    yield 'END:VCALENDAR\r\n'
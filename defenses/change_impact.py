@@ -0,0 +1,161 @@
+# defenses/change_impact.py
+# Analyse d'impact d'une demande de modification de soutenance
+#
+# Avant d'approuver une demande, l'admin voit tous les conflits de salle et de
+# jury que provoquerait le nouveau créneau, ainsi qu'une liste classée de
+# créneaux de remplacement sans conflit. Les journées concernées sont chargées
+# en une fois dans un modèle en mémoire (DaySchedule.load_range): les
+# créneaux candidats sont ensuite évalués sans requête supplémentaire.
+
+from datetime import time, timedelta
+
+from users.availability import AvailabilityIndex
+
+from .conflicts import DaySchedule, from_minutes, to_minutes
+
+# Jours examinés de part et d'autre de la date proposée
+ALTERNATIVE_DAYS = 3
+
+# Plage horaire et pas des créneaux de remplacement
+ALTERNATIVE_DAY_START = time(8, 0)
+ALTERNATIVE_DAY_END = time(18, 0)
+ALTERNATIVE_STEP = 15
+
+# Nombre de créneaux de remplacement proposés
+ALTERNATIVE_LIMIT = 10
+
+
+def resolve_room(location):
+    """Salle correspondant au lieu saisi en texte libre (ex: '15BS1'), ou None."""
+    from .models import Room
+
+    if not location:
+        return None
+    name = location.strip().upper().replace('SALLE', '').strip()
+    return Room.objects.filter(name__iexact=name).first()
+
+
+def defense_jury_ids(defense):
+    """Membres du jury (deux tables) et encadreurs de la soutenance."""
+    from .models import DefenseJury, JuryMember
+
+    subject = defense.project.assignment.subject
+    ids = set(JuryMember.objects.filter(defense=defense).values_list('user_id', flat=True))
+    ids.update(DefenseJury.objects.filter(defense=defense).values_list('teacher_id', flat=True))
+    ids.update(pk for pk in (subject.supervisor_id, subject.co_supervisor_id) if pk)
+    return ids
+
+
+def analyze_change(change_request, limit=ALTERNATIVE_LIMIT):
+    """
+    Conflits provoqués par le créneau proposé et créneaux de remplacement.
+
+    Returns:
+        dict: {
+            'date', 'time', 'end_time', 'room' (Room ou None),
+            'room_resolved': le lieu proposé correspond à une salle connue,
+            'room_conflicts': [Defense, ...],
+            'jury_conflicts': [{'defense': Defense, 'members': [User, ...]}, ...],
+            'unavailable': [User, ...] (disponibilités déclarées),
+            'has_conflicts': bool,
+            'alternatives': [{'date', 'time', 'end_time', 'room', 'moved_days'}, ...],
+        }
+    """
+    from users.models import User
+    from .models import Defense, Room
+
+    defense = Defense.objects.select_related(
+        'project__assignment__subject', 'room_obj'
+    ).get(pk=change_request.defense_id)
+
+    new_date = change_request.proposed_date or defense.date
+    new_time = change_request.proposed_time or defense.time
+    room = defense.room_obj
+    room_resolved = True
+    if change_request.proposed_location:
+        room = resolve_room(change_request.proposed_location)
+        room_resolved = room is not None
+
+    start = to_minutes(new_time)
+    end = start + defense.duration
+    jury_ids = defense_jury_ids(defense)
+
+    first_day = new_date - timedelta(days=ALTERNATIVE_DAYS)
+    last_day = new_date + timedelta(days=ALTERNATIVE_DAYS)
+    schedules = DaySchedule.load_range(first_day, last_day, exclude=[defense.pk])
+    availability = AvailabilityIndex.load(jury_ids, first_day, last_day)
+
+    schedule = schedules[new_date]
+    room_entries = schedule.room_conflicts(start, end, room.pk) if room else []
+    jury_entries = schedule.jury_conflicts(start, end, jury_ids)
+    unavailable_ids = availability.unavailable(jury_ids, new_date, new_time, defense.duration)
+
+    # Détail des soutenances et enseignants concernés (deux requêtes)
+    conflict_ids = {entry['defense_id'] for entry in room_entries}
+    conflict_ids.update(conflict['entry']['defense_id'] for conflict in jury_entries)
+    member_ids = {pk for conflict in jury_entries for pk in conflict['common_members']}
+    member_ids.update(unavailable_ids)
+    defenses = Defense.objects.select_related(
+        'project__assignment__student', 'room_obj'
+    ).in_bulk(conflict_ids) if conflict_ids else {}
+    users = User.objects.in_bulk(member_ids) if member_ids else {}
+
+    # Créneaux de remplacement: la salle demandée d'abord, puis les autres
+    rooms = list(Room.objects.filter(is_available=True).order_by('name'))
+    filiere = defense.project.assignment.subject.filiere
+    rooms = [candidate for candidate in rooms if candidate.filiere in (filiere, 'GENERAL')] or rooms
+    preferred = room or defense.room_obj
+    if preferred:
+        rooms.sort(key=lambda candidate: candidate.pk != preferred.pk)
+
+    candidates = []
+    day_start, day_end = to_minutes(ALTERNATIVE_DAY_START), to_minutes(ALTERNATIVE_DAY_END)
+    for day, day_schedule in schedules.items():
+        if day.weekday() >= 5:
+            continue
+        for minute in range(day_start, day_end - defense.duration + 1, ALTERNATIVE_STEP):
+            if day == new_date and minute == start and not (room_entries or jury_entries):
+                continue
+            if day_schedule.jury_conflicts(minute, minute + defense.duration, jury_ids):
+                continue
+            if not availability.all_free(jury_ids, day, from_minutes(minute), defense.duration):
+                continue
+            free_room = next((
+                candidate for candidate in rooms
+                if not day_schedule.room_conflicts(minute, minute + defense.duration, candidate.pk)
+            ), None)
+            if free_room is None:
+                continue
+            candidates.append({
+                'date': day,
+                'time': from_minutes(minute),
+                'end_time': from_minutes(minute + defense.duration),
+                'room': free_room,
+                'moved_days': abs((day - new_date).days),
+                # Classement: même jour, même salle, heure la plus proche
+                'rank': (
+                    abs((day - new_date).days),
+                    preferred is not None and free_room.pk != preferred.pk,
+                    abs(minute - start),
+                ),
+            })
+    candidates.sort(key=lambda candidate: candidate['rank'])
+
+    return {
+        'date': new_date,
+        'time': new_time,
+        'end_time': from_minutes(end),
+        'room': room,
+        'room_resolved': room_resolved,
+        'room_conflicts': [defenses[entry['defense_id']] for entry in room_entries],
+        'jury_conflicts': [
+            {
+                'defense': defenses[conflict['entry']['defense_id']],
+                'members': [users[pk] for pk in conflict['common_members']],
+            }
+            for conflict in jury_entries
+        ],
+        'unavailable': [users[pk] for pk in unavailable_ids],
+        'has_conflicts': bool(room_entries or jury_entries or unavailable_ids),
+        'alternatives': candidates[:limit],
+    }
@@ -0,0 +1,123 @@
+# defenses/composition.py
+# Validation de la composition des jurys
+#
+# Les effectifs par rôle de toutes les soutenances d'une session sont obtenus
+# en une seule requête groupée (jointure sur les deux tables de jury et sur
+# Subject.is_interdisciplinary), puis les règles sont appliquées en Python.
+#
+# Comme pour la notation (defenses.grading), le jury pris en compte est celui
+# de DefenseJury s'il est composé, sinon celui de JuryMember. Dans JuryMember,
+# le rôle d'encadreur ('supervisor') tient lieu de rapporteur.
+
+from django.db.models import Count, F, Q
+
+# Rôles comptés comme rapporteur
+RAPPORTEUR_ROLES = ('rapporteur', 'supervisor')
+
+
+def _role_count(relation, roles=None):
+    condition = Q(**{f'{relation}__role__in': roles}) if roles else None
+    return Count(relation, filter=condition, distinct=True)
+
+
+def annotate_jury_roles(queryset):
+    """
+    Annote un QuerySet de soutenances avec les effectifs du jury par rôle.
+
+    Ajoute pour chaque relation (dj_* pour DefenseJury, jm_* pour JuryMember)
+    total, presidents, examiners et rapporteurs, ainsi que
+    is_interdisciplinary (sujet du projet).
+    """
+    annotations = {'is_interdisciplinary': F('project__assignment__subject__is_interdisciplinary')}
+    for prefix, relation in (('dj', 'defense_jury_members'), ('jm', 'jury_members')):
+        annotations.update({
+            f'{prefix}_total': _role_count(relation),
+            f'{prefix}_presidents': _role_count(relation, ['president']),
+            f'{prefix}_examiners': _role_count(relation, ['examiner']),
+            f'{prefix}_rapporteurs': _role_count(relation, RAPPORTEUR_ROLES),
+        })
+    return queryset.annotate(**annotations)
+
+
+def role_counts(defense):
+    """
+    Effectifs du jury retenu pour une soutenance annotée par annotate_jury_roles.
+
+    Returns:
+        tuple: (présidents, examinateurs, rapporteurs)
+    """
+    prefix = 'dj' if defense.dj_total else 'jm'
+    return (
+        getattr(defense, f'{prefix}_presidents'),
+        getattr(defense, f'{prefix}_examiners'),
+        getattr(defense, f'{prefix}_rapporteurs'),
+    )
+
+
+def composition_errors(president_count, examiner_count, rapporteur_count, is_interdisciplinary):
+    """
+    Règles de composition du jury:
+    - Standard: 1 président, 2 examinateurs, 1 rapporteur
+    - Interdisciplinaire: 1 président, 2+ examinateurs, 2 rapporteurs
+
+    Returns:
+        list: messages d'erreur (vide si le jury est valide)
+    """
+    errors = []
+
+    # Vérification président (toujours 1)
+    if president_count == 0:
+        errors.append("Un président est requis.")
+    elif president_count > 1:
+        errors.append("Un seul président est autorisé.")
+
+    if is_interdisciplinary:
+        # Jury élargi: 2+ examinateurs, 2 rapporteurs
+        if examiner_count < 2:
+            errors.append("Un projet interdisciplinaire nécessite au moins 2 examinateurs.")
+        if rapporteur_count < 2:
+            errors.append("Un projet interdisciplinaire nécessite 2 rapporteurs (les encadreurs).")
+    else:
+        # Jury standard: 2 examinateurs, 1 rapporteur
+        if examiner_count < 2:
+            errors.append("Au moins 2 examinateurs sont requis.")
+        if rapporteur_count != 1:
+            errors.append("Exactement 1 rapporteur est requis (l'encadreur principal).")
+
+    return errors
+
+
+def validate_defenses(queryset):
+    """
+    Valide le jury de chaque soutenance d'un QuerySet en une seule requête.
+
+    Returns:
+        list: [{'defense': Defense, 'is_valid': bool, 'errors': [...]}, ...]
+    """
+    report = []
+    for defense in annotate_jury_roles(queryset):
+        errors = composition_errors(*role_counts(defense), bool(defense.is_interdisciplinary))
+        report.append({'defense': defense, 'is_valid': not errors, 'errors': errors})
+    return report
+
+
+def validate_session(start_date, end_date, filiere=None):
+    """
+    Valide les jurys de toutes les soutenances (hors annulées) d'une période.
+
+    Args:
+        filiere: limiter aux sujets d'une filière (code, ex: GIT)
+
+    Returns:
+        list: rapport par soutenance (voir validate_defenses), trié par date
+    """
+    from .models import Defense
+
+    defenses = Defense.objects.filter(
+        date__range=(start_date, end_date)
+    ).exclude(status='cancelled').select_related(
+        'project__assignment__student', 'room_obj'
+    ).order_by('date', 'time')
+    if filiere:
+        defenses = defenses.filter(project__assignment__subject__filiere=filiere)
+    return validate_defenses(defenses)
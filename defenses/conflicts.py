@@ -0,0 +1,274 @@
+# defenses/conflicts.py
+# Détection des conflits de salle et de jury pour la planification des soutenances
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+
+def to_minutes(value):
+    """Convertit une heure (datetime.time) en minutes depuis minuit."""
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes):
+    """Convertit des minutes depuis minuit en datetime.time."""
+    return time(minutes // 60, minutes % 60)
+
+
+def compute_end_time(defense_date, start_time, duration):
+    """Heure de fin d'un créneau (même calcul que Defense.get_end_time)."""
+    return (datetime.combine(defense_date, start_time) + timedelta(minutes=duration)).time()
+
+
+def overlapping_defenses(defense_date, start_time, end_time, exclude_pk=None):
+    """
+    Soutenances planifiées qui chevauchent l'intervalle [start_time, end_time[.
+
+    Le chevauchement est évalué en SQL grâce au champ stocké `end_time`,
+    sans charger les soutenances de la journée en mémoire.
+    """
+    from .models import Defense
+
+    defenses = Defense.objects.filter(
+        date=defense_date,
+        status='scheduled',
+        time__lt=end_time,
+        end_time__gt=start_time,
+    )
+    if exclude_pk:
+        defenses = defenses.exclude(pk=exclude_pk)
+    return defenses
+
+
+def find_room_conflicts(room, defense_date, start_time, duration, exclude_pk=None):
+    """
+    Soutenances planifiées dans la même salle sur un créneau qui se chevauche.
+
+    Returns:
+        QuerySet de Defense (une seule requête à l'évaluation)
+    """
+    end_time = compute_end_time(defense_date, start_time, duration)
+    return overlapping_defenses(
+        defense_date, start_time, end_time, exclude_pk=exclude_pk
+    ).filter(room_obj=room)
+
+
+def find_jury_conflicts(defense):
+    """
+    Conflits de jury d'une soutenance: autres soutenances du même jour, sur un
+    créneau qui se chevauche, partageant au moins un membre du jury.
+
+    Une seule requête: les membres communs sont trouvés par sous-requête sur
+    le jury de la soutenance.
+
+    Returns:
+        list: [{'defense': Defense, 'common_members': [user_id, ...]}, ...]
+    """
+    from .models import JuryMember
+
+    if defense.pk is None:
+        # Soutenance non enregistrée: pas encore de jury
+        return []
+
+    end_time = defense.get_end_time()
+    rows = JuryMember.objects.filter(
+        defense__date=defense.date,
+        defense__status='scheduled',
+        defense__time__lt=end_time,
+        defense__end_time__gt=defense.time,
+        user__in=JuryMember.objects.filter(defense=defense).values('user'),
+    ).exclude(
+        defense_id=defense.pk
+    ).select_related('defense').order_by('defense__time', 'defense_id', 'user_id')
+
+    conflicts = {}
+    for row in rows:
+        conflict = conflicts.setdefault(row.defense_id, {
+            'defense': row.defense,
+            'common_members': [],
+        })
+        conflict['common_members'].append(row.user_id)
+
+    return list(conflicts.values())
+
+
+def _sweep_overlaps(intervals):
+    """
+    Retourne les paires d'intervalles qui se chevauchent (balayage trié).
+
+    Args:
+        intervals: liste de dicts ayant au moins 'start' et 'end' (minutes)
+    """
+    pairs = []
+    active = []
+    for current in sorted(intervals, key=lambda item: (item['start'], item['end'])):
+        active = [item for item in active if item['end'] > current['start']]
+        for item in active:
+            pairs.append((item, current))
+        active.append(current)
+    return pairs
+
+
+class DaySchedule:
+    """
+    Modèle en mémoire des soutenances planifiées d'une journée.
+
+    Chargé en trois requêtes (créneaux + membres des deux tables de jury), il
+    répond ensuite aux questions de disponibilité sans accès à la base.
+    """
+
+    def __init__(self, defense_date, entries=None):
+        self.date = defense_date
+        self.entries = []
+        self.by_room = defaultdict(list)
+        self.by_member = defaultdict(list)
+        for entry in entries or []:
+            self.add(entry)
+
+    @classmethod
+    def load(cls, defense_date, exclude=()):
+        """
+        Charge les soutenances planifiées d'une journée.
+
+        Args:
+            defense_date: date de la journée
+            exclude: identifiants de soutenances à ignorer (ex: soutenances replanifiées)
+        """
+        return cls.load_range(defense_date, defense_date, exclude=exclude)[defense_date]
+
+    @classmethod
+    def load_range(cls, start_date, end_date, exclude=()):
+        """
+        Charge les journées d'une période en une fois (créneaux, puis membres
+        des deux tables de jury).
+
+        Returns:
+            dict: {date: DaySchedule} pour chaque jour de la période
+        """
+        from .models import Defense, DefenseJury, JuryMember
+
+        exclude = set(exclude)
+        defenses = Defense.objects.filter(
+            date__range=(start_date, end_date), status='scheduled'
+        ).exclude(pk__in=exclude).values('pk', 'date', 'time', 'duration', 'room_obj_id')
+
+        jury = defaultdict(set)
+        for model, field in ((JuryMember, 'user_id'), (DefenseJury, 'teacher_id')):
+            for defense_id, user_id in model.objects.filter(
+                defense__date__range=(start_date, end_date), defense__status='scheduled'
+            ).exclude(defense_id__in=exclude).values_list('defense_id', field):
+                jury[defense_id].add(user_id)
+
+        schedules = {}
+        day = start_date
+        while day <= end_date:
+            schedules[day] = cls(day)
+            day += timedelta(days=1)
+        for row in defenses:
+            start = to_minutes(row['time'])
+            schedules[row['date']].add({
+                'defense_id': row['pk'],
+                'start': start,
+                'end': start + row['duration'],
+                'room_id': row['room_obj_id'],
+                'jury': frozenset(jury.get(row['pk'], ())),
+            })
+        return schedules
+
+    def add(self, entry):
+        """Ajoute un créneau occupé (dict avec 'start', 'end', 'room_id', 'jury')."""
+        entry['jury'] = frozenset(entry.get('jury', ()))
+        self.entries.append(entry)
+        if entry.get('room_id'):
+            self.by_room[entry['room_id']].append(entry)
+        for user_id in entry['jury']:
+            self.by_member[user_id].append(entry)
+        return entry
+
+    def room_conflicts(self, start, end, room_id):
+        """Créneaux occupant la salle sur l'intervalle [start, end[ (minutes)."""
+        return [
+            entry for entry in self.by_room.get(room_id, ())
+            if entry['start'] < end and entry['end'] > start
+        ]
+
+    def jury_conflicts(self, start, end, jury_ids):
+        """
+        Créneaux partageant un membre du jury sur l'intervalle [start, end[.
+
+        Returns:
+            list: [{'entry': dict, 'common_members': [user_id, ...]}, ...]
+        """
+        conflicts = {}
+        for user_id in jury_ids:
+            for entry in self.by_member.get(user_id, ()):
+                if entry['start'] < end and entry['end'] > start:
+                    conflict = conflicts.setdefault(id(entry), {
+                        'entry': entry,
+                        'common_members': [],
+                    })
+                    conflict['common_members'].append(user_id)
+        return list(conflicts.values())
+
+    def is_free(self, start, end, room_id=None, jury_ids=()):
+        """Vérifie qu'un créneau ne provoque aucun conflit de salle ni de jury."""
+        if room_id and self.room_conflicts(start, end, room_id):
+            return False
+        return not self.jury_conflicts(start, end, jury_ids)
+
+
+def check_day_plan(defense_date, plan):
+    """
+    Vérifie en une passe un planning proposé pour une journée.
+
+    Les soutenances déjà planifiées ce jour sont chargées une seule fois
+    (voir DaySchedule.load), puis les chevauchements sont détectés par
+    balayage trié, salle par salle et membre du jury par membre du jury.
+
+    Args:
+        defense_date: date de la journée
+        plan: liste de dicts décrivant chaque créneau proposé:
+            - 'time': heure de début (datetime.time)
+            - 'duration': durée en minutes
+            - 'room': Room, identifiant de salle ou None
+            - 'jury': identifiants des membres du jury (optionnel)
+            - 'defense_id': soutenance existante replanifiée (optionnel)
+            - 'key': identifiant libre renvoyé dans le rapport (défaut: index)
+
+    Returns:
+        list: conflits impliquant au moins un créneau proposé
+            [{'type': 'room'|'jury', 'resource': id, 'first': dict, 'second': dict}, ...]
+    """
+    proposed = []
+    for index, item in enumerate(plan):
+        room = item.get('room')
+        start = to_minutes(item['time'])
+        proposed.append({
+            'key': item.get('key', index),
+            'defense_id': item.get('defense_id'),
+            'start': start,
+            'end': start + item['duration'],
+            'room_id': getattr(room, 'pk', room),
+            'jury': frozenset(item.get('jury', ())),
+            'proposed': True,
+        })
+
+    schedule = DaySchedule.load(
+        defense_date,
+        exclude=[entry['defense_id'] for entry in proposed if entry['defense_id']],
+    )
+    for entry in proposed:
+        schedule.add(entry)
+
+    conflicts = []
+    for resource_type, index in (('room', schedule.by_room), ('jury', schedule.by_member)):
+        for resource, intervals in index.items():
+            for first, second in _sweep_overlaps(intervals):
+                if first.get('proposed') or second.get('proposed'):
+                    conflicts.append({
+                        'type': resource_type,
+                        'resource': resource,
+                        'first': first,
+                        'second': second,
+                    })
+    return conflicts
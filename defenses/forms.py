@@ -3,6 +3,29 @@ from django.db.models import Q
 from .models import Defense, JuryMember, DefenseEvaluation, DefenseChangeRequest, Room
 
 
+def _check_teacher_availability(project, date, time, duration, defense=None):
+    """
+    Vérifie que l'encadrement et le jury déjà composé ont déclaré être
+    disponibles sur le créneau (voir users.availability).
+    """
+    from users.availability import unavailable_teachers
+    
+    if not (project and date and time and duration):
+        return
+    subject = project.assignment.subject
+    teacher_ids = [subject.supervisor_id, subject.co_supervisor_id]
+    if defense is not None and defense.pk:
+        teacher_ids += list(defense.jury_members.values_list('user_id', flat=True))
+        teacher_ids += list(defense.defense_jury_members.values_list('teacher_id', flat=True))
+    
+    unavailable = unavailable_teachers(teacher_ids, date, time, duration)
+    if unavailable:
+        raise forms.ValidationError(
+            "Enseignant(s) indisponible(s) sur ce créneau : "
+            + ", ".join(teacher.get_full_name() for teacher in unavailable)
+        )
+
+
 class RoomForm(forms.ModelForm):
     """Formulaire pour créer/modifier une salle (liste déroulante)"""
     
@@ -107,6 +130,8 @@ class DefenseForm(forms.ModelForm):
                     f"La salle {room_obj.name} n'est pas disponible pour ce créneau horaire."
                 )
         
+        _check_teacher_availability(cleaned_data.get('project'), date, time, duration)
+        
         return cleaned_data
 
 
@@ -181,6 +206,21 @@ class DefenseUpdateForm(forms.ModelForm):
         labels = {
             'room_obj': 'Salle',
         }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        # Disponibilités contrôlées seulement si le créneau change: clôturer
+        # une soutenance ou changer son statut ne doit pas être bloqué
+        rescheduled = {'date', 'time', 'duration'} & set(self.changed_data)
+        if rescheduled and cleaned_data.get('status') != 'cancelled':
+            _check_teacher_availability(
+                self.instance.project,
+                cleaned_data.get('date'),
+                cleaned_data.get('time'),
+                cleaned_data.get('duration'),
+                defense=self.instance,
+            )
+        return cleaned_data
 
 
 class DefenseChangeRequestForm(forms.ModelForm):
@@ -235,3 +275,151 @@ class DefenseChangeReviewForm(forms.ModelForm):
             'status': '<i class="fas fa-scale-balanced"></i> Décision',
             'review_comment': '<i class="far fa-comment"></i> Commentaire',
         }
+
+
+class AutoScheduleForm(forms.Form):
+    """Paramètres de la planification automatique d'une session"""
+    
+    start_date = forms.DateField(
+        label='<i class="far fa-calendar"></i> Premier jour',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    days = forms.IntegerField(
+        label='<i class="fas fa-calendar-week"></i> Nombre de jours',
+        min_value=1,
+        max_value=30,
+        initial=5,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    duration = forms.IntegerField(
+        label='<i class="fas fa-stopwatch"></i> Durée d\'un créneau (minutes)',
+        min_value=15,
+        max_value=180,
+        initial=45,
+        widget=forms.NumberInput(attrs={'class': 'form-control'})
+    )
+    day_start = forms.TimeField(
+        label='<i class="far fa-clock"></i> Début de journée',
+        initial='08:00',
+        widget=forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'})
+    )
+    day_end = forms.TimeField(
+        label='<i class="far fa-clock"></i> Fin de journée',
+        initial='18:00',
+        widget=forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'})
+    )
+    filiere = forms.ChoiceField(
+        label='<i class="fas fa-university"></i> Filière',
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        from users.models import User
+        
+        # Un admin de filière ne planifie que sa filière
+        if self.user and self.user.is_admin_filiere():
+            self.fields['filiere'].choices = [
+                (self.user.filiere_admin, dict(User.FILIERE_CHOICES)[self.user.filiere_admin])
+            ]
+            self.fields['filiere'].required = True
+        else:
+            self.fields['filiere'].choices = [('', 'Toutes les filières')] + User.FILIERE_CHOICES
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        day_start = cleaned_data.get('day_start')
+        day_end = cleaned_data.get('day_end')
+        
+        if day_start and day_end and day_start >= day_end:
+            raise forms.ValidationError("L'heure de fin doit être après l'heure de début.")
+        
+        return cleaned_data
+
+
+class JuryValidationForm(forms.Form):
+    """Période et filière de la session dont on valide les jurys"""
+    
+    start_date = forms.DateField(
+        label='<i class="far fa-calendar"></i> Du',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    end_date = forms.DateField(
+        label='<i class="far fa-calendar"></i> Au',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    filiere = forms.ChoiceField(
+        label='<i class="fas fa-university"></i> Filière',
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        from users.models import User
+        
+        # Un admin de filière ne valide que sa filière
+        if self.user and self.user.is_admin_filiere():
+            self.fields['filiere'].choices = [
+                (self.user.filiere_admin, dict(User.FILIERE_CHOICES)[self.user.filiere_admin])
+            ]
+            self.fields['filiere'].required = True
+        else:
+            self.fields['filiere'].choices = [('', 'Toutes les filières')] + User.FILIERE_CHOICES
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+        
+        if start_date and end_date and start_date > end_date:
+            raise forms.ValidationError("La date de fin doit être après la date de début.")
+        
+        return cleaned_data
+
+
+class GradingSheetForm(forms.Form):
+    """
+    Feuille de notation d'un président: une note par membre de chacun de ses
+    jurys de la journée (voir defenses.grading.grading_sheet).
+    """
+    
+    def __init__(self, *args, sheet=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for row in sheet:
+            # Notes saisissables seulement une fois la soutenance passée
+            disabled = not row['defense'].can_be_graded
+            for entry in row['members']:
+                self.fields[entry['key']] = forms.DecimalField(
+                    label=f"{entry['name']} ({entry['role']})",
+                    required=False,
+                    min_value=0,
+                    max_value=20,
+                    max_digits=4,
+                    decimal_places=2,
+                    initial=entry['member'].grade,
+                    # Note affichée renvoyée avec le formulaire: changed_data
+                    # compare à ce que le président a vu, pas à la base
+                    show_hidden_initial=True,
+                    disabled=disabled,
+                    widget=forms.NumberInput(attrs={
+                        'class': 'form-control form-control-sm',
+                        'step': '0.25',
+                        'min': 0,
+                        'max': 20,
+                    }),
+                )
+            row['fields'] = [self[entry['key']] for entry in row['members']]
+            row['disabled'] = disabled
+    
+    def grades(self):
+        """
+        Notes modifiées par le président: {clé du membre: Decimal ou None}.
+
+        Une note laissée telle qu'affichée n'est pas renvoyée: elle
+        n'écrase pas celle qu'un membre du jury a saisie entre-temps.
+        """
+        return {name: self.cleaned_data[name] for name in self.changed_data}
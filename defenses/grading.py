@@ -0,0 +1,219 @@
+# defenses/grading.py
+# État de notation matérialisé sur la soutenance
+#
+# La note finale, le nombre de membres ayant noté et l'indicateur
+# "complètement notée" sont stockés sur Defense et recalculés à chaque
+# enregistrement ou suppression d'une note du jury (signaux). Les pages qui
+# affichent l'état de notation le lisent donc sans requête supplémentaire et
+# peuvent filtrer dessus en SQL (Defense.objects.filter(is_fully_graded=True)).
+#
+# Le jury noté est celui de DefenseJury (saisie des notes par les membres)
+# s'il est composé, sinon celui de JuryMember.
+#
+# En fin de journée, un président saisit les notes de tous ses jurys sur une
+# seule feuille (grading_sheet / save_grading_sheet): écriture par
+# bulk_update puis recalcul groupé, sans passer par les signaux.
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, IntegerField, OuterRef, Subquery
+
+GRADE_PRECISION = Decimal('0.01')
+
+
+def _aggregate(model, function, field):
+    """Sous-requête scalaire: agrégat des notes du jury de la soutenance courante."""
+    output_field = DecimalField() if function is Avg else IntegerField()
+    return Subquery(
+        model.objects.filter(defense=OuterRef('pk')).order_by().values('defense').annotate(
+            value=function(field)
+        ).values('value'),
+        output_field=output_field,
+    )
+
+
+def _state(row):
+    """État de notation d'une ligne annotée (voir compute_grading_states)."""
+    prefix = 'dj' if row['dj_total'] else 'jm'
+    total = row[f'{prefix}_total'] or 0
+    graded = row[f'{prefix}_graded'] or 0
+    is_fully_graded = total > 0 and graded == total
+
+    final_grade = None
+    if is_fully_graded:
+        # Moyenne simple des notes du jury
+        final_grade = Decimal(str(row[f'{prefix}_average'])).quantize(GRADE_PRECISION, ROUND_HALF_UP)
+
+    return {
+        'final_grade': final_grade,
+        'graded_members_count': graded,
+        'is_fully_graded': is_fully_graded,
+    }
+
+
+def compute_grading_states(defense_ids):
+    """
+    Calcule l'état de notation de plusieurs soutenances en une seule requête.
+
+    Returns:
+        dict: {defense_id: {'final_grade', 'graded_members_count', 'is_fully_graded'}}
+        (les soutenances qui n'existent plus sont absentes)
+    """
+    from .models import Defense, DefenseJury, JuryMember
+
+    rows = Defense.objects.filter(pk__in=list(defense_ids)).annotate(
+        dj_total=_aggregate(DefenseJury, Count, 'pk'),
+        dj_graded=_aggregate(DefenseJury, Count, 'grade'),
+        dj_average=_aggregate(DefenseJury, Avg, 'grade'),
+        jm_total=_aggregate(JuryMember, Count, 'pk'),
+        jm_graded=_aggregate(JuryMember, Count, 'grade'),
+        jm_average=_aggregate(JuryMember, Avg, 'grade'),
+    ).order_by().values('pk', 'dj_total', 'dj_graded', 'dj_average', 'jm_total', 'jm_graded', 'jm_average')
+    return {row['pk']: _state(row) for row in rows}
+
+
+def compute_grading_state(defense_id):
+    """
+    Calcule l'état de notation d'une soutenance en une seule requête.
+
+    Returns:
+        dict: {'final_grade', 'graded_members_count', 'is_fully_graded'},
+        ou None si la soutenance n'existe plus
+    """
+    return compute_grading_states([defense_id]).get(defense_id)
+
+
+def _lock_defenses(defense_ids):
+    """
+    Verrouille les lignes Defense (SELECT ... FOR UPDATE, par ordre de clé).
+
+    Deux membres du jury qui notent en même temps recalculent l'un après
+    l'autre: le second voit la note validée du premier au lieu d'écraser
+    l'état avec un calcul qui l'ignore.
+    """
+    from .models import Defense
+
+    locked = Defense.objects.select_for_update().filter(pk__in=defense_ids).order_by('pk')
+    list(locked.values_list('pk', flat=True))
+
+
+def refresh_grading_state(defense_id):
+    """
+    Recalcule et enregistre l'état de notation d'une soutenance.
+
+    Returns:
+        dict: l'état enregistré (voir compute_grading_state)
+    """
+    from .models import Defense
+
+    with transaction.atomic():
+        _lock_defenses([defense_id])
+        state = compute_grading_state(defense_id)
+        if state is not None:
+            Defense.objects.filter(pk=defense_id).update(**state)
+    return state
+
+
+def refresh_grading_states(defense_ids):
+    """
+    Recalcule et enregistre l'état de notation de plusieurs soutenances:
+    verrou des lignes, un agrégat, puis un bulk_update.
+
+    Returns:
+        dict: {defense_id: état enregistré}
+    """
+    from .models import Defense
+
+    defense_ids = list(defense_ids)
+    with transaction.atomic():
+        _lock_defenses(defense_ids)
+        states = compute_grading_states(defense_ids)
+        defenses = [Defense(pk=pk, **state) for pk, state in states.items()]
+        Defense.objects.bulk_update(defenses, ['final_grade', 'graded_members_count', 'is_fully_graded'])
+    return states
+
+
+def president_defenses(president, day):
+    """Soutenances d'un jour présidées par l'enseignant (l'une ou l'autre table de jury)."""
+    from django.db.models import Q
+    from .models import Defense, DefenseJury, JuryMember
+
+    return Defense.objects.filter(
+        Q(pk__in=DefenseJury.objects.filter(teacher=president, role='president').values('defense')) |
+        Q(pk__in=JuryMember.objects.filter(user=president, role='president').values('defense')),
+        date=day,
+    ).exclude(status='cancelled').select_related('project__assignment__student').order_by('time')
+
+
+def grading_sheet(president, day):
+    """
+    Feuille de notation d'un président pour une journée: chaque soutenance
+    avec les membres de son jury noté (trois requêtes).
+
+    Returns:
+        list: [{'defense': Defense, 'members': [{'key', 'member', 'name', 'role'}, ...]}, ...]
+    """
+    from .models import DefenseJury, JuryMember
+
+    defenses = list(president_defenses(president, day))
+    by_defense = {defense.pk: [] for defense in defenses}
+    for member in DefenseJury.objects.filter(defense__in=defenses).select_related('teacher').order_by('pk'):
+        by_defense[member.defense_id].append({
+            'key': f'dj-{member.pk}',
+            'member': member,
+            'name': member.teacher.get_full_name(),
+            'role': member.get_role_display(),
+        })
+    # Jury noté: DefenseJury s'il est composé, sinon JuryMember
+    for member in JuryMember.objects.filter(
+        defense__in=[pk for pk, members in by_defense.items() if not members]
+    ).select_related('user').order_by('pk'):
+        by_defense[member.defense_id].append({
+            'key': f'jm-{member.pk}',
+            'member': member,
+            'name': member.user.get_full_name(),
+            'role': member.get_role_display(),
+        })
+    return [{'defense': defense, 'members': by_defense[defense.pk]} for defense in defenses]
+
+
+def save_grading_sheet(sheet, grades):
+    """
+    Enregistre les notes modifiées d'une feuille en une transaction: un
+    bulk_update par table de jury, puis un recalcul groupé des notes finales
+    (bulk_update n'émet pas les signaux de recalcul).
+
+    Args:
+        sheet: feuille (voir grading_sheet)
+        grades: {clé du membre: note Decimal ou None}
+
+    Returns:
+        int: nombre de notes modifiées
+    """
+    from django.utils import timezone
+    from .models import DefenseJury, JuryMember
+
+    now = timezone.now()
+    changed = {DefenseJury: [], JuryMember: []}
+    defense_ids = set()
+    for row in sheet:
+        for entry in row['members']:
+            if entry['key'] not in grades:
+                continue
+            member = entry['member']
+            grade = grades[entry['key']]
+            if member.grade == grade:
+                continue
+            member.grade = grade
+            if isinstance(member, DefenseJury):
+                member.graded_at = now if grade is not None else None
+            changed[type(member)].append(member)
+            defense_ids.add(row['defense'].pk)
+
+    with transaction.atomic():
+        DefenseJury.objects.bulk_update(changed[DefenseJury], ['grade', 'graded_at'])
+        JuryMember.objects.bulk_update(changed[JuryMember], ['grade'])
+        if defense_ids:
+            refresh_grading_states(defense_ids)
+    return len(changed[DefenseJury]) + len(changed[JuryMember])
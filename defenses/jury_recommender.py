@@ -0,0 +1,368 @@
+# defenses/jury_recommender.py
+# Composition automatique des jurys d'une session, avec équilibrage des charges
+#
+# Pour chaque soutenance programmée, le jury est complété selon les règles de
+# defenses.composition: un président Professeur (au plus 4 présidences par
+# jour et par filière), l'encadreur comme rapporteur (et le co-encadreur pour
+# un projet interdisciplinaire) et au moins 2 examinateurs. Un enseignant
+# n'est jamais proposé sur deux soutenances qui se chevauchent.
+#
+# L'objectif est de minimiser la charge maximale (nombre de participations à
+# un jury sur la session) d'un enseignant:
+# 1. affectation gloutonne, soutenances les plus contraintes d'abord, en
+#    choisissant toujours l'enseignant libre le moins chargé;
+# 2. amélioration locale: tant que c'est possible, une place d'un enseignant
+#    de charge maximale est cédée à un enseignant libre moins chargé d'au
+#    moins deux participations.
+
+import math
+import time as _time
+from collections import defaultdict
+
+from django.db import transaction
+
+from .composition import RAPPORTEUR_ROLES
+from .conflicts import to_minutes
+from .scheduling import PRESIDENCY_LIMIT
+
+# Nombre d'examinateurs proposés par jury
+EXAMINERS_PER_JURY = 2
+
+
+class JuryRecommender:
+    """
+    Solveur de composition des jurys pour un ensemble de soutenances.
+
+    Les jurys déjà (partiellement) composés sont conservés et seulement
+    complétés; les participations existantes comptent dans les charges.
+    """
+
+    def __init__(self, defenses, teachers, busy=None, loads=None, presidencies=None):
+        """
+        Args:
+            defenses: liste de dicts décrivant les soutenances à compléter:
+                'defense', 'date', 'start', 'end' (minutes), 'filiere',
+                'interdisciplinary', 'rapporteurs' (ids des encadreurs),
+                'members' ({user_id: rôle} du jury existant)
+            teachers: enseignants pouvant siéger (User)
+            busy: {(user_id, date): [(début, fin), ...]} occupations connues
+            loads: {user_id: participations existantes sur la session}
+            presidencies: {(user_id, date, filière): présidences existantes}
+        """
+        self.items = list(defenses)
+        self.teachers = {teacher.pk: teacher for teacher in teachers}
+        self.professors = [
+            pk for pk, teacher in sorted(self.teachers.items())
+            if teacher.academic_title == 'professeur'
+        ]
+        self.busy = defaultdict(list, busy or {})
+        self.load = defaultdict(int, loads or {})
+        self.presidencies = defaultdict(int, presidencies or {})
+        self.swaps = 0
+
+    @classmethod
+    def from_database(cls, start_date, end_date, filiere=None):
+        """
+        Construit le solveur pour les soutenances programmées d'une période:
+        jurys existants, encadreurs, occupations et présidences de la période.
+        """
+        from users.models import User
+        from .models import Defense, DefenseJury, JuryMember
+
+        defenses = list(Defense.objects.filter(
+            date__range=(start_date, end_date), status='scheduled'
+        ).select_related(
+            'project__assignment__student', 'project__assignment__subject'
+        ).order_by('date', 'time'))
+
+        jury_members = defaultdict(dict)
+        for defense_id, user_id, role in JuryMember.objects.filter(
+            defense__in=defenses
+        ).values_list('defense_id', 'user_id', 'role'):
+            jury_members[defense_id][user_id] = role
+        defense_jury = defaultdict(dict)
+        for defense_id, user_id, role in DefenseJury.objects.filter(
+            defense__in=defenses
+        ).values_list('defense_id', 'teacher_id', 'role'):
+            defense_jury[defense_id][user_id] = role
+        # Jury retenu (comme composition.role_counts): DefenseJury s'il est
+        # composé, sinon JuryMember
+        members = {
+            defense.pk: defense_jury[defense.pk] or jury_members[defense.pk]
+            for defense in defenses
+        }
+
+        busy = defaultdict(list)
+        loads = defaultdict(int)
+        presidencies = defaultdict(int)
+        items = []
+        for defense in defenses:
+            subject = defense.project.assignment.subject
+            start = to_minutes(defense.time)
+            end = start + defense.duration
+            rapporteurs = [subject.supervisor_id]
+            if subject.co_supervisor_id:
+                rapporteurs.append(subject.co_supervisor_id)
+
+            # L'encadreur siège comme rapporteur: il est occupé pendant la soutenance
+            attendees = set(members[defense.pk]) | set(rapporteurs)
+            for user_id in attendees:
+                busy[(user_id, defense.date)].append((start, end))
+                loads[user_id] += 1
+            for user_id, role in members[defense.pk].items():
+                if role == 'president':
+                    presidencies[(user_id, defense.date, subject.filiere)] += 1
+
+            if filiere and subject.filiere != filiere:
+                # Hors filière: seulement prise en compte dans les occupations
+                continue
+            items.append({
+                'defense': defense,
+                'date': defense.date,
+                'start': start,
+                'end': end,
+                'filiere': subject.filiere,
+                'interdisciplinary': subject.is_interdisciplinary,
+                'rapporteurs': rapporteurs,
+                'members': dict(members[defense.pk]),
+                'defense_jury': bool(defense_jury[defense.pk]),
+            })
+
+        teachers = User.objects.filter(role='teacher', is_active=True).order_by('pk')
+        return cls(items, list(teachers), busy=busy, loads=loads, presidencies=presidencies)
+
+    def _is_free(self, user_id, item):
+        return all(
+            busy_end <= item['start'] or busy_start >= item['end']
+            for busy_start, busy_end in self.busy.get((user_id, item['date']), ())
+        )
+
+    def _take(self, user_id, item):
+        self.busy[(user_id, item['date'])].append((item['start'], item['end']))
+        self.load[user_id] += 1
+
+    def _release(self, user_id, item):
+        self.busy[(user_id, item['date'])].remove((item['start'], item['end']))
+        self.load[user_id] -= 1
+
+    def _can_preside(self, user_id, item):
+        return self.presidencies[(user_id, item['date'], item['filiere'])] < PRESIDENCY_LIMIT
+
+    def _candidates(self, item, jury, pool):
+        """Enseignants libres, hors jury, du moins chargé au plus chargé."""
+        return sorted(
+            (
+                pk for pk in pool
+                if pk not in jury and self._is_free(pk, item)
+            ),
+            key=lambda pk: (self.load[pk], self.teachers[pk].filiere != item['filiere'], pk)
+        )
+
+    def _compose(self, item):
+        """Complète le jury d'une soutenance (affectation gloutonne)."""
+        members = item['members']
+        jury = set(members) | set(item['rapporteurs'])
+        added = []
+        missing = []
+
+        if 'president' not in members.values():
+            president = next(
+                (pk for pk in self._candidates(item, jury, self.professors) if self._can_preside(pk, item)),
+                None
+            )
+            if president is None:
+                missing.append("Aucun Professeur libre pour présider.")
+            else:
+                self._take(president, item)
+                self.presidencies[(president, item['date'], item['filiere'])] += 1
+                jury.add(president)
+                added.append((president, 'president'))
+
+        for user_id in item['rapporteurs']:
+            if user_id not in members and user_id in self.teachers:
+                added.append((user_id, 'rapporteur'))
+        if item['interdisciplinary'] and len(item['rapporteurs']) < 2:
+            missing.append("Projet interdisciplinaire sans co-encadreur (2e rapporteur).")
+
+        examiners = sum(1 for role in members.values() if role == 'examiner')
+        needed = max(EXAMINERS_PER_JURY - examiners, 0)
+        candidates = self._candidates(item, jury, self.teachers)[:needed]
+        for user_id in candidates:
+            self._take(user_id, item)
+            jury.add(user_id)
+            added.append((user_id, 'examiner'))
+        if len(candidates) < needed:
+            missing.append(f"{needed - len(candidates)} examinateur(s) libre(s) manquant(s).")
+
+        item['jury'] = jury
+        item['added'] = added
+        item['missing'] = missing
+
+    def _rebalance(self):
+        """Cède les places des enseignants les plus chargés tant que le maximum baisse."""
+        seats = defaultdict(list)
+        for index, item in enumerate(self.items):
+            for position, (user_id, role) in enumerate(item['added']):
+                if role != 'rapporteur':
+                    seats[user_id].append((index, position))
+
+        improved = True
+        while improved:
+            improved = False
+            peak = max((self.load[pk] for pk in seats if seats[pk]), default=0)
+            for user_id in [pk for pk in seats if seats[pk] and self.load[pk] == peak]:
+                for index, position in list(seats[user_id]):
+                    item = self.items[index]
+                    role = item['added'][position][1]
+                    pool = self.professors if role == 'president' else self.teachers
+                    replacement = next((
+                        pk for pk in self._candidates(item, item['jury'], pool)
+                        if self.load[pk] <= peak - 2
+                        and (role != 'president' or self._can_preside(pk, item))
+                    ), None)
+                    if replacement is None:
+                        continue
+                    self._release(user_id, item)
+                    self._take(replacement, item)
+                    if role == 'president':
+                        self.presidencies[(user_id, item['date'], item['filiere'])] -= 1
+                        self.presidencies[(replacement, item['date'], item['filiere'])] += 1
+                    item['jury'].discard(user_id)
+                    item['jury'].add(replacement)
+                    item['added'][position] = (replacement, role)
+                    seats[user_id].remove((index, position))
+                    seats[replacement].append((index, position))
+                    self.swaps += 1
+                    improved = True
+                    break
+
+    def lower_bound(self):
+        """
+        Borne inférieure de la charge maximale: répartition parfaite des
+        places entre tous les enseignants, et des places réservées aux
+        Professeurs (présidences, participations imposées) entre Professeurs.
+        """
+        if not self.teachers:
+            return 0
+        bound = math.ceil(sum(self.load[pk] for pk in self.teachers) / len(self.teachers))
+        if self.professors:
+            professors = set(self.professors)
+            movable = sum(
+                1 for item in self.items for user_id, role in item.get('added', ())
+                if role == 'examiner' and user_id in professors
+            )
+            fixed = sum(self.load[pk] for pk in professors) - movable
+            bound = max(bound, math.ceil(fixed / len(professors)))
+        return bound
+
+    def solve(self):
+        """
+        Propose les jurys de toutes les soutenances.
+
+        Returns:
+            dict: {
+                'juries': [{'defense', 'president', 'rapporteurs', 'examiners',
+                            'added': [(User, rôle), ...], 'missing': [...],
+                            'defense_jury': jury enregistré dans DefenseJury}, ...],
+                'max_load': charge maximale, 'lower_bound': borne inférieure,
+                'elapsed': durée du calcul (secondes), 'swaps': échanges,
+            }
+        """
+        started = _time.perf_counter()
+
+        # Les soutenances ayant le moins de Professeurs libres sont servies d'abord
+        order = sorted(
+            range(len(self.items)),
+            key=lambda index: (
+                sum(1 for pk in self.professors if self._is_free(pk, self.items[index])),
+                self.items[index]['date'],
+                self.items[index]['start'],
+            )
+        )
+        for index in order:
+            self._compose(self.items[index])
+        self._rebalance()
+
+        juries = []
+        for item in self.items:
+            members = dict(item['members'])
+            members.update(dict(item['added']))
+            by_role = defaultdict(list)
+            for user_id, role in members.items():
+                by_role['rapporteur' if role in RAPPORTEUR_ROLES else role].append(self.teachers.get(user_id))
+            juries.append({
+                'defense': item['defense'],
+                'president': (by_role['president'] or [None])[0],
+                'rapporteurs': by_role['rapporteur'],
+                'examiners': by_role['examiner'],
+                'added': [(self.teachers.get(user_id), role) for user_id, role in item['added']],
+                'missing': item['missing'],
+                'defense_jury': item.get('defense_jury', False),
+            })
+
+        return {
+            'juries': juries,
+            'max_load': max((self.load[pk] for pk in self.teachers), default=0),
+            'lower_bound': self.lower_bound(),
+            'elapsed': _time.perf_counter() - started,
+            'swaps': self.swaps,
+        }
+
+
+def apply_juries(juries):
+    """
+    Enregistre les membres proposés dans la table de jury que la soutenance
+    utilise déjà (DefenseJury s'il est composé, sinon JuryMember), une
+    requête par table, puis envoie les invitations en une requête et
+    recalcule l'état de notation (bulk_create n'émet pas de signal).
+
+    Les membres déjà présents dans cette table sont ignorés: ils ne sont ni
+    invités ni comptés.
+
+    Returns:
+        int: nombre de membres ajoutés
+    """
+    from communications.notifications import dispatch
+    from communications.models import Notification
+    from .grading import refresh_grading_states
+    from .models import DefenseJury, JuryMember
+
+    # Dans JuryMember, le rapporteur est l'encadreur
+    jury_member_roles = {'president': 'president', 'rapporteur': 'supervisor', 'examiner': 'examiner'}
+    defense_ids = [jury['defense'].pk for jury in juries if jury['added']]
+
+    with transaction.atomic():
+        existing = set(JuryMember.objects.filter(defense__in=defense_ids).values_list('defense_id', 'user_id'))
+        existing_dj = set(DefenseJury.objects.filter(defense__in=defense_ids).values_list('defense_id', 'teacher_id'))
+
+        created = {DefenseJury: [], JuryMember: []}
+        notifications = []
+        for jury in juries:
+            defense = jury['defense']
+            taken = existing_dj if jury.get('defense_jury') else existing
+            for user, role in jury['added']:
+                if (defense.pk, user.pk) in taken:
+                    continue
+                taken.add((defense.pk, user.pk))
+                if jury.get('defense_jury'):
+                    member = DefenseJury(defense=defense, teacher=user, role=role)
+                else:
+                    member = JuryMember(
+                        defense=defense, user=user, role=jury_member_roles[role],
+                        is_president=role == 'president',
+                    )
+                created[type(member)].append(member)
+                notifications.append(Notification(
+                    user=user,
+                    type='defense',
+                    title='Invitation au jury',
+                    message=f"Vous avez été désigné comme {member.get_role_display()} pour la soutenance de "
+                            f"{defense.project.assignment.student.get_full_name()} le {defense.date.strftime('%d/%m/%Y')}.",
+                    link=f"/defenses/{defense.pk}/",
+                ))
+
+        DefenseJury.objects.bulk_create(created[DefenseJury])
+        JuryMember.objects.bulk_create(created[JuryMember])
+        dispatch(notifications)
+        refresh_grading_states({member.defense_id for members in created.values() for member in members})
+    return len(created[DefenseJury]) + len(created[JuryMember])
@@ -0,0 +1,178 @@
+"""
+Outils partagés par les commandes de benchmark des soutenances.
+
+Génère une session fictive (enseignants, étudiants, sujets, projets, salles,
+soutenances et jurys) avec bulk_create, à utiliser dans une transaction
+annulée en fin de commande.
+"""
+
+import random
+import time as _time
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from defenses.conflicts import from_minutes
+from defenses.models import Defense, JuryMember, Room
+from projects.models import Project
+from subjects.models import Assignment, Subject
+
+User = get_user_model()
+
+BENCH_FILIERES = ['GIT', 'GESI', 'GC', 'GM']
+DAY_START = 8 * 60
+DAY_END = 18 * 60
+
+
+def measure(func, *args, **kwargs):
+    """
+    Exécute une fonction en mesurant sa durée et le nombre de requêtes SQL.
+
+    Returns:
+        tuple: (résultat, durée en secondes, nombre de requêtes)
+    """
+    with CaptureQueriesContext(connection) as queries:
+        start = _time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = _time.perf_counter() - start
+    return result, elapsed, len(queries.captured_queries)
+
+
+def _created(objects, queryset):
+    """bulk_create ne renseigne pas les clés primaires sous MySQL: relire si besoin."""
+    if objects and objects[0].pk is None:
+        return list(queryset.order_by('pk'))
+    return objects
+
+
+def build_session(n_projects, n_teachers=150, n_rooms=20, days=5, start_date=None,
+                  schedule=True, jury_size=4, duration=45, seed=42):
+    """
+    Crée une session de soutenances fictive.
+
+    Args:
+        n_projects: nombre de projets prêts à soutenir
+        n_teachers: nombre d'enseignants (un quart sont Professeurs)
+        n_rooms: nombre de salles (limité par Room.ROOM_CHOICES)
+        days: nombre de jours de la session
+        start_date: premier jour (défaut: dans 30 jours)
+        schedule: si True, planifie les soutenances et leurs jurys au hasard
+        jury_size: taille des jurys générés
+        duration: durée d'une soutenance (minutes)
+
+    Returns:
+        dict: teachers, students, projects, rooms, defenses, dates
+    """
+    rng = random.Random(seed)
+    start_date = start_date or date.today() + timedelta(days=30)
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+
+    titles = ['assistant', 'maitre_assistant', 'maitre_conference', 'professeur']
+    teachers = User.objects.bulk_create([
+        User(
+            username=f'bench_teacher_{index}',
+            email=f'bench_teacher_{index}@enspd.cm',
+            first_name='Enseignant',
+            last_name=str(index),
+            role='teacher',
+            filiere=BENCH_FILIERES[index % len(BENCH_FILIERES)],
+            academic_title=titles[index % len(titles)],
+        )
+        for index in range(n_teachers)
+    ])
+    teachers = _created(teachers, User.objects.filter(username__startswith='bench_teacher_'))
+    students = User.objects.bulk_create([
+        User(
+            username=f'bench_student_{index}',
+            email=f'bench_student_{index}@enspd.cm',
+            first_name='Étudiant',
+            last_name=str(index),
+            role='student',
+            filiere=BENCH_FILIERES[index % len(BENCH_FILIERES)],
+            level='M2',
+        )
+        for index in range(n_projects)
+    ])
+    students = _created(students, User.objects.filter(username__startswith='bench_student_'))
+
+    subjects = Subject.objects.bulk_create([
+        Subject(
+            title=f'Sujet de benchmark {index}',
+            description='Sujet généré pour le benchmark',
+            filiere=student.filiere,
+            level='M2',
+            supervisor=teachers[index % n_teachers],
+            status='assigned',
+        )
+        for index, student in enumerate(students)
+    ])
+    subjects = _created(subjects, Subject.objects.filter(title__startswith='Sujet de benchmark'))
+    assignments = Assignment.objects.bulk_create([
+        Assignment(subject=subject, student=student, status='active')
+        for subject, student in zip(subjects, students)
+    ])
+    assignments = _created(
+        assignments,
+        Assignment.objects.filter(subject__in=subjects).select_related('subject')
+    )
+    projects = Project.objects.bulk_create([
+        Project(
+            assignment=assignment,
+            title=assignment.subject.title,
+            description=assignment.subject.description,
+            objectives=assignment.subject.description,
+            status='approved',
+        )
+        for assignment in assignments
+    ])
+    projects = _created(projects, Project.objects.filter(assignment__in=assignments))
+
+    names = [name for name, _ in Room.ROOM_CHOICES]
+    existing = set(Room.objects.values_list('name', flat=True))
+    Room.objects.bulk_create([
+        Room(name=name, capacity=40, filiere='GENERAL')
+        for name in names[:n_rooms] if name not in existing
+    ])
+    rooms = list(Room.objects.filter(name__in=names[:n_rooms]))
+
+    defenses = []
+    if schedule:
+        slots = [
+            (day, minute, room)
+            for day in dates
+            for minute in range(DAY_START, DAY_END - duration + 1, duration)
+            for room in rooms
+        ]
+        rng.shuffle(slots)
+        for project, (day, minute, room) in zip(projects, slots):
+            defenses.append(Defense(
+                project=project,
+                date=day,
+                time=from_minutes(minute),
+                end_time=from_minutes(minute + duration),
+                duration=duration,
+                room_obj=room,
+                status='scheduled',
+            ))
+        defenses = _created(
+            Defense.objects.bulk_create(defenses),
+            Defense.objects.filter(project__in=projects)
+        )
+
+        JuryMember.objects.bulk_create([
+            JuryMember(defense=defense, user=user, role='president' if position == 0 else 'examiner',
+                       is_president=position == 0)
+            for defense in defenses
+            for position, user in enumerate(rng.sample(teachers, jury_size))
+        ])
+
+    return {
+        'teachers': teachers,
+        'students': students,
+        'projects': projects,
+        'rooms': rooms,
+        'defenses': defenses,
+        'dates': dates,
+    }
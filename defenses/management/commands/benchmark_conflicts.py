@@ -0,0 +1,149 @@
+"""
+Commande Django comparant l'ancienne et la nouvelle détection de conflits.
+
+Usage:
+    python manage.py benchmark_conflicts
+    python manage.py benchmark_conflicts --defenses 600 --samples 100
+
+Une session fictive est générée dans une transaction annulée à la fin:
+aucune donnée n'est conservée.
+"""
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from defenses.conflicts import check_day_plan
+from defenses.models import Defense
+
+from ._benchmark import build_session, measure
+
+
+def legacy_room_conflict(defense):
+    """Ancienne implémentation de Defense.check_room_conflict (boucle Python)."""
+    if not defense.room_obj:
+        return []
+    end_time = defense.get_end_time()
+    conflicting = []
+    for other in Defense.objects.filter(
+        room_obj=defense.room_obj, date=defense.date, status='scheduled'
+    ).exclude(pk=defense.pk):
+        if not (defense.time >= other.get_end_time() or end_time <= other.time):
+            conflicting.append(other)
+    return conflicting
+
+
+def legacy_jury_conflicts(defense):
+    """Ancienne implémentation de Defense.check_jury_conflicts (une requête par soutenance)."""
+    jury_members = defense.jury_members.all().values_list('user', flat=True)
+    if not jury_members:
+        return []
+    end_time = defense.get_end_time()
+    conflicts = []
+    for other in Defense.objects.filter(date=defense.date, status='scheduled').exclude(pk=defense.pk):
+        if not (defense.time >= other.get_end_time() or end_time <= other.time):
+            other_jury = other.jury_members.all().values_list('user', flat=True)
+            common_members = set(jury_members) & set(other_jury)
+            if common_members:
+                conflicts.append({'defense': other, 'common_members': list(common_members)})
+    return conflicts
+
+
+def legacy_room_available(room, defense_date, defense_time, duration):
+    """Ancienne implémentation de Room.is_available_for_defense."""
+    end_time = (datetime.combine(defense_date, defense_time) + timedelta(minutes=duration)).time()
+    for conflict in Defense.objects.filter(room_obj=room, date=defense_date, status='scheduled'):
+        if not (defense_time >= conflict.get_end_time() or end_time <= conflict.time):
+            return False
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Compare les performances de la détection de conflits (ancienne vs nouvelle)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--defenses', type=int, default=300, help='Nombre de soutenances générées')
+        parser.add_argument('--days', type=int, default=2, help='Nombre de jours de la session')
+        parser.add_argument('--rooms', type=int, default=20, help='Nombre de salles')
+        parser.add_argument('--teachers', type=int, default=60, help="Nombre d'enseignants")
+        parser.add_argument('--samples', type=int, default=50, help='Nombre de soutenances vérifiées')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            session = build_session(
+                options['defenses'],
+                n_teachers=options['teachers'],
+                n_rooms=options['rooms'],
+                days=options['days'],
+            )
+            defenses = list(
+                Defense.objects.filter(pk__in=[d.pk for d in session['defenses']])
+                .select_related('room_obj')
+                .order_by('date', 'time')[:options['samples']]
+            )
+
+            self.stdout.write(self.style.SUCCESS('=' * 70))
+            self.stdout.write(self.style.SUCCESS(
+                f"   Benchmark conflits: {len(session['defenses'])} soutenances, "
+                f"{len(defenses)} vérifiées"
+            ))
+            self.stdout.write(self.style.SUCCESS('=' * 70))
+
+            checks = [
+                ('Conflits de salle', legacy_room_conflict, lambda d: d.check_room_conflict()),
+                ('Conflits de jury', legacy_jury_conflicts, lambda d: d.check_jury_conflicts()),
+                (
+                    'Disponibilité salle',
+                    lambda d: legacy_room_available(d.room_obj, d.date, d.time, d.duration),
+                    lambda d: d.room_obj.is_available_for_defense(d.date, d.time, d.duration),
+                ),
+            ]
+            for label, legacy, current in checks:
+                legacy_result, legacy_time, legacy_queries = measure(lambda: [legacy(d) for d in defenses])
+                result, elapsed, queries = measure(lambda: [current(d) for d in defenses])
+                self._report(label, legacy_time, legacy_queries, elapsed, queries)
+                if label != 'Conflits de jury':
+                    same = [bool(r) for r in legacy_result] == [bool(r) for r in result]
+                else:
+                    same = (
+                        [sorted(c['defense'].pk for c in r) for r in legacy_result]
+                        == [sorted(c['defense'].pk for c in r) for r in result]
+                    )
+                if not same:
+                    self.stdout.write(self.style.ERROR('   ❌ Résultats différents !'))
+
+            # Vérification d'une journée complète en une passe
+            day = session['dates'][0]
+            day_defenses = list(
+                Defense.objects.filter(date=day, status='scheduled')
+                .select_related('room_obj').prefetch_related('jury_members')
+            )
+            plan = [{
+                'key': defense.pk,
+                'defense_id': defense.pk,
+                'time': defense.time,
+                'duration': defense.duration,
+                'room': defense.room_obj_id,
+                'jury': [member.user_id for member in defense.jury_members.all()],
+            } for defense in day_defenses]
+
+            _, legacy_time, legacy_queries = measure(
+                lambda: [(legacy_room_conflict(d), legacy_jury_conflicts(d)) for d in day_defenses]
+            )
+            conflicts, elapsed, queries = measure(check_day_plan, day, plan)
+            self._report(
+                f'Journée complète ({len(plan)} créneaux)',
+                legacy_time, legacy_queries, elapsed, queries
+            )
+            self.stdout.write(f'   {len(conflicts)} conflit(s) détecté(s) dans la journée')
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé (données annulées)'))
+
+    def _report(self, label, legacy_time, legacy_queries, elapsed, queries):
+        speedup = legacy_time / elapsed if elapsed else float('inf')
+        self.stdout.write(f'\n📊 {label}')
+        self.stdout.write(f'   Ancien : {legacy_time * 1000:8.1f} ms  {legacy_queries:6d} requêtes')
+        self.stdout.write(f'   Nouveau: {elapsed * 1000:8.1f} ms  {queries:6d} requêtes  (x{speedup:.1f})')
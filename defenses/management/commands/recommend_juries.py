@@ -0,0 +1,95 @@
+"""
+Commande Django de composition automatique des jurys d'une session.
+
+Usage:
+    python manage.py recommend_juries --start 2026-06-15 --days 5
+    python manage.py recommend_juries --start 2026-06-15 --days 5 --filiere GIT --apply
+    python manage.py recommend_juries --benchmark 500
+
+Sans --apply, les jurys proposés sont seulement affichés.
+Avec --benchmark N, une session fictive de N soutenances sans jury et de 150
+enseignants est générée dans une transaction annulée afin de mesurer le
+temps de calcul.
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from defenses.jury_recommender import JuryRecommender, apply_juries
+
+
+class Command(BaseCommand):
+    help = 'Propose des jurys complets et équilibrés pour les soutenances programmées'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Premier jour de la session (AAAA-MM-JJ)')
+        parser.add_argument('--days', type=int, default=5, help='Nombre de jours de la session')
+        parser.add_argument('--filiere', help='Limiter à une filière (code, ex: GIT)')
+        parser.add_argument('--apply', action='store_true', help='Enregistrer les jurys proposés')
+        parser.add_argument('--benchmark', type=int, metavar='N', help='Mesurer sur N soutenances fictives')
+
+    def handle(self, *args, **options):
+        try:
+            start = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date()
+                if options['start'] else date.today() + timedelta(days=1)
+            )
+        except ValueError as e:
+            raise CommandError(f'Format invalide : {e}')
+        end = start + timedelta(days=options['days'] - 1)
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   👥 Composition automatique des jurys'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if options['benchmark']:
+            from ._benchmark import build_session
+
+            with transaction.atomic():
+                build_session(
+                    options['benchmark'], n_teachers=150, n_rooms=30,
+                    days=options['days'], start_date=start, jury_size=0,
+                )
+                self._solve(start, end, options['filiere'])
+                transaction.set_rollback(True)
+            self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé (données annulées)'))
+            return
+
+        result = self._solve(start, end, options['filiere'])
+
+        for jury in result['juries']:
+            defense = jury['defense']
+            added = ', '.join(f'{user.get_full_name()} ({role})' for user, role in jury['added']) or '—'
+            self.stdout.write(
+                f"   {defense.date:%d/%m/%Y} {defense.time:%H:%M}  {defense.project.title[:35]:<35}  + {added}"
+            )
+            for reason in jury['missing']:
+                self.stdout.write(self.style.WARNING(f'      ⚠️  {reason}'))
+
+        if options['apply']:
+            created = apply_juries(result['juries'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {created} membre(s) de jury enregistré(s)'))
+        else:
+            self.stdout.write(self.style.WARNING('ℹ️  Aperçu uniquement: relancez avec --apply pour enregistrer.'))
+
+    def _solve(self, start, end, filiere):
+        recommender = JuryRecommender.from_database(start, end, filiere=filiere)
+        result = recommender.solve()
+        incomplete = sum(1 for jury in result['juries'] if jury['missing'])
+
+        self.stdout.write(f"\n📊 Soutenances : {len(result['juries'])}")
+        self.stdout.write(
+            f"   Enseignants : {len(recommender.teachers)}  |  Professeurs : {len(recommender.professors)}"
+        )
+        self.stdout.write(
+            f"   Charge maximale : {result['max_load']}  (borne inférieure : {result['lower_bound']})"
+        )
+        if incomplete:
+            self.stdout.write(self.style.WARNING(f'   Jurys incomplets : {incomplete}'))
+        self.stdout.write(
+            f"   Temps de calcul : {result['elapsed'] * 1000:.1f} ms "
+            f"({result['swaps']} échange(s) d'équilibrage)\n"
+        )
+        return result
@@ -0,0 +1,99 @@
+"""
+Commande Django de planification automatique des soutenances.
+
+Usage:
+    python manage.py schedule_defenses --start 2026-06-15 --days 5
+    python manage.py schedule_defenses --start 2026-06-15 --days 5 --filiere GIT --apply
+    python manage.py schedule_defenses --benchmark 500
+
+Sans --apply, le planning calculé est seulement affiché.
+Avec --benchmark N, une session fictive de N projets est générée dans une
+transaction annulée afin de mesurer le temps de calcul.
+"""
+
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from defenses.scheduling import DEFAULT_DURATION, SessionScheduler, apply_schedule
+
+
+class Command(BaseCommand):
+    help = 'Calcule un planning sans conflit pour les projets prêts à soutenir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Premier jour de la session (AAAA-MM-JJ)')
+        parser.add_argument('--days', type=int, default=5, help='Nombre de jours de la session')
+        parser.add_argument('--duration', type=int, default=DEFAULT_DURATION, help='Durée d\'un créneau (minutes)')
+        parser.add_argument('--day-start', default='08:00', help='Heure de début des soutenances')
+        parser.add_argument('--day-end', default='18:00', help='Heure de fin des soutenances')
+        parser.add_argument('--filiere', help='Limiter à une filière (code, ex: GIT)')
+        parser.add_argument('--apply', action='store_true', help='Enregistrer les soutenances calculées')
+        parser.add_argument('--benchmark', type=int, metavar='N', help='Mesurer sur N projets fictifs')
+
+    def handle(self, *args, **options):
+        try:
+            start = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date()
+                if options['start'] else date.today() + timedelta(days=1)
+            )
+            day_start = datetime.strptime(options['day_start'], '%H:%M').time()
+            day_end = datetime.strptime(options['day_end'], '%H:%M').time()
+        except ValueError as e:
+            raise CommandError(f'Format invalide : {e}')
+
+        dates = [start + timedelta(days=offset) for offset in range(options['days'])]
+        scheduler_options = {
+            'duration': options['duration'],
+            'day_start': day_start,
+            'day_end': day_end,
+        }
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   📅 Planification automatique des soutenances'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if options['benchmark']:
+            from ._benchmark import build_session
+
+            with transaction.atomic():
+                build_session(
+                    options['benchmark'], n_teachers=150, n_rooms=30,
+                    days=options['days'], start_date=start, schedule=False,
+                )
+                result = self._solve(dates, options['filiere'], scheduler_options)
+                transaction.set_rollback(True)
+            self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé (données annulées)'))
+            return
+
+        result = self._solve(dates, options['filiere'], scheduler_options)
+
+        for placement in result['placements']:
+            self.stdout.write(
+                f"   {placement['date']:%d/%m/%Y} {placement['time']:%H:%M}  "
+                f"{placement['room'].name:<6}  {placement['project'].title[:40]:<40}  "
+                f"Président: {placement['president'].get_full_name()}"
+            )
+
+        if options['apply'] and result['placements']:
+            created = apply_schedule(result['placements'], duration=options['duration'])
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(created)} soutenance(s) enregistrée(s)'))
+        elif result['placements']:
+            self.stdout.write(self.style.WARNING('ℹ️  Aperçu uniquement: relancez avec --apply pour enregistrer.'))
+
+    def _solve(self, dates, filiere, scheduler_options):
+        scheduler = SessionScheduler.from_database(dates, filiere=filiere, **scheduler_options)
+        result = scheduler.solve()
+
+        self.stdout.write(f"\n📊 Projets à planifier : {len(scheduler.items)}")
+        self.stdout.write(f"   Salles : {len(scheduler.rooms)}  |  Présidents possibles : {len(scheduler.presidents)}")
+        self.stdout.write(f"   Jours : {len(dates)}  |  Créneaux par jour : {len(scheduler.slots)}")
+        self.stdout.write(self.style.SUCCESS(f"   Planifiés : {len(result['placements'])}"))
+        if result['unscheduled']:
+            self.stdout.write(self.style.WARNING(f"   Non planifiés : {len(result['unscheduled'])}"))
+        self.stdout.write(
+            f"   Temps de calcul : {result['elapsed'] * 1000:.1f} ms "
+            f"({result['backtracks']} retour(s) arrière)\n"
+        )
+        return result
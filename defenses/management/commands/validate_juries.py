@@ -0,0 +1,52 @@
+"""
+Commande Django de validation des jurys d'une session de soutenances.
+
+Usage:
+    python manage.py validate_juries --start 2026-06-15 --end 2026-06-19
+    python manage.py validate_juries --start 2026-06-15 --end 2026-06-19 --filiere GIT
+
+Toutes les soutenances de la période (hors annulées) sont vérifiées en une
+seule requête. La commande échoue si au moins un jury n'est pas conforme.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from defenses.composition import validate_session
+
+
+class Command(BaseCommand):
+    help = "Vérifie la composition des jurys de toutes les soutenances d'une période"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='Premier jour de la session (AAAA-MM-JJ)')
+        parser.add_argument('--end', required=True, help='Dernier jour de la session (AAAA-MM-JJ)')
+        parser.add_argument('--filiere', help='Limiter à une filière (code, ex: GIT)')
+
+    def handle(self, *args, **options):
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date()
+        except ValueError as e:
+            raise CommandError(f'Format invalide : {e}')
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   👥 Validation des jurys de la session'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        report = validate_session(start, end, filiere=options['filiere'])
+        invalid = [entry for entry in report if not entry['is_valid']]
+
+        for entry in invalid:
+            defense = entry['defense']
+            self.stdout.write(self.style.WARNING(
+                f"\n❌ {defense.date:%d/%m/%Y} {defense.time:%H:%M}  {defense.project.title[:50]}"
+            ))
+            for error in entry['errors']:
+                self.stdout.write(f'   - {error}')
+
+        self.stdout.write(f'\n📊 Soutenances vérifiées : {len(report)}')
+        if invalid:
+            raise CommandError(f'{len(invalid)} jury(s) non conforme(s)')
+        self.stdout.write(self.style.SUCCESS('✅ Tous les jurys sont conformes'))
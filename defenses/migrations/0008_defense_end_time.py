@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:09
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    """Calcule l'heure de fin des soutenances existantes."""
+    Defense = apps.get_model('defenses', 'Defense')
+    defenses = list(Defense.objects.all())
+    for defense in defenses:
+        start = datetime.combine(defense.date, defense.time)
+        defense.end_time = (start + timedelta(minutes=defense.duration)).time()
+    Defense.objects.bulk_update(defenses, ['end_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defenses', '0007_alter_room_options_alter_room_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='defense',
+            name='end_time',
+            field=models.TimeField(blank=True, editable=False, null=True, verbose_name='heure de fin'),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='defense',
+            index=models.Index(fields=['date', 'status', 'time'], name='defenses_de_date_6a75d7_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:32
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+def fill_grading_state(apps, schema_editor):
+    """Calcule l'état de notation des soutenances existantes."""
+    Defense = apps.get_model('defenses', 'Defense')
+    DefenseJury = apps.get_model('defenses', 'DefenseJury')
+    JuryMember = apps.get_model('defenses', 'JuryMember')
+
+    grades = {}
+    for model in (JuryMember, DefenseJury):
+        # Le jury de DefenseJury, s'il est composé, remplace celui de JuryMember
+        by_defense = {}
+        for defense_id, grade in model.objects.values_list('defense_id', 'grade'):
+            by_defense.setdefault(defense_id, []).append(grade)
+        grades.update(by_defense)
+
+    defenses = list(Defense.objects.filter(pk__in=list(grades)))
+    for defense in defenses:
+        members = grades[defense.pk]
+        graded = [grade for grade in members if grade is not None]
+        defense.graded_members_count = len(graded)
+        defense.is_fully_graded = len(graded) == len(members)
+        if defense.is_fully_graded:
+            defense.final_grade = (sum(graded) / len(graded)).quantize(Decimal('0.01'), ROUND_HALF_UP)
+        else:
+            # Comme defenses.grading: pas de note finale tant que le jury n'a pas tout noté
+            defense.final_grade = None
+    Defense.objects.bulk_update(
+        defenses, ['graded_members_count', 'is_fully_graded', 'final_grade'], batch_size=500
+    )
+    # Soutenances sans jury: aucune note finale
+    Defense.objects.exclude(pk__in=list(grades)).update(final_grade=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('defenses', '0008_defense_end_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='defense',
+            name='graded_members_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='membres ayant noté'),
+        ),
+        migrations.AddField(
+            model_name='defense',
+            name='is_fully_graded',
+            field=models.BooleanField(db_index=True, default=False, editable=False, verbose_name='complètement notée'),
+        ),
+        migrations.RunPython(fill_grading_state, migrations.RunPython.noop),
+    ]
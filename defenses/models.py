@@ -173,22 +173,8 @@ class Room(models.Model):
         if not self.is_available:
             return False
         
-        from datetime import datetime, timedelta
-        end_time = (datetime.combine(defense_date, defense_time) + timedelta(minutes=duration)).time()
-        
-        # Vérifier les conflits
-        conflicts = Defense.objects.filter(
-            room_obj=self,
-            date=defense_date,
-            status='scheduled'
-        )
-        
-        for conflict in conflicts:
-            conflict_end = conflict.get_end_time()
-            if not (defense_time >= conflict_end or end_time <= conflict.time):
-                return False
-        
-        return True
+        from .conflicts import find_room_conflicts
+        return not find_room_conflicts(self, defense_date, defense_time, duration).exists()
 
 
 class Defense(models.Model):
@@ -213,6 +199,9 @@ class Defense(models.Model):
     time = models.TimeField(_('heure'))
     duration = models.PositiveIntegerField(_('durée (minutes)'), default=30)
     
+    # Heure de fin stockée pour détecter les chevauchements en SQL
+    end_time = models.TimeField(_('heure de fin'), null=True, blank=True, editable=False)
+    
     room_obj = models.ForeignKey(
         Room,
         on_delete=models.SET_NULL,
@@ -252,6 +241,20 @@ class Defense(models.Model):
         validators=[MinValueValidator(0), MaxValueValidator(20)]
     )
     
+    # État de notation maintenu par defenses.grading à chaque note du jury
+    graded_members_count = models.PositiveSmallIntegerField(
+        _('membres ayant noté'),
+        default=0,
+        editable=False
+    )
+    
+    is_fully_graded = models.BooleanField(
+        _('complètement notée'),
+        default=False,
+        editable=False,
+        db_index=True
+    )
+    
     jury_comments = models.TextField(_('commentaires du jury'), blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -260,10 +263,29 @@ class Defense(models.Model):
         verbose_name = _('soutenance')
         verbose_name_plural = _('soutenances')
         ordering = ['date', 'time']
+        indexes = [
+            models.Index(fields=['date', 'status', 'time']),
+        ]
     
     def __str__(self):
         return f"{self.project.title} - {self.date} {self.time}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Date enregistrée: le planning du jour quitté est aussi invalidé
+        instance._stored_date = instance.__dict__.get('date')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Maintenir l'heure de fin stockée à jour
+        if self.date and self.time and self.duration is not None:
+            self.end_time = self.get_end_time()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and {'date', 'time', 'duration'} & set(update_fields):
+                kwargs['update_fields'] = set(update_fields) | {'end_time'}
+        super().save(*args, **kwargs)
+    
     def get_end_time(self):
         """Calcule l'heure de fin de la soutenance."""
         start = datetime.combine(self.date, self.time)
@@ -271,53 +293,19 @@ class Defense(models.Model):
         return end.time()
     
     def check_room_conflict(self):
-        """Vérifie les conflits de salle."""
+        """Vérifie les conflits de salle (une seule requête)."""
         if not self.room_obj:
             return []
         
-        end_time = self.get_end_time()
-        conflicts = Defense.objects.filter(
-            room_obj=self.room_obj,
-            date=self.date,
-            status='scheduled'
-        ).exclude(pk=self.pk)
-        
-        conflicting = []
-        for other in conflicts:
-            other_end = other.get_end_time()
-            # Vérifier chevauchement des horaires
-            if not (self.time >= other_end or end_time <= other.time):
-                conflicting.append(other)
-        
-        return conflicting
+        from .conflicts import find_room_conflicts
+        return list(find_room_conflicts(
+            self.room_obj, self.date, self.time, self.duration, exclude_pk=self.pk
+        ))
     
     def check_jury_conflicts(self):
         """Vérifie les conflits de jury (mêmes personnes, même horaire)."""
-        jury_members = self.jury_members.all().values_list('user', flat=True)
-        if not jury_members:
-            return []
-        
-        end_time = self.get_end_time()
-        other_defenses = Defense.objects.filter(
-            date=self.date,
-            status='scheduled'
-        ).exclude(pk=self.pk)
-        
-        conflicts = []
-        for other in other_defenses:
-            other_end = other.get_end_time()
-            # Vérifier chevauchement des horaires
-            if not (self.time >= other_end or end_time <= other.time):
-                # Vérifier si des membres du jury sont communs
-                other_jury = other.jury_members.all().values_list('user', flat=True)
-                common_members = set(jury_members) & set(other_jury)
-                if common_members:
-                    conflicts.append({
-                        'defense': other,
-                        'common_members': list(common_members)
-                    })
-        
-        return conflicts
+        from .conflicts import find_jury_conflicts
+        return find_jury_conflicts(self)
     
     def get_president(self):
         """Retourne le président du jury."""
@@ -325,23 +313,17 @@ class Defense(models.Model):
     
     def calculate_final_grade(self):
         """
-        Calcule la note finale comme moyenne simple des notes du jury.
+        Recalcule l'état de notation (note finale, membres ayant noté,
+        notation complète) et l'enregistre.
         Retourne None si toutes les notes ne sont pas saisies.
-        """
-        jury_members = self.jury_members.all()
         
-        if not jury_members.exists():
-            return None
-        
-        # Vérifier que tous les membres ont noté
-        grades = [member.grade for member in jury_members if member.grade is not None]
-        
-        if len(grades) != jury_members.count():
-            return None  # Toutes les notes pas encore saisies
-        
-        # Moyenne simple
-        avg_grade = sum(grades) / len(grades)
-        self.final_grade = round(avg_grade, 2)
+        Normalement inutile: l'état est maintenu à chaque note du jury.
+        """
+        from .grading import refresh_grading_state
+        state = refresh_grading_state(self.pk)
+        if state is not None:
+            for field, value in state.items():
+                setattr(self, field, value)
         return self.final_grade
     
     def validate_jury_composition(self):
@@ -350,45 +332,14 @@ class Defense(models.Model):
         - Standard: 1 président, 2 examinateurs, 1 rapporteur
         - Interdisciplinaire: 1 président, 2+ examinateurs, 2 rapporteurs
         
+        Pour valider toute une session, utiliser defenses.composition.validate_session.
+        
         Returns:
             tuple: (is_valid, errors_list)
         """
-        jury_members = self.jury_members.all()
-        errors = []
-        
-        # Compter par rôle
-        president_count = jury_members.filter(role='president').count()
-        examiner_count = jury_members.filter(role='examiner').count()
-        rapporteur_count = jury_members.filter(role='rapporteur').count()
-        
-        # Vérification président (toujours 1)
-        if president_count == 0:
-            errors.append("Un président est requis.")
-        elif president_count > 1:
-            errors.append("Un seul président est autorisé.")
-        
-        # Vérifier si projet interdisciplinaire
-        is_interdisciplinary = self.project.assignment.subject.is_interdisciplinary
-        
-        if is_interdisciplinary:
-            # Jury élargi: 2+ examinateurs, 2 rapporteurs
-            if examiner_count < 2:
-                errors.append("Un projet interdisciplinaire nécessite au moins 2 examinateurs.")
-            if rapporteur_count < 2:
-                errors.append("Un projet interdisciplinaire nécessite 2 rapporteurs (les encadreurs).")
-        else:
-            # Jury standard: 2 examinateurs, 1 rapporteur
-            if examiner_count < 2:
-                errors.append("Au moins 2 examinateurs sont requis.")
-            if rapporteur_count != 1:
-                errors.append("Exactement 1 rapporteur est requis (l'encadreur principal).")
-        
-        return (len(errors) == 0, errors)
-    
-    @property
-    def is_fully_graded(self):
-        """Vérifie si tous les membres du jury ont noté."""
-        return self.calculate_final_grade() is not None
+        from .composition import validate_defenses
+        result = validate_defenses(Defense.objects.filter(pk=self.pk))[0]
+        return (result['is_valid'], result['errors'])
     
     @property
     def can_be_graded(self):
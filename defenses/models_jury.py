@@ -175,38 +175,7 @@ def validate_jury_composition(defense):
     Returns:
         tuple: (is_valid, errors_list)
     """
-    jury_members = defense.jury_members.all()
-    errors = []
-    
-    # Compter par rôle
-    president_count = jury_members.filter(role='president').count()
-    examiner_count = jury_members.filter(role='examiner').count()
-    rapporteur_count = jury_members.filter(role='rapporteur').count()
-    
-    # Vérification président (toujours 1)
-    if president_count == 0:
-        errors.append("Un président est requis.")
-    elif president_count > 1:
-        errors.append("Un seul président est autorisé.")
-    
-    # Vérifier si projet interdisciplinaire
-    project = defense.project
-    is_interdisciplinary = project.assignment.subject.is_interdisciplinary
-    
-    if is_interdisciplinary:
-        # Jury élargi: 2 examinateurs, 2 rapporteurs
-        if examiner_count < 2:
-            errors.append("Un projet interdisciplinaire nécessite 2 examinateurs (un par filière).")
-        if rapporteur_count < 2:
-            errors.append("Un projet interdisciplinaire nécessite 2 rapporteurs (les 2 encadreurs).")
-    else:
-        # Jury standard: 2 examinateurs, 1 rapporteur
-        if examiner_count < 2:
-            errors.append("Au moins 2 examinateurs sont requis.")
-        if rapporteur_count != 1:
-            errors.append("Exactement 1 rapporteur est requis (l'encadreur principal).")
-    
-    return (len(errors) == 0, errors)
+    return defense.validate_jury_composition()
 
 
 def check_president_availability(teacher, defense_date, department):
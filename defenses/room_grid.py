@@ -0,0 +1,190 @@
+# defenses/room_grid.py
+# Grille d'occupation des salles (salles x créneaux horaires), par jour
+#
+# L'occupation de la période affichée (un jour ou une semaine) est chargée en
+# une requête et rangée par jour et par salle; chaque ligne de la grille est
+# une suite de cellules "libre" ou "soutenance" avec leur largeur en créneaux.
+# Le HTML de la grille est mis en cache par période (cache partagé, voir
+# CACHES): chaque jour a sa propre version, incrémentée dès qu'une soutenance
+# de ce jour change, ou que le titre de son projet ou le nom de son étudiant
+# change.
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.template.loader import render_to_string
+
+from config.cache import bump_version, cached
+
+from .conflicts import from_minutes, to_minutes
+
+# Largeur d'une colonne de la grille (minutes)
+GRID_STEP = 15
+
+# Plage horaire affichée par défaut (élargie si une soutenance en déborde)
+GRID_DAY_START = 8 * 60
+GRID_DAY_END = 18 * 60
+
+# Durée de validité d'une grille en cache (secondes)
+ROOM_GRID_CACHE_TIMEOUT = 3600
+
+PERIOD_DAYS = {'day': 1, 'week': 7}
+
+
+def invalidate_room_grid(*dates):
+    """Invalide les grilles en cache qui couvrent ces jours (appelé par les signaux)."""
+    for day in set(dates):
+        if day:
+            bump_version(f'room_grid:{day.isoformat()}')
+
+
+def invalidate_project_room_grids(projects):
+    """
+    Invalide les grilles des jours où passent ces projets: les cellules
+    affichent le titre du projet et le nom de l'étudiant (une requête).
+    """
+    from .models import Defense
+
+    invalidate_room_grid(*Defense.objects.filter(project__in=projects).values_list('date', flat=True).distinct())
+
+
+def invalidate_all_room_grids():
+    """Invalide toutes les grilles en cache (salle modifiée)."""
+    bump_version('room_grid')
+
+
+def load_occupancy(start_date, end_date, rooms):
+    """
+    Soutenances non annulées de la période, par jour et par salle (une requête).
+
+    Returns:
+        dict: {date: {room_id: [dict, ...]}} avec pour chaque soutenance pk,
+        time, start, end (minutes), status, title et student
+    """
+    from .models import Defense
+
+    rows = Defense.objects.filter(
+        date__range=(start_date, end_date),
+        room_obj__in=rooms,
+    ).exclude(status='cancelled').order_by('date', 'time').values(
+        'pk', 'room_obj_id', 'date', 'time', 'duration', 'status', 'project__title',
+        'project__assignment__student__first_name', 'project__assignment__student__last_name',
+    )
+
+    occupancy = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        start = to_minutes(row['time'])
+        occupancy[row['date']][row['room_obj_id']].append({
+            'pk': row['pk'],
+            'time': row['time'],
+            'start': start,
+            'end': start + row['duration'],
+            'status': row['status'],
+            'title': row['project__title'],
+            'student': ' '.join(filter(None, [
+                row['project__assignment__student__first_name'],
+                row['project__assignment__student__last_name'],
+            ])),
+        })
+    return occupancy
+
+
+def _day_bounds(day_rooms):
+    """Plage horaire de la journée, alignée sur l'heure."""
+    first, last = GRID_DAY_START, GRID_DAY_END
+    for defenses in day_rooms.values():
+        for defense in defenses:
+            first = min(first, defense['start'] // 60 * 60)
+            last = max(last, -(-defense['end'] // 60) * 60)
+    return first, last
+
+
+def build_row(defenses, first, last):
+    """
+    Cellules d'une ligne de la grille: plages libres fusionnées et soutenances.
+
+    Les soutenances qui se chevauchent dans une même salle sont regroupées
+    dans une seule cellule marquée en conflit.
+    """
+    cells = []
+    column = 0
+    for defense in defenses:
+        start = max((defense['start'] - first) // GRID_STEP, 0)
+        end = -(-(min(defense['end'], last) - first) // GRID_STEP)
+        if start < column and cells and cells[-1]['defenses']:
+            # Chevauchement avec la soutenance précédente
+            previous = cells[-1]
+            previous['defenses'].append(defense)
+            previous['conflict'] = True
+            previous['span'] += max(end - column, 0)
+            column = max(column, end)
+            continue
+        start = max(start, column)
+        if start > column:
+            cells.append({'span': start - column, 'defenses': []})
+        cells.append({
+            'span': max(end - start, 1),
+            'defenses': [defense],
+            'conflict': False,
+        })
+        column = start + max(end - start, 1)
+    total = (last - first) // GRID_STEP
+    if column < total:
+        cells.append({'span': total - column, 'defenses': []})
+    return cells
+
+
+def build_grid(start_date, days, rooms):
+    """
+    Grille d'occupation de `days` jours à partir de `start_date`.
+
+    Returns:
+        list: [{'date', 'hours': [(time, span), ...], 'rows': [{'room', 'cells', 'count'}]}]
+    """
+    rooms = list(rooms)
+    end_date = start_date + timedelta(days=days - 1)
+    occupancy = load_occupancy(start_date, end_date, rooms)
+
+    grid = []
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        day_rooms = occupancy.get(day, {})
+        first, last = _day_bounds(day_rooms)
+        grid.append({
+            'date': day,
+            'count': sum(len(defenses) for defenses in day_rooms.values()),
+            'hours': [(from_minutes(minute), 60 // GRID_STEP) for minute in range(first, last, 60)],
+            'rows': [
+                {
+                    'room': room,
+                    'cells': build_row(day_rooms.get(room.pk, []), first, last),
+                    'count': len(day_rooms.get(room.pk, [])),
+                }
+                for room in rooms
+            ],
+        })
+    return grid
+
+
+def render_room_grid(start_date, period, rooms, rooms_key):
+    """
+    HTML de la grille d'une période, depuis le cache.
+
+    Args:
+        period: 'day' ou 'week'
+        rooms: salles affichées (évaluées seulement si la grille est recalculée)
+        rooms_key: identifiant stable de la sélection de salles (clé de cache)
+    """
+    days = PERIOD_DAYS[period]
+    dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    key = f'{start_date.isoformat()}:{days}:{rooms_key}'
+
+    def compute():
+        return render_to_string('defenses/room_grid.html', {
+            'grid': build_grid(start_date, days, rooms),
+        })
+
+    return cached(
+        'room_grid', key, compute, ROOM_GRID_CACHE_TIMEOUT,
+        depends_on=[f'room_grid:{day.isoformat()}' for day in dates],
+    )
@@ -0,0 +1,158 @@
+# defenses/room_slots.py
+# Recherche des créneaux libres des salles de soutenance
+#
+# L'occupation de toutes les salles sur la période est chargée en une seule
+# requête, puis rangée en mémoire par salle et par jour (intervalles triés et
+# fusionnés). Les créneaux libres sont les débuts de créneau, alignés sur une
+# grille régulière, qui tiennent entièrement dans un intervalle libre.
+
+from collections import defaultdict
+from datetime import time, timedelta
+
+from django.db.models import Q
+
+from users.availability import FULL_DAY, AvailabilityIndex, span_mask
+
+from .conflicts import from_minutes, to_minutes
+from .scheduling import DEFAULT_DURATION
+
+# Pas de la grille des débuts de créneau (minutes)
+SLOT_STEP = 15
+
+# Période maximale couverte par une recherche (jours)
+MAX_RANGE_DAYS = 31
+
+
+def candidate_rooms(building=None, floor=None, filiere=None):
+    """
+    Salles disponibles filtrées selon la nomenclature (ex: 15BS1) et la filière.
+
+    Args:
+        building: 'BS' ou 'BP'
+        floor: '1' ou '2'
+        filiere: code filière; les salles générales sont incluses
+    """
+    from .models import Room
+
+    rooms = Room.objects.filter(is_available=True).order_by('name')
+    if building:
+        rooms = rooms.filter(name__contains=building.upper())
+    if floor:
+        rooms = rooms.filter(name__endswith=str(floor))
+    if filiere:
+        rooms = rooms.filter(Q(filiere=filiere) | Q(filiere='GENERAL'))
+    return rooms
+
+
+def merge_intervals(intervals):
+    """Fusionne des intervalles (début, fin) en minutes qui se chevauchent ou se touchent."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(interval) for interval in merged]
+
+
+class RoomOccupancy:
+    """
+    Occupation en mémoire des salles sur une période.
+
+    timeline[(room_id, date)] = [(début, fin), ...] en minutes, triés et fusionnés.
+    """
+
+    def __init__(self, start_date, end_date, rows=()):
+        self.start_date = start_date
+        self.end_date = end_date
+        busy = defaultdict(list)
+        for room_id, defense_date, start_time, duration in rows:
+            start = to_minutes(start_time)
+            busy[(room_id, defense_date)].append((start, start + duration))
+        self.timeline = {key: merge_intervals(intervals) for key, intervals in busy.items()}
+
+    @classmethod
+    def load(cls, start_date, end_date, rooms=None, exclude_pk=None):
+        """
+        Charge les soutenances planifiées de la période (une seule requête).
+
+        Args:
+            rooms: limiter à ces salles (QuerySet ou liste d'identifiants)
+            exclude_pk: soutenance à ignorer (soutenance en cours de déplacement)
+        """
+        from .models import Defense
+
+        defenses = Defense.objects.filter(
+            date__range=(start_date, end_date),
+            status='scheduled',
+            room_obj__isnull=False,
+        )
+        if rooms is not None:
+            defenses = defenses.filter(room_obj__in=rooms)
+        if exclude_pk:
+            defenses = defenses.exclude(pk=exclude_pk)
+        return cls(start_date, end_date, defenses.values_list('room_obj_id', 'date', 'time', 'duration'))
+
+    def busy(self, room_id, day):
+        """Intervalles occupés d'une salle pour un jour."""
+        return self.timeline.get((room_id, day), [])
+
+    def free_starts(self, room_id, day, duration, day_start, day_end, step=SLOT_STEP):
+        """Débuts de créneau libres (minutes) d'une salle pour un jour."""
+        starts = []
+        candidate = day_start
+        for busy_start, busy_end in self.busy(room_id, day) + [(day_end, day_end)]:
+            while candidate + duration <= min(busy_start, day_end):
+                starts.append(candidate)
+                candidate += step
+            if busy_end > candidate:
+                # Reprendre sur la grille après la fin de l'occupation
+                candidate += -(-(busy_end - candidate) // step) * step
+        return starts
+
+
+def find_free_slots(start_date, end_date, duration=DEFAULT_DURATION, building=None, floor=None,
+                    filiere=None, day_start=time(8, 0), day_end=time(18, 0), step=SLOT_STEP,
+                    exclude_pk=None, limit=None, teachers=None):
+    """
+    Créneaux (salle, date, heure) libres sur une période.
+
+    Deux requêtes au total: les salles candidates et l'occupation de la période,
+    plus une pour les disponibilités si `teachers` (ids des enseignants qui
+    doivent tous être disponibles, voir users.availability) est fourni.
+
+    Returns:
+        list: [{'room': Room, 'date': date, 'time': time, 'end_time': time}, ...]
+        triés par date, heure puis salle
+    """
+    rooms = list(candidate_rooms(building, floor, filiere))
+    occupancy = RoomOccupancy.load(
+        start_date, end_date, rooms=[room.pk for room in rooms], exclude_pk=exclude_pk
+    )
+    first, last = to_minutes(day_start), to_minutes(day_end)
+    availability = AvailabilityIndex.load(teachers, start_date, end_date) if teachers else None
+
+    slots = []
+    day = start_date
+    while day <= end_date:
+        common = availability.common_mask(teachers, day) if availability else FULL_DAY
+        day_slots = []
+        for room in rooms:
+            for start in occupancy.free_starts(room.pk, day, duration, first, last, step):
+                if common != FULL_DAY:
+                    needed = span_mask(from_minutes(start), duration)
+                    if needed is None or common & needed != needed:
+                        continue
+                day_slots.append((start, room.name, room))
+        day_slots.sort(key=lambda slot: slot[:2])
+        for start, _name, room in day_slots:
+            slots.append({
+                'room': room,
+                'date': day,
+                'time': from_minutes(start),
+                'end_time': from_minutes(start + duration),
+            })
+            if limit and len(slots) >= limit:
+                return slots
+        day += timedelta(days=1)
+    return slots
@@ -0,0 +1,309 @@
+# defenses/scheduling.py
+# Planification automatique des soutenances d'une session
+
+import time as _time
+from collections import defaultdict
+from datetime import time
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .conflicts import DaySchedule, from_minutes, to_minutes
+
+# Limite de présidences par jour et par filière (voir check_president_availability)
+PRESIDENCY_LIMIT = 4
+
+# Durée par défaut d'un créneau: présentation, questions et installation
+DEFAULT_DURATION = 45
+
+# Nombre de présidents alternatifs essayés par créneau avant de passer au suivant
+PRESIDENT_CHOICES = 3
+
+
+def projects_ready_for_defense(filiere=None):
+    """
+    Projets prêts à soutenir et sans soutenance: projet approuvé ou mémoire
+    approuvé par l'encadreur.
+    """
+    from projects.models import Project
+
+    projects = Project.objects.filter(
+        defense__isnull=True
+    ).filter(
+        Q(status='approved') | Q(thesis_approved_by_supervisor=True)
+    ).select_related(
+        'assignment__student',
+        'assignment__subject__supervisor',
+        'assignment__subject__co_supervisor',
+    ).order_by('pk')
+
+    if filiere:
+        projects = projects.filter(assignment__subject__filiere=filiere)
+    return projects
+
+
+class SessionScheduler:
+    """
+    Solveur de planning pour une session de soutenances.
+
+    Chaque projet reçoit une date, une heure, une salle et un président de
+    jury. Contraintes respectées:
+    - une salle n'accueille qu'une soutenance à la fois;
+    - l'encadreur (et le co-encadreur) et le président ne sont pas déjà
+      occupés sur le créneau, y compris par des soutenances déjà planifiées;
+    - le président est un Professeur, différent des encadreurs, avec au plus
+      4 présidences par jour et par filière;
+    - la salle est celle de la filière du sujet ou une salle générale.
+
+    L'algorithme est un glouton avec retour arrière chronologique: les projets
+    les plus contraints (encadreurs les plus chargés) sont placés en premier
+    sur le premier créneau valide; en cas d'impasse, le projet précédent est
+    déplacé sur son créneau suivant, dans la limite de `max_backtracks`.
+    """
+
+    def __init__(self, projects, rooms, presidents, dates, duration=DEFAULT_DURATION,
+                 day_start=time(8, 0), day_end=time(18, 0), max_backtracks=2000):
+        self.dates = list(dates)
+        self.duration = duration
+        self.max_backtracks = max_backtracks
+        self.slots = list(range(
+            to_minutes(day_start), to_minutes(day_end) - duration + 1, duration
+        ))
+
+        self.rooms = {room.pk: room for room in rooms}
+        self.presidents = {teacher.pk: teacher for teacher in presidents}
+        self.rooms_by_filiere = defaultdict(list)
+        for room in rooms:
+            self.rooms_by_filiere[room.filiere].append(room.pk)
+
+        self.items = []
+        for project in projects:
+            subject = project.assignment.subject
+            attendees = [subject.supervisor_id]
+            if subject.co_supervisor_id:
+                attendees.append(subject.co_supervisor_id)
+            self.items.append({
+                'project': project,
+                'filiere': subject.filiere,
+                'attendees': attendees,
+            })
+
+        # Occupation: (date, ressource) -> [(début, fin), ...]
+        self.busy = defaultdict(list)
+        # Présidences: (enseignant, date, filière) -> nombre
+        self.presidencies = defaultdict(int)
+        self.president_load = defaultdict(int)
+        self.backtracks = 0
+
+    @classmethod
+    def from_database(cls, dates, filiere=None, **options):
+        """
+        Construit le solveur à partir de la base: projets prêts, salles
+        disponibles, Professeurs et occupation existante des journées.
+        """
+        from users.models import User
+        from .models import DefenseJury, JuryMember, Room
+
+        rooms = Room.objects.filter(is_available=True).order_by('name')
+        if filiere:
+            rooms = rooms.filter(Q(filiere=filiere) | Q(filiere='GENERAL'))
+        presidents = User.objects.filter(
+            role='teacher', academic_title='professeur', is_active=True
+        ).order_by('pk')
+
+        scheduler = cls(
+            list(projects_ready_for_defense(filiere)), list(rooms), list(presidents), dates,
+            **options
+        )
+
+        for day in scheduler.dates:
+            for entry in DaySchedule.load(day).entries:
+                scheduler._occupy(day, entry['start'], entry['end'], entry['room_id'], entry['jury'])
+
+        department = 'project__assignment__subject__filiere'
+        counts = list(DefenseJury.objects.filter(
+            role='president', defense__date__in=scheduler.dates
+        ).values_list('teacher_id', 'defense__date', f'defense__{department}').annotate(
+            total=Count('pk')
+        ))
+        counts += list(JuryMember.objects.filter(
+            is_president=True, defense__date__in=scheduler.dates, defense__status='scheduled'
+        ).values_list('user_id', 'defense__date', f'defense__{department}').annotate(
+            total=Count('pk')
+        ))
+        for teacher_id, day, dept, total in counts:
+            scheduler.presidencies[(teacher_id, day, dept)] += total
+            scheduler.president_load[teacher_id] += total
+
+        return scheduler
+
+    def _occupy(self, day, start, end, room_id, people):
+        if room_id:
+            self.busy[(day, ('room', room_id))].append((start, end))
+        for user_id in people:
+            self.busy[(day, ('user', user_id))].append((start, end))
+
+    def _release(self, day, start, end, room_id, people):
+        if room_id:
+            self.busy[(day, ('room', room_id))].remove((start, end))
+        for user_id in people:
+            self.busy[(day, ('user', user_id))].remove((start, end))
+
+    def _is_free(self, day, resource, start, end):
+        return all(
+            busy_end <= start or busy_start >= end
+            for busy_start, busy_end in self.busy.get((day, resource), ())
+        )
+
+    def _candidate_rooms(self, filiere):
+        return self.rooms_by_filiere.get(filiere, []) + self.rooms_by_filiere.get('GENERAL', [])
+
+    def _candidates(self, item):
+        """Génère les affectations valides (date, début, salle, président) d'un projet."""
+        rooms = self._candidate_rooms(item['filiere'])
+        attendees = item['attendees']
+        for day in self.dates:
+            for start in self.slots:
+                end = start + self.duration
+                if not all(self._is_free(day, ('user', user_id), start, end) for user_id in attendees):
+                    continue
+                room_id = next(
+                    (pk for pk in rooms if self._is_free(day, ('room', pk), start, end)), None
+                )
+                if room_id is None:
+                    continue
+                presidents = sorted(
+                    (
+                        pk for pk in self.presidents
+                        if pk not in attendees
+                        and self.presidencies[(pk, day, item['filiere'])] < PRESIDENCY_LIMIT
+                        and self._is_free(day, ('user', pk), start, end)
+                    ),
+                    key=lambda pk: (self.president_load[pk], pk)
+                )
+                for president_id in presidents[:PRESIDENT_CHOICES]:
+                    yield (day, start, room_id, president_id)
+
+    def _assign(self, item, value):
+        day, start, room_id, president_id = value
+        self._occupy(day, start, start + self.duration, room_id, item['attendees'] + [president_id])
+        self.presidencies[(president_id, day, item['filiere'])] += 1
+        self.president_load[president_id] += 1
+
+    def _unassign(self, item, value):
+        day, start, room_id, president_id = value
+        self._release(day, start, start + self.duration, room_id, item['attendees'] + [president_id])
+        self.presidencies[(president_id, day, item['filiere'])] -= 1
+        self.president_load[president_id] -= 1
+
+    def solve(self):
+        """
+        Calcule le planning.
+
+        Returns:
+            dict: {
+                'placements': [{'project', 'date', 'time', 'end_time', 'room', 'president'}, ...],
+                'unscheduled': [Project, ...],
+                'elapsed': durée du calcul (secondes),
+                'backtracks': nombre de retours arrière,
+            }
+        """
+        started = _time.perf_counter()
+
+        supervisor_load = defaultdict(int)
+        for item in self.items:
+            for user_id in item['attendees']:
+                supervisor_load[user_id] += 1
+        order = sorted(
+            self.items,
+            key=lambda item: (
+                -max(supervisor_load[user_id] for user_id in item['attendees']),
+                len(self._candidate_rooms(item['filiere'])),
+                item['project'].pk,
+            )
+        )
+
+        count = len(order)
+        generators = [None] * count
+        values = [None] * count
+        skipped = [False] * count
+        index = 0
+        while index < count:
+            if generators[index] is None:
+                generators[index] = self._candidates(order[index])
+            value = next(generators[index], None)
+            if value is not None:
+                self._assign(order[index], value)
+                values[index] = value
+                index += 1
+                continue
+
+            generators[index] = None
+            previous = index - 1
+            while previous >= 0 and skipped[previous]:
+                previous -= 1
+            if previous >= 0 and self.backtracks < self.max_backtracks:
+                # Impasse: déplacer le projet précédent sur son créneau suivant
+                self.backtracks += 1
+                self._unassign(order[previous], values[previous])
+                values[previous] = None
+                index = previous
+            else:
+                # Aucun créneau possible: le projet reste à planifier manuellement
+                skipped[index] = True
+                index += 1
+
+        placements = []
+        unscheduled = []
+        for item, value in zip(order, values):
+            if value is None:
+                unscheduled.append(item['project'])
+                continue
+            day, start, room_id, president_id = value
+            placements.append({
+                'project': item['project'],
+                'date': day,
+                'time': from_minutes(start),
+                'end_time': from_minutes(start + self.duration),
+                'room': self.rooms[room_id],
+                'president': self.presidents[president_id],
+            })
+        placements.sort(key=lambda p: (p['date'], p['time'], p['room'].name))
+
+        return {
+            'placements': placements,
+            'unscheduled': unscheduled,
+            'elapsed': _time.perf_counter() - started,
+            'backtracks': self.backtracks,
+        }
+
+
+def apply_schedule(placements, duration=DEFAULT_DURATION):
+    """
+    Enregistre un planning calculé: crée les soutenances et ajoute au jury le
+    président et l'encadreur (les notifications habituelles sont envoyées).
+
+    Returns:
+        list: soutenances créées
+    """
+    from .models import Defense, JuryMember
+
+    created = []
+    with transaction.atomic():
+        for placement in placements:
+            project = placement['project']
+            defense = Defense.objects.create(
+                project=project,
+                date=placement['date'],
+                time=placement['time'],
+                duration=duration,
+                room_obj=placement['room'],
+                room=placement['room'].name,
+                status='scheduled',
+            )
+            JuryMember.objects.create(defense=defense, user=placement['president'], role='president')
+            JuryMember.objects.create(
+                defense=defense, user=project.assignment.subject.supervisor, role='supervisor'
+            )
+            created.append(defense)
+    return created
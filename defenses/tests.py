@@ -1,3 +1,45 @@
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from users.models import User
+
+from .management.commands._benchmark import build_session
+
+
+class DefenseViewQueryBudgetTests(TestCase):
+    """Les pages de soutenances font un nombre de requêtes fixe, indépendant du volume."""
+
+    # Requêtes par page, session et utilisateur connecté compris
+    LIST_BUDGET = 4
+    PLANNING_BUDGET = 5
+    DETAIL_BUDGET = 4
+
+    def _queries(self, url_name, n_projects, jury_size=4, detail=False):
+        """Nombre de requêtes d'une page sur une session fictive (annulée ensuite)."""
+        with transaction.atomic():
+            session = build_session(n_projects, n_teachers=12, n_rooms=4, jury_size=jury_size)
+            admin = User.objects.create_user('admin_budget', 'admin_budget@enspd.cm', 'x', role='admin_general')
+            self.client.force_login(admin)
+            args = [session['defenses'][0].pk] if detail else []
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(url_name, args=args))
+            self.assertEqual(response.status_code, 200)
+            transaction.set_rollback(True)
+        return len(queries)
+
+    def test_list_query_count_is_constant(self):
+        for n_projects in (3, 30):
+            self.assertEqual(self._queries('defenses:list', n_projects), self.LIST_BUDGET)
+
+    def test_planning_query_count_is_constant(self):
+        for n_projects in (3, 30):
+            self.assertEqual(self._queries('defenses:planning', n_projects), self.PLANNING_BUDGET)
+
+    def test_detail_query_count_is_constant(self):
+        for n_projects, jury_size in ((3, 2), (30, 6)):
+            self.assertEqual(
+                self._queries('defenses:detail', n_projects, jury_size=jury_size, detail=True),
+                self.DETAIL_BUDGET
+            )
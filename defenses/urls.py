@@ -7,10 +7,15 @@ urlpatterns = [
     path('', views.defense_list_view, name='list'),
     path('', views.defense_list_view, name='defense_list'),  # Alias
     path('calendar/', views.defense_calendar_view, name='calendar'),
+    path('calendar/<str:token>.ics', views.calendar_feed_view, name='calendar_feed'),
     path('planning/', views.defense_planning_view, name='planning'),
     path('planning/', views.defense_planning_view, name='defense_planning'),  # Alias
+    path('planning/auto/', views.defense_auto_schedule_view, name='auto_schedule'),
+    path('planning/juries/', views.jury_validation_view, name='jury_validation'),
+    path('planning/juries/recommend/', views.jury_recommendation_view, name='jury_recommendation'),
     path('room-schedule/', views.room_schedule_view, name='room_schedule'),
     path('rooms/', views.room_list_view, name='room_list'),
+    path('rooms/free-slots/', views.room_free_slots_view, name='room_free_slots'),
     path('rooms/create/', views.room_create_view, name='room_create'),
     path('rooms/<int:pk>/edit/', views.room_edit_view, name='room_edit'),
     path('rooms/<int:pk>/delete/', views.room_delete_view, name='room_delete'),
@@ -22,4 +27,5 @@ urlpatterns = [
     path('<int:defense_id>/request-change/', views.defense_change_request_create_view, name='request_change'),
     path('change-requests/<int:pk>/review/', views.defense_change_request_review_view, name='review_change_request'),
     path('<int:pk>/grade/', views.grade_defense_view, name='grade_defense'),
+    path('grading/', views.grading_sheet_view, name='grading_sheet'),
 ]
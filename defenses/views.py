@@ -1,12 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, Count
 from django.utils import timezone
 from datetime import datetime
 from .models import Defense, JuryMember, DefenseEvaluation, DefenseChangeRequest, Room
 from .forms import (DefenseForm, JuryMemberForm, DefenseEvaluationForm,
-                    DefenseUpdateForm, DefenseChangeRequestForm, DefenseChangeReviewForm, RoomForm)
+                    DefenseUpdateForm, DefenseChangeRequestForm, DefenseChangeReviewForm, RoomForm,
+                    AutoScheduleForm, JuryValidationForm)
 from projects.models import Project
 
 @login_required
@@ -32,6 +33,7 @@ def defense_list_view(request):
     room_id = request.GET.get('room')
     date_filter = request.GET.get('date')
     status_filter = request.GET.get('status')
+    graded_filter = request.GET.get('graded')
     
     if room_id:
         defenses = defenses.filter(room_obj_id=room_id)
@@ -46,7 +48,16 @@ def defense_list_view(request):
     if status_filter:
         defenses = defenses.filter(status=status_filter)
     
-    defenses = defenses.select_related('project', 'room_obj').order_by('-date', '-time')
+    if graded_filter in ('0', '1'):
+        defenses = defenses.filter(is_fully_graded=graded_filter == '1')
+    
+    # Requêtes constantes quel que soit le nombre de soutenances
+    defenses = defenses.select_related(
+        'project__assignment__student', 'room_obj'
+    ).annotate(
+        jury_member_count=Count('jury_members', distinct=True),
+        defense_jury_count=Count('defense_jury_members', distinct=True),
+    ).order_by('-date', '-time')
     
     # Listes pour les filtres
     rooms = Room.objects.filter(is_available=True).order_by('filiere', 'name')
@@ -57,29 +68,39 @@ def defense_list_view(request):
         'selected_room': room_id,
         'selected_date': date_filter,
         'selected_status': status_filter,
+        'selected_graded': graded_filter,
     }
     return render(request, 'defenses/defense_list.html', context)
 
 
 @login_required
 def defense_detail_view(request, pk):
-    """Détails d'une soutenance"""
-    defense = get_object_or_404(Defense, pk=pk)
+    """Détails d'une soutenance (nombre de requêtes constant)"""
+    defense = get_object_or_404(
+        Defense.objects.select_related(
+            'project__assignment__student',
+            'project__assignment__subject__supervisor',
+            'room_obj',
+            'evaluation',
+        ),
+        pk=pk
+    )
+    assignment = defense.project.assignment
     
     # Vérifier les permissions
     can_view = False
     if request.user.role in ['admin_filiere', 'admin_general', 'jury']:
         can_view = True
-    elif request.user.role == 'student' and defense.project.assignment.student == request.user:
+    elif request.user.role == 'student' and assignment.student_id == request.user.pk:
         can_view = True
-    elif request.user.role == 'teacher' and defense.project.assignment.subject.supervisor == request.user:
+    elif request.user.role == 'teacher' and assignment.subject.supervisor_id == request.user.pk:
         can_view = True
     
     if not can_view:
         messages.error(request, "Vous n'êtes pas autorisé à voir cette soutenance.")
         return redirect('defenses:list')
     
-    jury_members = defense.jury_members.all()
+    jury_members = list(defense.jury_members.select_related('user'))
     
     # Récupérer l'évaluation si elle existe
     try:
@@ -94,6 +115,7 @@ def defense_detail_view(request, pk):
     context = {
         'defense': defense,
         'jury_members': jury_members,
+        'is_jury_member': any(jm.user_id == request.user.pk for jm in jury_members),
         'evaluation': evaluation,
         'avg_grade': avg_grade,
     }
@@ -202,14 +224,79 @@ def evaluation_create_view(request, defense_id):
 @login_required
 def defense_calendar_view(request):
     """Calendrier des soutenances"""
+    from .calendar_feeds import feed_url
+    
     defenses = Defense.objects.select_related('project').order_by('date', 'time')
     
+    # Liens d'abonnement iCalendar: flux personnel et, pour les admins, flux des salles
+    room_feeds = []
+    if request.user.is_admin_staff():
+        room_feeds = [
+            (room, feed_url('room', room.pk))
+            for room in Room.objects.filter(is_available=True).order_by('name')
+        ]
+    
     context = {
         'defenses': defenses,
+        'feed_url': feed_url('user', request.user.pk),
+        'room_feeds': room_feeds,
     }
     return render(request, 'defenses/defense_calendar.html', context)
 
 
+def calendar_feed_view(request, token):
+    """
+    Flux iCalendar signé (personnel ou d'une salle), sans connexion.
+    
+    Répond 304 quand l'agenda du client est à jour (ETag / Last-Modified).
+    """
+    from django.core import signing
+    from django.http import Http404, StreamingHttpResponse
+    from django.utils.cache import get_conditional_response
+    from django.utils.http import http_date
+    from users.models import User
+    from .calendar_feeds import (feed_fingerprint, iter_calendar, jury_roles,
+                                 read_feed_token, room_feed, user_feed)
+    
+    try:
+        kind, pk = read_feed_token(token)
+    except signing.BadSignature:
+        raise Http404("Lien d'agenda invalide.")
+    
+    roles = None
+    if kind == 'user':
+        user = User.objects.filter(pk=pk, is_active=True).first()
+        if user is None:
+            raise Http404("Lien d'agenda invalide.")
+        defenses, meetings = user_feed(user)
+        name = f'PFE - {user.get_full_name()}'
+    elif kind == 'room':
+        room = get_object_or_404(Room, pk=pk)
+        defenses, meetings = room_feed(room)
+        name = f'PFE - Salle {room.name}'
+    else:
+        raise Http404("Lien d'agenda invalide.")
+    
+    etag, last_modified = feed_fingerprint(defenses, meetings)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return response
+    
+    if kind == 'user':
+        roles = jury_roles(user)
+    response = StreamingHttpResponse(
+        iter_calendar(name, defenses, meetings, roles=roles),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response['ETag'] = etag
+    if timestamp:
+        response['Last-Modified'] = http_date(timestamp)
+    response['Cache-Control'] = 'private, no-cache'
+    response['Content-Disposition'] = 'inline; filename="soutenances.ics"'
+    return response
+
+
 @login_required
 def defense_planning_view(request):
     """Interface de planification des soutenances (admin et encadreurs)"""
@@ -224,58 +311,40 @@ def defense_planning_view(request):
     
     # TOUS voient le planning global des soutenances
     all_defenses = Defense.objects.select_related(
-        'project', 'project__assignment', 'project__assignment__student',
+        'project__assignment__student',
         'project__assignment__subject__supervisor'
     ).order_by('date', 'time')
     
     # Admin voit tous les projets, encadreur voit seulement les siens pour la gestion détaillée
-    if is_admin:
-        active_assignments = Assignment.objects.filter(
-            status='active'
-        ).select_related('student', 'subject', 'subject__supervisor')
-        
-        pending_requests = DefenseChangeRequest.objects.filter(
-            status='pending'
-        ).select_related('defense', 'requested_by').order_by('-created_at')
-    else:
+    # (projet et soutenance chargés par jointure: pas de requête par ligne)
+    active_assignments = Assignment.objects.filter(
+        status='active'
+    ).select_related(
+        'student', 'subject__supervisor', 'project__defense'
+    ).order_by('pk')
+    if not is_admin:
         # Encadreur: seulement ses propres projets pour la section "Mes projets"
-        active_assignments = Assignment.objects.filter(
-            status='active',
-            subject__supervisor=request.user
-        ).select_related('student', 'subject', 'subject__supervisor')
-        
-        # Toutes les demandes pour information
-        pending_requests = DefenseChangeRequest.objects.filter(
-            status='pending'
-        ).select_related('defense', 'requested_by').order_by('-created_at')
+        active_assignments = active_assignments.filter(subject__supervisor=request.user)
+    
+    # Toutes les demandes en attente (pour information côté encadreur)
+    pending_requests = DefenseChangeRequest.objects.filter(
+        status='pending'
+    ).select_related(
+        'defense__project__assignment__student', 'requested_by'
+    ).order_by('-created_at')
     
     # Créer une liste avec les projets et leur statut de soutenance (pour la section admin/mes projets)
     projects_data = []
     for assignment in active_assignments:
-        # Vérifier si un projet existe
-        try:
-            project = assignment.project
-            has_project = True
-        except:
-            project = None
-            has_project = False
-        
-        # Vérifier si une soutenance existe
-        has_defense = False
-        defense = None
-        if has_project and project:
-            try:
-                defense = project.defense
-                has_defense = True
-            except:
-                pass
-        
+        # Relations inverses absentes: None, sans requête (select_related)
+        project = getattr(assignment, 'project', None)
+        defense = getattr(project, 'defense', None) if project else None
         projects_data.append({
             'assignment': assignment,
             'project': project,
-            'has_project': has_project,
+            'has_project': project is not None,
             'defense': defense,
-            'has_defense': has_defense,
+            'has_defense': defense is not None,
         })
     
     context = {
@@ -283,11 +352,199 @@ def defense_planning_view(request):
         'all_defenses': all_defenses,
         'pending_requests': pending_requests,
         'is_admin': is_admin,
-        'is_supervisor': request.user.role == 'teacher',
+        'is_teacher': request.user.role == 'teacher',
     }
     return render(request, 'defenses/defense_planning.html', context)
 
 
+@login_required
+def defense_auto_schedule_view(request):
+    """Planification automatique d'une session de soutenances (admin uniquement)"""
+    from datetime import timedelta
+    from .scheduling import SessionScheduler, apply_schedule
+    
+    if not request.user.is_admin_staff():
+        messages.error(request, "Seuls les administrateurs peuvent planifier les soutenances.")
+        return redirect('defenses:planning')
+    
+    result = None
+    if request.method == 'POST':
+        form = AutoScheduleForm(request.POST, user=request.user)
+        if form.is_valid():
+            data = form.cleaned_data
+            dates = [data['start_date'] + timedelta(days=offset) for offset in range(data['days'])]
+            scheduler = SessionScheduler.from_database(
+                dates,
+                filiere=data['filiere'] or None,
+                duration=data['duration'],
+                day_start=data['day_start'],
+                day_end=data['day_end'],
+            )
+            result = scheduler.solve()
+            
+            if 'apply' in request.POST:
+                created = apply_schedule(result['placements'], duration=data['duration'])
+                messages.success(request, f"{len(created)} soutenance(s) planifiée(s) automatiquement.")
+                if result['unscheduled']:
+                    messages.warning(
+                        request,
+                        f"{len(result['unscheduled'])} projet(s) n'ont pas pu être placés : "
+                        "élargissez la session ou planifiez-les manuellement."
+                    )
+                return redirect('defenses:planning')
+    else:
+        form = AutoScheduleForm(user=request.user, initial={
+            'start_date': timezone.now().date() + timedelta(days=7),
+        })
+    
+    context = {
+        'form': form,
+        'result': result,
+    }
+    return render(request, 'defenses/auto_schedule.html', context)
+
+
+@login_required
+def jury_validation_view(request):
+    """Validation des jurys de toutes les soutenances d'une session (admin uniquement)"""
+    from datetime import timedelta
+    from .composition import validate_session
+    
+    if not request.user.is_admin_staff():
+        messages.error(request, "Seuls les administrateurs peuvent valider les jurys.")
+        return redirect('defenses:planning')
+    
+    report = None
+    if 'start_date' in request.GET:
+        form = JuryValidationForm(request.GET, user=request.user)
+        if form.is_valid():
+            data = form.cleaned_data
+            report = validate_session(data['start_date'], data['end_date'], filiere=data['filiere'] or None)
+    else:
+        today = timezone.now().date()
+        form = JuryValidationForm(user=request.user, initial={
+            'start_date': today,
+            'end_date': today + timedelta(days=14),
+        })
+    
+    context = {
+        'form': form,
+        'report': report,
+        'invalid_count': sum(1 for entry in report if not entry['is_valid']) if report else 0,
+    }
+    return render(request, 'defenses/jury_validation.html', context)
+
+
+@login_required
+def jury_recommendation_view(request):
+    """Composition automatique des jurys d'une session (admin uniquement)"""
+    from datetime import timedelta
+    from .jury_recommender import JuryRecommender, apply_juries
+    
+    if not request.user.is_admin_staff():
+        messages.error(request, "Seuls les administrateurs peuvent composer les jurys.")
+        return redirect('defenses:planning')
+    
+    result = None
+    if request.method == 'POST':
+        form = JuryValidationForm(request.POST, user=request.user)
+        if form.is_valid():
+            data = form.cleaned_data
+            recommender = JuryRecommender.from_database(
+                data['start_date'], data['end_date'], filiere=data['filiere'] or None
+            )
+            result = recommender.solve()
+            
+            if 'apply' in request.POST:
+                created = apply_juries(result['juries'])
+                messages.success(request, f"{created} membre(s) de jury ajouté(s) automatiquement.")
+                incomplete = sum(1 for jury in result['juries'] if jury['missing'])
+                if incomplete:
+                    messages.warning(
+                        request,
+                        f"{incomplete} jury(s) restent incomplets : complétez-les manuellement."
+                    )
+                return redirect('defenses:jury_validation')
+    else:
+        today = timezone.now().date()
+        form = JuryValidationForm(user=request.user, initial={
+            'start_date': today,
+            'end_date': today + timedelta(days=14),
+        })
+    
+    context = {
+        'form': form,
+        'result': result,
+    }
+    return render(request, 'defenses/jury_recommendation.html', context)
+
+
+@login_required
+def room_free_slots_view(request):
+    """
+    API JSON des créneaux libres des salles (sélecteur de salle des admins).
+    
+    Paramètres GET: start, end (AAAA-MM-JJ), duration (minutes), building
+    (BS/BP), floor (1/2), filiere, day_start, day_end (HH:MM), exclude
+    (soutenance déplacée), limit, teachers (ids séparés par des virgules des
+    enseignants qui doivent être disponibles).
+    """
+    from datetime import timedelta
+    from django.http import JsonResponse
+    from .room_slots import MAX_RANGE_DAYS, find_free_slots
+    from .scheduling import DEFAULT_DURATION
+    
+    if not request.user.is_admin_staff():
+        return JsonResponse({'error': "Accès réservé aux administrateurs."}, status=403)
+    
+    try:
+        start = datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+        end = datetime.strptime(request.GET.get('end') or request.GET['start'], '%Y-%m-%d').date()
+        duration = int(request.GET.get('duration') or DEFAULT_DURATION)
+        day_start = datetime.strptime(request.GET.get('day_start') or '08:00', '%H:%M').time()
+        day_end = datetime.strptime(request.GET.get('day_end') or '18:00', '%H:%M').time()
+        exclude_pk = int(request.GET['exclude']) if request.GET.get('exclude') else None
+        limit = min(int(request.GET.get('limit') or 500), 2000)
+        teachers = [int(pk) for pk in request.GET.get('teachers', '').split(',') if pk]
+    except (KeyError, ValueError):
+        return JsonResponse({'error': "Paramètres invalides."}, status=400)
+    
+    if end < start or end - start > timedelta(days=MAX_RANGE_DAYS) or not 0 < duration <= 480:
+        return JsonResponse({'error': "Période ou durée invalide."}, status=400)
+    
+    # Un admin de filière ne cherche que parmi les salles de sa filière
+    filiere = request.GET.get('filiere') or None
+    if request.user.is_admin_filiere():
+        filiere = request.user.filiere_admin
+    
+    slots = find_free_slots(
+        start, end, duration,
+        building=request.GET.get('building') or None,
+        floor=request.GET.get('floor') or None,
+        filiere=filiere,
+        day_start=day_start,
+        day_end=day_end,
+        exclude_pk=exclude_pk,
+        limit=limit,
+        teachers=teachers,
+    )
+    return JsonResponse({
+        'count': len(slots),
+        'slots': [
+            {
+                'room_id': slot['room'].pk,
+                'room': slot['room'].name,
+                'building': slot['room'].building,
+                'floor': slot['room'].floor,
+                'date': slot['date'].isoformat(),
+                'start': slot['time'].strftime('%H:%M'),
+                'end': slot['end_time'].strftime('%H:%M'),
+            }
+            for slot in slots
+        ],
+    })
+
+
 @login_required
 def defense_update_view(request, pk):
     """Modifier une soutenance (admin uniquement)"""
@@ -365,36 +622,67 @@ def defense_change_request_create_view(request, defense_id):
 
 @login_required
 def defense_change_request_review_view(request, pk):
-    """Examiner une demande de modification (admin uniquement)"""
-    if request.user.role != 'admin':
+    """
+    Examiner une demande de modification (admin uniquement).
+    
+    La page montre l'impact du créneau proposé (conflits de salle, de jury et
+    indisponibilités) et des créneaux de remplacement sans conflit; l'admin
+    peut approuver la demande telle quelle ou avec l'un de ces créneaux.
+    """
+    from .change_impact import analyze_change
+    
+    if not request.user.is_admin_staff():
         messages.error(request, "Seuls les administrateurs peuvent examiner les demandes.")
         return redirect('defenses:list')
     
-    change_request = get_object_or_404(DefenseChangeRequest, pk=pk)
+    change_request = get_object_or_404(
+        DefenseChangeRequest.objects.select_related('defense__project__assignment__student', 'requested_by'),
+        pk=pk
+    )
     
     if change_request.status != 'pending':
         messages.warning(request, "Cette demande a déjà été traitée.")
         return redirect('defenses:planning')
     
+    impact = analyze_change(change_request)
+    
     if request.method == 'POST':
         form = DefenseChangeReviewForm(request.POST, instance=change_request)
+        alternatives = {
+            f"{slot['date'].isoformat()}|{slot['time'].strftime('%H:%M')}|{slot['room'].pk}": slot
+            for slot in impact['alternatives']
+        }
+        alternative = alternatives.get(request.POST.get('alternative', ''))
         if form.is_valid():
             change_request = form.save(commit=False)
             change_request.reviewed_by = request.user
             change_request.reviewed_at = timezone.now()
             change_request.save()
             
-            # Si approuvé, appliquer les modifications
+            # Si approuvé, appliquer les modifications (ou le créneau de remplacement choisi)
             if change_request.status == 'approved':
                 defense = change_request.defense
-                if change_request.proposed_date:
-                    defense.date = change_request.proposed_date
-                if change_request.proposed_time:
-                    defense.time = change_request.proposed_time
-                if change_request.proposed_location:
-                    defense.room = change_request.proposed_location
+                if alternative:
+                    defense.date = alternative['date']
+                    defense.time = alternative['time']
+                    defense.room_obj = alternative['room']
+                    defense.room = alternative['room'].name
+                else:
+                    if change_request.proposed_date:
+                        defense.date = change_request.proposed_date
+                    if change_request.proposed_time:
+                        defense.time = change_request.proposed_time
+                    if change_request.proposed_location:
+                        defense.room = change_request.proposed_location
+                        if impact['room_resolved']:
+                            defense.room_obj = impact['room']
                 defense.save()
-                messages.success(request, "Demande approuvée et soutenance modifiée.")
+                if alternative:
+                    messages.success(request, "Demande approuvée : soutenance déplacée sur le créneau de remplacement choisi.")
+                elif impact['has_conflicts']:
+                    messages.warning(request, "Demande approuvée malgré les conflits signalés.")
+                else:
+                    messages.success(request, "Demande approuvée et soutenance modifiée.")
             else:
                 messages.info(request, "Demande rejetée.")
             
@@ -405,6 +693,7 @@ def defense_change_request_review_view(request, pk):
     context = {
         'form': form,
         'change_request': change_request,
+        'impact': impact,
     }
     return render(request, 'defenses/defense_change_review.html', context)
 
@@ -427,12 +716,12 @@ def grade_defense_view(request, pk):
         )
     except DefenseJury.DoesNotExist:
         messages.error(request, "Vous n'êtes pas membre du jury de cette soutenance.")
-        return redirect('defenses:defense_detail', pk=pk)
+        return redirect('defenses:detail', pk=pk)
     
     # Vérifier que la soutenance est passée
     if not defense.can_be_graded:
         messages.warning(request, "La soutenance n'a pas encore eu lieu.")
-        return redirect('defenses:defense_detail', pk=pk)
+        return redirect('defenses:detail', pk=pk)
     
     # Vérifier si déjà noté
     if jury_member.grade is not None:
@@ -450,16 +739,12 @@ def grade_defense_view(request, pk):
                 jury_member.grade = grade_value
                 jury_member.comments = comments
                 jury_member.graded_at = timezone.now()
+                # La note finale et l'état de notation de la soutenance sont
+                # recalculés par signal à l'enregistrement
                 jury_member.save()
                 
                 messages.success(request, f"Note enregistrée : {grade_value}/20")
-                
-                # Vérifier si tous les membres ont noté
-                if defense.is_fully_graded:
-                    # Calculer la note finale
-                    final_grade = defense.calculate_final_grade()
-                    
-                return redirect('defenses:defense_detail', pk=pk)
+                return redirect('defenses:detail', pk=pk)
         except ValueError:
             messages.error(request, "Note invalide.")
     
@@ -470,68 +755,86 @@ def grade_defense_view(request, pk):
     return render(request, 'defenses/grade_defense.html', context)
 
 
+@login_required
+def grading_sheet_view(request):
+    """
+    Feuille de notation d'un président de jury: notes de tous les membres de
+    tous ses jurys d'une journée, enregistrées en une seule soumission.
+    """
+    from .forms import GradingSheetForm
+    from .grading import grading_sheet, save_grading_sheet
+    
+    if not request.user.is_teacher():
+        messages.error(request, "Seuls les présidents de jury utilisent la feuille de notation.")
+        return redirect('defenses:list')
+    
+    try:
+        day = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        day = timezone.localdate()
+    
+    sheet = grading_sheet(request.user, day)
+    
+    if request.method == 'POST':
+        form = GradingSheetForm(request.POST, sheet=sheet)
+        if form.is_valid():
+            changed = save_grading_sheet(sheet, form.grades())
+            messages.success(request, f"{changed} note(s) enregistrée(s).")
+            return redirect(f"{request.path}?date={day.isoformat()}")
+        messages.error(request, "Certaines notes sont invalides (entre 0 et 20).")
+    else:
+        form = GradingSheetForm(sheet=sheet)
+    
+    context = {
+        'form': form,
+        'sheet': sheet,
+        'day': day,
+    }
+    return render(request, 'defenses/grading_sheet.html', context)
+
+
 @login_required
 def room_schedule_view(request):
-    """Affiche le planning des soutenances par salle et par jour"""
+    """Grille d'occupation des salles, par jour ou par semaine"""
+    from datetime import timedelta
+    from django.utils.safestring import mark_safe
+    from .room_grid import PERIOD_DAYS, render_room_grid
     
     # Filtres GET
     room_id = request.GET.get('room')
-    date_filter = request.GET.get('date')
+    period = request.GET.get('period') if request.GET.get('period') in PERIOD_DAYS else 'day'
     
-    # Query de base
-    defenses = Defense.objects.select_related('project', 'room_obj').filter(
-        room_obj__isnull=False
-    )
+    try:
+        selected_date = datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        selected_date = timezone.now().date()
+    if period == 'week':
+        # Une semaine commence le lundi
+        selected_date -= timedelta(days=selected_date.weekday())
+    
+    rooms = Room.objects.filter(is_available=True).order_by('filiere', 'name')
     
     # Filtre par salle
     selected_room = None
-    if room_id:
-        defenses = defenses.filter(room_obj_id=room_id)
+    grid_rooms = rooms
+    if room_id and room_id.isdigit():
         selected_room = Room.objects.filter(id=room_id).first()
+        grid_rooms = Room.objects.filter(id=room_id)
     
-    # Filtre par date
-    selected_date = None
-    if date_filter:
-        try:
-            selected_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            defenses = defenses.filter(date=selected_date)
-        except ValueError:
-            pass
-    
-    # Trier par date et heure
-    defenses = defenses.order_by('date', 'time')
-    
-    # Grouper par salle et par date
-    schedule = {}
-    for defense in defenses:
-        room_key = defense.room_obj.id
-        date_key = defense.date
-        
-        if room_key not in schedule:
-            schedule[room_key] = {
-                'room': defense.room_obj,
-                'dates': {}
-            }
-        
-        if date_key not in schedule[room_key]['dates']:
-            schedule[room_key]['dates'][date_key] = []
-        
-        schedule[room_key]['dates'][date_key].append(defense)
-    
-    # Listes pour les filtres
-    rooms = Room.objects.filter(is_available=True).order_by('filiere', 'name')
-    
-    # Dates disponibles (soutenances planifiées)
-    available_dates = Defense.objects.filter(
-        room_obj__isnull=False
-    ).values_list('date', flat=True).distinct().order_by('date')
+    grid_html = render_room_grid(
+        selected_date, period, grid_rooms, rooms_key=selected_room.pk if selected_room else 'all'
+    )
     
+    step = timedelta(days=PERIOD_DAYS[period])
     context = {
-        'schedule': schedule,
+        'grid_html': mark_safe(grid_html),
         'rooms': rooms,
-        'available_dates': available_dates,
         'selected_room': selected_room,
         'selected_date': selected_date,
+        'period': period,
+        'end_date': selected_date + step - timedelta(days=1),
+        'previous_date': selected_date - step,
+        'next_date': selected_date + step,
     }
     return render(request, 'defenses/room_schedule.html', context)
 
@@ -54,6 +54,7 @@ python manage.py collectstatic --noinput --settings=config.settings_production
 
 echo "9. Migrations de la base de données..."
 python manage.py migrate --settings=config.settings_production
+python manage.py createcachetable --settings=config.settings_production
 
 echo "10. Création du superutilisateur..."
 echo "Exécutez manuellement: python manage.py createsuperuser --settings=config.settings_production"
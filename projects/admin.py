@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, Milestone, Deliverable, Comment, AcademicYear, ProjectTeam
+from .models import Project, Milestone, MilestoneTemplate, Deliverable, Comment, AcademicYear, ProjectTeam
 
 @admin.register(AcademicYear)
 class AcademicYearAdmin(admin.ModelAdmin):
@@ -34,6 +34,13 @@ class MilestoneAdmin(admin.ModelAdmin):
     list_filter = ['status', 'validated_by_supervisor']
     search_fields = ['title', 'description']
 
+@admin.register(MilestoneTemplate)
+class MilestoneTemplateAdmin(admin.ModelAdmin):
+    list_display = ['title', 'filiere', 'level', 'order', 'due_after_days', 'is_active']
+    list_filter = ['filiere', 'level', 'is_active']
+    list_editable = ['order', 'due_after_days', 'is_active']
+    search_fields = ['title', 'description']
+
 @admin.register(Deliverable)
 class DeliverableAdmin(admin.ModelAdmin):
     list_display = ['title', 'project', 'type', 'status', 'version', 'submitted_at']
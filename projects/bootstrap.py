@@ -0,0 +1,170 @@
+# projects/bootstrap.py
+# Création en masse des projets de l'année à partir des affectations actives
+#
+# Pour chaque affectation active, le projet (en attente de cadrage), son équipe
+# et ses jalons par défaut sont créés s'ils manquent. Les jalons viennent des
+# modèles de jalons (MilestoneTemplate) de la filière et du niveau du sujet.
+#
+# Le travail est découpé en lots: chaque lot est une transaction de quelques
+# requêtes (lecture des affectations, bulk_create des projets, des équipes et
+# des jalons, recomptage de l'avancement), quel que soit le nombre de projets.
+# bulk_create n'émet aucun signal: les compteurs de jalons sont recalculés
+# explicitement et aucune notification « nouveau jalon » n'est envoyée.
+
+import time as _time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .progress import recount_progress
+
+DEFAULT_BATCH_SIZE = 200
+
+
+class TemplateCatalogue:
+    """Modèles de jalons actifs, groupés par (filière, niveau) (une requête)."""
+
+    def __init__(self):
+        from .models import MilestoneTemplate
+
+        self.sets = {}
+        for template in MilestoneTemplate.objects.filter(is_active=True).order_by('order', 'pk'):
+            self.sets.setdefault((template.filiere, template.level), []).append(template)
+
+    def for_subject(self, subject):
+        """Jeu le plus spécifique: filière et niveau, filière, niveau, général."""
+        for key in ((subject.filiere, subject.level), (subject.filiere, ''), ('', subject.level), ('', '')):
+            if key in self.sets:
+                return self.sets[key]
+        return []
+
+    def build_milestones(self, project, subject):
+        """Jalons (non enregistrés) d'un projet selon les modèles de son sujet."""
+        from .models import Milestone
+
+        start_date = project.start_date or timezone.now().date()
+        return [
+            Milestone(
+                project=project,
+                title=template.title,
+                description=template.description,
+                order=template.order,
+                due_date=start_date + timedelta(days=template.due_after_days),
+                status='pending',
+            )
+            for template in self.for_subject(subject)
+        ]
+
+
+def create_default_milestones(project, catalogue=None):
+    """
+    Crée les jalons par défaut d'un projet (une requête d'insertion).
+
+    Returns:
+        int: nombre de jalons créés
+    """
+    from .models import Milestone, Project
+
+    catalogue = catalogue or TemplateCatalogue()
+    milestones = catalogue.build_milestones(project, project.assignment.subject)
+    if milestones:
+        with transaction.atomic():
+            Milestone.objects.bulk_create(milestones)
+            recount_progress(Project.objects.filter(pk=project.pk))
+    return len(milestones)
+
+
+def _bootstrap_batch(assignment_ids, catalogue, academic_year):
+    """Complète un lot d'affectations; retourne les nombres d'objets créés."""
+    from subjects.models import Assignment
+    from .models import Milestone, Project, ProjectTeam
+
+    assignments = list(
+        Assignment.objects.filter(pk__in=assignment_ids)
+        .select_related('subject', 'student', 'project__team')
+    )
+
+    # Relations chargées par select_related: aucune requête supplémentaire
+    needs_team = [
+        assignment for assignment in assignments
+        if not hasattr(assignment, 'project') or not hasattr(assignment.project, 'team')
+    ]
+    new_projects = [
+        Project(
+            assignment=assignment,
+            title=assignment.subject.title,
+            description=assignment.subject.description,
+            objectives=assignment.subject.description,
+            status='awaiting_kickoff',
+            academic_year=academic_year,
+        )
+        for assignment in assignments
+        if not hasattr(assignment, 'project')
+    ]
+    Project.objects.bulk_create(new_projects)
+    for project in new_projects:
+        project.assignment.project = project
+
+    teams = [
+        ProjectTeam(project=assignment.project, student1=assignment.student)
+        for assignment in needs_team
+    ]
+    ProjectTeam.objects.bulk_create(teams)
+
+    # Jalons seulement pour les projets qui n'en ont aucun
+    milestones = []
+    for assignment in assignments:
+        if not assignment.project.milestones_total:
+            milestones += catalogue.build_milestones(assignment.project, assignment.subject)
+    Milestone.objects.bulk_create(milestones)
+    if milestones:
+        recount_progress(Project.objects.filter(pk__in={milestone.project_id for milestone in milestones}))
+
+    return len(new_projects), len(teams), len(milestones)
+
+
+def bootstrap_projects(assignments=None, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Crée projets, équipes et jalons manquants des affectations actives.
+
+    Args:
+        assignments: QuerySet d'Assignment (défaut: toutes les affectations actives)
+        batch_size: affectations traitées par transaction
+        progress: fonction appelée après chaque lot avec les statistiques courantes
+
+    Returns:
+        dict: {'assignments', 'projects', 'teams', 'milestones', 'batches',
+               'elapsed' (secondes), 'throughput' (affectations traitées par seconde)}
+    """
+    from subjects.models import Assignment
+    from users.statistics import invalidate_dashboard_statistics
+    from .models import AcademicYear
+
+    if assignments is None:
+        assignments = Assignment.objects.filter(status='active')
+    assignment_ids = list(assignments.order_by('pk').values_list('pk', flat=True))
+
+    catalogue = TemplateCatalogue()
+    academic_year = AcademicYear.get_active_year()
+    stats = {'assignments': len(assignment_ids), 'projects': 0, 'teams': 0, 'milestones': 0, 'batches': 0}
+
+    started = _time.perf_counter()
+    for index in range(0, len(assignment_ids), batch_size):
+        with transaction.atomic():
+            projects, teams, milestones = _bootstrap_batch(
+                assignment_ids[index:index + batch_size], catalogue, academic_year
+            )
+        stats['projects'] += projects
+        stats['teams'] += teams
+        stats['milestones'] += milestones
+        stats['batches'] += 1
+        stats['elapsed'] = _time.perf_counter() - started
+        if progress:
+            progress(stats)
+
+    stats['elapsed'] = _time.perf_counter() - started
+    stats['throughput'] = stats['assignments'] / stats['elapsed'] if stats['elapsed'] else 0
+    if stats['projects'] or stats['teams'] or stats['milestones']:
+        invalidate_dashboard_statistics()
+    return stats
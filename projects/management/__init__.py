@@ -0,0 +1 @@
+# Package marker for Django management commands
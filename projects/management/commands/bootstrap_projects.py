@@ -0,0 +1,97 @@
+"""
+Commande Django de création en masse des projets de l'année.
+
+Usage:
+    python manage.py bootstrap_projects
+    python manage.py bootstrap_projects --batch-size 500
+    python manage.py bootstrap_projects --benchmark 1000
+
+Pour chaque affectation active, crée le projet (en attente de cadrage), son
+équipe et ses jalons par défaut (modèles de jalons de la filière et du
+niveau) s'ils manquent: la commande peut être relancée sans créer de doublon.
+Avec --benchmark N, N affectations fictives sont générées dans une
+transaction annulée afin de mesurer le débit.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from projects.bootstrap import DEFAULT_BATCH_SIZE, bootstrap_projects
+
+
+class Command(BaseCommand):
+    help = "Crée les projets, équipes et jalons manquants des affectations actives"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help=f'Affectations traitées par transaction (défaut: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument('--benchmark', type=int, metavar='N', help='Mesurer sur N affectations fictives')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size doit être positif')
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   🚀 Création des projets de l\'année'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if options['benchmark']:
+            with transaction.atomic():
+                assignments = self._generate(options['benchmark'])
+                self._bootstrap(assignments, options['batch_size'])
+                transaction.set_rollback(True)
+            self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé (données annulées)'))
+            return
+
+        self._bootstrap(None, options['batch_size'])
+
+    def _bootstrap(self, assignments, batch_size):
+        def progress(stats):
+            self.stdout.write(
+                f"   Lot {stats['batches']}: {stats['projects']} projet(s), "
+                f"{stats['milestones']} jalon(s) — {stats['elapsed']:.2f} s"
+            )
+
+        stats = bootstrap_projects(assignments, batch_size=batch_size, progress=progress)
+
+        self.stdout.write(f"\n📊 Affectations actives : {stats['assignments']}")
+        self.stdout.write(f"   Projets créés : {stats['projects']}")
+        self.stdout.write(f"   Équipes créées : {stats['teams']}")
+        self.stdout.write(f"   Jalons créés : {stats['milestones']}")
+        self.stdout.write(
+            f"   Durée : {stats['elapsed']:.2f} s en {stats['batches']} lot(s) "
+            f"({stats['throughput']:.0f} affectations/s)\n"
+        )
+        self.stdout.write(self.style.SUCCESS('✅ Projets à jour'))
+
+    def _generate(self, count):
+        """N sujets affectés à N étudiants (bulk_create: aucun projet créé par signal)."""
+        from subjects.models import Assignment, Subject
+
+        User = get_user_model()
+        supervisor = User.objects.create_user(
+            username='bench_bootstrap_teacher', email='bench_bootstrap@example.com',
+            password=None, role='teacher', filiere='GIT',
+        )
+        students = User.objects.bulk_create([
+            User(
+                username=f'bench_bootstrap_{index}', email=f'bench_bootstrap_{index}@example.com',
+                role='student', filiere='GIT', level='M2',
+            )
+            for index in range(count)
+        ])
+        subjects = Subject.objects.bulk_create([
+            Subject(
+                title=f'Sujet de test {index}', description='Sujet généré', objectives='Objectifs',
+                level='M2', filiere='GIT', supervisor=supervisor, status='assigned',
+            )
+            for index in range(count)
+        ])
+        Assignment.objects.bulk_create([
+            Assignment(subject=subject, student=student, status='active')
+            for subject, student in zip(subjects, students)
+        ])
+        return Assignment.objects.filter(subject__supervisor=supervisor)
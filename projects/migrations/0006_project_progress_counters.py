@@ -0,0 +1,49 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:49
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def fill_progress_counters(apps, schema_editor):
+    """Compte les jalons des projets existants et met à jour leur avancement."""
+    Milestone = apps.get_model('projects', 'Milestone')
+    Project = apps.get_model('projects', 'Project')
+
+    counters = {}
+    for project_id, validated in Milestone.objects.values_list('project_id', 'validated_by_supervisor'):
+        total, validated_count = counters.get(project_id, (0, 0))
+        counters[project_id] = (total + 1, validated_count + int(validated))
+
+    projects = list(Project.objects.filter(pk__in=counters))
+    for project in projects:
+        project.milestones_total, project.validated_milestones_count = counters[project.pk]
+        project.progress_percentage = project.validated_milestones_count * 100 // project.milestones_total
+    Project.objects.bulk_update(
+        projects, ['milestones_total', 'validated_milestones_count', 'progress_percentage'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_academicyear_project_thesis_approval_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='milestones_total',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='nombre de jalons'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='validated_milestones_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='jalons validés'),
+        ),
+        migrations.AlterField(
+            model_name='project',
+            name='progress_percentage',
+            field=models.PositiveIntegerField(db_index=True, default=0, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(100)], verbose_name="pourcentage d'avancement"),
+        ),
+        migrations.RunPython(fill_progress_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:53
+
+from django.db import migrations, models
+
+# Jalons jusqu'ici créés en dur par project_create_view: jeu général
+DEFAULT_TEMPLATES = [
+    ('Analyse et spécification', 'Analyse des besoins et rédaction du cahier des charges'),
+    ('Conception', 'Architecture et conception détaillée du système'),
+    ('Développement', 'Implémentation des fonctionnalités principales'),
+    ('Tests et validation', "Tests unitaires, d'intégration et validation"),
+    ('Documentation et finalisation', 'Rédaction de la documentation et préparation de la soutenance'),
+]
+
+
+def create_default_templates(apps, schema_editor):
+    MilestoneTemplate = apps.get_model('projects', 'MilestoneTemplate')
+    MilestoneTemplate.objects.bulk_create([
+        MilestoneTemplate(title=title, description=description, order=index, due_after_days=30 * index)
+        for index, (title, description) in enumerate(DEFAULT_TEMPLATES, start=1)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_progress_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilestoneTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filiere', models.CharField(blank=True, choices=[('GIT', 'Génie Informatique & Télécommunications'), ('GESI', 'Génie Électrique et Systèmes Intelligents'), ('GQHSEI', 'Génie de la Qualité Hygiène, Sécurité et Environnement Industriel'), ('GAM', 'Génie Automobile et Mécatronique'), ('GMP', 'Génie Maritime et Portuaire'), ('GP', 'Génie des Procédés'), ('GE', 'Génie Énergétique'), ('GM', 'Génie Mécanique'), ('GC', 'Génie Civil')], help_text='Vide: toutes les filières', max_length=10, verbose_name='filière')),
+                ('level', models.CharField(blank=True, choices=[('L3', 'Licence 3'), ('M2', 'Master 2'), ('DOC', 'Doctorat')], help_text='Vide: tous les niveaux', max_length=3, verbose_name='niveau')),
+                ('title', models.CharField(max_length=200, verbose_name='titre')),
+                ('description', models.TextField(verbose_name='description')),
+                ('order', models.PositiveIntegerField(default=0, verbose_name='ordre')),
+                ('due_after_days', models.PositiveIntegerField(default=30, help_text='Nombre de jours après le début du projet', verbose_name='échéance (jours)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='actif')),
+            ],
+            options={
+                'verbose_name': 'modèle de jalon',
+                'verbose_name_plural': 'modèles de jalons',
+                'ordering': ['filiere', 'level', 'order'],
+                'indexes': [models.Index(fields=['filiere', 'level'], name='projects_mi_filiere_6a7eec_idx')],
+            },
+        ),
+        migrations.RunPython(create_default_templates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:56
+
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_work_log_weeks(apps, schema_editor):
+    """Cumule par semaine ISO les entrées existantes du journal de bord."""
+    WorkLog = apps.get_model('projects', 'WorkLog')
+    WorkLogWeek = apps.get_model('projects', 'WorkLogWeek')
+
+    weeks = {}
+    for project_id, day, hours, visible, read_at in WorkLog.objects.values_list(
+        'project_id', 'date', 'duration_hours', 'is_visible_to_supervisor', 'supervisor_read_at'
+    ):
+        key = (project_id, day - timedelta(days=day.weekday()))
+        week = weeks.setdefault(key, WorkLogWeek(project_id=project_id, week_start=key[1], hours=0))
+        week.hours += hours
+        week.entries += 1
+        week.unread_count += int(visible and read_at is None)
+    WorkLogWeek.objects.bulk_create(weeks.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_milestone_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkLogWeek',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Lundi de la semaine ISO', verbose_name='début de semaine')),
+                ('hours', models.DecimalField(decimal_places=1, default=0, max_digits=6, verbose_name='heures')),
+                ('entries', models.PositiveIntegerField(default=0, verbose_name='entrées')),
+                ('unread_count', models.PositiveIntegerField(default=0, help_text="Entrées visibles par l'encadreur et pas encore lues", verbose_name='non lues')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='work_log_weeks', to='projects.project', verbose_name='projet')),
+            ],
+            options={
+                'verbose_name': 'semaine du journal de bord',
+                'verbose_name_plural': 'semaines du journal de bord',
+                'ordering': ['project', '-week_start'],
+                'indexes': [models.Index(fields=['week_start'], name='projects_wo_week_st_14f556_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='worklogweek',
+            constraint=models.UniqueConstraint(fields=('project', 'week_start'), name='unique_work_log_week'),
+        ),
+        migrations.RunPython(fill_work_log_weeks, migrations.RunPython.noop),
+    ]
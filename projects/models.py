@@ -1,10 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from users.models import User
-from subjects.models import Assignment
+from subjects.models import Assignment, Subject
 
 
 class AcademicYear(models.Model):
@@ -113,7 +113,10 @@ class Project(models.Model):
     methodology = models.TextField(_('méthodologie'), blank=True)
     technologies = models.CharField(_('technologies utilisées'), max_length=500, blank=True)
     status = models.CharField(_('statut'), max_length=20, choices=STATUS_CHOICES, default='in_progress')
-    progress_percentage = models.PositiveIntegerField(_('pourcentage d\'avancement'), default=0, validators=[MinValueValidator(0), MaxValueValidator(100)])
+    progress_percentage = models.PositiveIntegerField(_('pourcentage d\'avancement'), default=0, db_index=True, validators=[MinValueValidator(0), MaxValueValidator(100)])
+    # Compteurs de jalons maintenus par projects.progress à chaque modification de jalon
+    milestones_total = models.PositiveIntegerField(_('nombre de jalons'), default=0, editable=False)
+    validated_milestones_count = models.PositiveIntegerField(_('jalons validés'), default=0, editable=False)
     start_date = models.DateField(_('date de début'), default=timezone.now)
     expected_end_date = models.DateField(_('date de fin prévue'), null=True, blank=True)
     actual_end_date = models.DateField(_('date de fin réelle'), null=True, blank=True)
@@ -180,34 +183,68 @@ class Project(models.Model):
         verbose_name_plural = _('projets')
         ordering = ['-created_at']
     
+    # Champs tenus par projects.progress (variations F): jamais réécrits par save()
+    COUNTER_FIELDS = ('milestones_total', 'validated_milestones_count', 'progress_percentage')
+    
     def __str__(self):
         return f"{self.title}"
     
-    @property
-    def progress(self):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Pourcentage lu: seule une saisie manuelle (valeur différente) est enregistrée
+        instance._stored_progress = instance.__dict__.get('progress_percentage')
+        return instance
+    
+    def save(self, *args, **kwargs):
         """
-        Calcule automatiquement le pourcentage d'avancement basé sur les jalons validés.
-        Si aucun jalon n'existe, retourne le pourcentage manuel.
+        Une mise à jour n'écrit pas les compteurs de jalons: un projet chargé
+        avant la création ou la validation concurrente d'un jalon écraserait
+        sinon les variations appliquées entre-temps.
         """
-        total_milestones = self.milestones.count()
+        if self._state.adding or kwargs.get('force_insert'):
+            super().save(*args, **kwargs)
+            self._stored_progress = self.progress_percentage
+            return
         
-        if total_milestones == 0:
-            # Pas de jalons définis, utiliser le pourcentage manuel
-            return self.progress_percentage
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            ]
+        manual_progress = (
+            'progress_percentage' in update_fields
+            and self.progress_percentage != getattr(self, '_stored_progress', None)
+        )
+        kwargs['update_fields'] = [name for name in update_fields if name not in self.COUNTER_FIELDS]
         
-        # Calculer basé sur les jalons validés
-        validated_milestones = self.milestones.filter(validated_by_supervisor=True).count()
-        calculated_progress = int((validated_milestones / total_milestones) * 100)
-        
-        return calculated_progress
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if manual_progress:
+                from .progress import set_manual_progress
+                set_manual_progress(self.pk, self.progress_percentage)
+        self._stored_progress = self.progress_percentage
+    
+    @property
+    def progress(self):
+        """
+        Pourcentage d'avancement basé sur les jalons validés (stocké, sans requête).
+        Si aucun jalon n'existe, c'est le pourcentage manuel.
+        """
+        if self.milestones_total:
+            return self.validated_milestones_count * 100 // self.milestones_total
+        return self.progress_percentage
     
     def update_progress_from_milestones(self):
         """
-        Met à jour le champ progress_percentage basé sur les jalons validés.
-        Utile pour la compatibilité avec le code existant.
+        Recalcule entièrement les compteurs de jalons et l'avancement.
+        Normalement inutile: ils sont maintenus à chaque modification de jalon.
         """
-        self.progress_percentage = self.progress
-        self.save(update_fields=['progress_percentage'])
+        from .progress import recount_progress
+        recount_progress(Project.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['milestones_total', 'validated_milestones_count', 'progress_percentage'])
     
     def status_badge_class(self):
         """Retourne la classe CSS Bootstrap pour le badge de statut."""
@@ -307,6 +344,65 @@ class Milestone(models.Model):
     
     def __str__(self):
         return f"{self.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État enregistré: base des variations appliquées aux compteurs du projet
+        instance._stored_project_id = instance.__dict__.get('project_id')
+        instance._stored_validated = instance.__dict__.get('validated_by_supervisor')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Compteurs du projet ajustés par signal dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class MilestoneTemplate(models.Model):
+    """
+    Modèle de jalon créé par défaut dans les nouveaux projets.
+
+    Un projet reçoit le jeu de modèles le plus spécifique pour la filière et
+    le niveau de son sujet: (filière, niveau), puis filière seule, niveau
+    seul, et enfin le jeu général (filière et niveau vides).
+    """
+
+    filiere = models.CharField(
+        _('filière'),
+        max_length=10,
+        choices=User.FILIERE_CHOICES,
+        blank=True,
+        help_text='Vide: toutes les filières'
+    )
+    level = models.CharField(
+        _('niveau'),
+        max_length=3,
+        choices=Subject.LEVEL_CHOICES,
+        blank=True,
+        help_text='Vide: tous les niveaux'
+    )
+    title = models.CharField(_('titre'), max_length=200)
+    description = models.TextField(_('description'))
+    order = models.PositiveIntegerField(_('ordre'), default=0)
+    due_after_days = models.PositiveIntegerField(
+        _('échéance (jours)'),
+        default=30,
+        help_text="Nombre de jours après le début du projet"
+    )
+    is_active = models.BooleanField(_('actif'), default=True)
+
+    class Meta:
+        verbose_name = _('modèle de jalon')
+        verbose_name_plural = _('modèles de jalons')
+        ordering = ['filiere', 'level', 'order']
+        indexes = [
+            models.Index(fields=['filiere', 'level']),
+        ]
+
+    def __str__(self):
+        scope = ' '.join(value for value in (self.filiere, self.level) if value) or 'Général'
+        return f"[{scope}] {self.order}. {self.title}"
 
 
 class ProjectTeam(models.Model):
@@ -728,22 +824,80 @@ class WorkLog(models.Model):
             self.supervisor_read_at = timezone.now()
             self.save()
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État enregistré: base des variations appliquées au cumul hebdomadaire
+        instance._stored_rollup = instance.rollup_state()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Cumul hebdomadaire ajusté par signal dans la même transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def rollup_state(self):
+        """(projet, date, heures, non lue) telle que comptée dans WorkLogWeek."""
+        fields = self.__dict__
+        if 'date' not in fields or 'duration_hours' not in fields:
+            # Instance chargée partiellement (only/defer): pas de variation possible
+            return None
+        return (
+            fields.get('project_id'),
+            WorkLog._meta.get_field('date').to_python(fields['date']),
+            WorkLog._meta.get_field('duration_hours').to_python(fields['duration_hours']),
+            bool(fields.get('is_visible_to_supervisor')) and fields.get('supervisor_read_at') is None,
+        )
+    
     @property
     def total_hours_this_week(self):
-        """Calcule le total d'heures travaillées cette semaine."""
-        from datetime import timedelta
-        week_start = self.date - timedelta(days=self.date.weekday())
-        week_end = week_start + timedelta(days=6)
-        
-        return WorkLog.objects.filter(
-            project=self.project,
-            date__range=[week_start, week_end]
-        ).aggregate(
-            total=models.Sum('duration_hours')
-        )['total'] or 0
+        """Total d'heures travaillées sur la semaine de l'entrée (cumul hebdomadaire)."""
+        from .worklog_rollup import week_start
+        week = WorkLogWeek.objects.filter(
+            project_id=self.project_id,
+            week_start=week_start(self.date),
+        ).values_list('hours', flat=True).first()
+        return week or 0
     
     @property
     def is_recent(self):
         """Vérifie si l'entrée date de moins de 7 jours."""
         from datetime import timedelta
         return self.date >= (timezone.now().date() - timedelta(days=7))
+
+
+class WorkLogWeek(models.Model):
+    """
+    Cumul du journal de bord d'un projet sur une semaine ISO (du lundi au
+    dimanche), maintenu à chaque enregistrement ou suppression d'entrée.
+    """
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='work_log_weeks',
+        verbose_name=_('projet')
+    )
+    week_start = models.DateField(_('début de semaine'), help_text="Lundi de la semaine ISO")
+    hours = models.DecimalField(_('heures'), max_digits=6, decimal_places=1, default=0)
+    entries = models.PositiveIntegerField(_('entrées'), default=0)
+    unread_count = models.PositiveIntegerField(
+        _('non lues'),
+        default=0,
+        help_text="Entrées visibles par l'encadreur et pas encore lues"
+    )
+    
+    class Meta:
+        verbose_name = _('semaine du journal de bord')
+        verbose_name_plural = _('semaines du journal de bord')
+        ordering = ['project', '-week_start']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'week_start'], name='unique_work_log_week'),
+        ]
+        indexes = [
+            models.Index(fields=['week_start']),
+        ]
+    
+    def __str__(self):
+        year, week, _day = self.week_start.isocalendar()
+        return f"{self.project.title} - {year}-S{week:02d}"
@@ -0,0 +1,96 @@
+# projects/progress.py
+# Avancement des projets maintenu de façon incrémentale
+#
+# Le nombre de jalons, le nombre de jalons validés et le pourcentage
+# d'avancement sont stockés sur Project. Chaque création, validation,
+# dévalidation ou suppression d'un jalon les ajuste par une seule requête
+# UPDATE (expressions F), dans la transaction de l'enregistrement du jalon:
+# les listes lisent une colonne et peuvent trier ou filtrer en SQL.
+#
+# Sans jalon, le pourcentage reste celui saisi manuellement.
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Floor
+from django.db.models.lookups import GreaterThan
+
+# Tranches d'avancement proposées dans les filtres: (min inclus, max exclu)
+PROGRESS_RANGES = {
+    'low': (0, 30),
+    'medium': (30, 70),
+    'high': (70, 101),
+}
+
+
+def _progress(total, validated, manual=None):
+    """
+    Expression SQL du pourcentage à partir des compteurs (entiers); sans
+    jalon, le pourcentage manuel (`manual`, défaut: valeur enregistrée).
+    """
+    return Case(
+        When(GreaterThan(total, 0), then=Floor(validated * 100 / total)),
+        default=F('progress_percentage') if manual is None else Value(manual),
+        output_field=IntegerField(),
+    )
+
+
+def apply_milestone_delta(project_id, total=0, validated=0):
+    """
+    Ajuste les compteurs de jalons et l'avancement d'un projet (une requête).
+
+    Args:
+        total: variation du nombre de jalons (+1 création, -1 suppression)
+        validated: variation du nombre de jalons validés
+    """
+    from .models import Project
+
+    if not (total or validated):
+        return
+    new_total = F('milestones_total') + total
+    new_validated = F('validated_milestones_count') + validated
+    Project.objects.filter(pk=project_id).update(
+        milestones_total=new_total,
+        validated_milestones_count=new_validated,
+        progress_percentage=_progress(new_total, new_validated),
+    )
+
+
+def set_manual_progress(project_id, percentage):
+    """
+    Enregistre un pourcentage saisi à la main (une requête): il ne prend
+    effet que si le projet n'a aucun jalon, comme dans Project.progress.
+    """
+    from .models import Project
+
+    Project.objects.filter(pk=project_id).update(
+        progress_percentage=_progress(F('milestones_total'), F('validated_milestones_count'), manual=percentage),
+    )
+
+
+def recount_progress(projects=None):
+    """
+    Recalcule entièrement les compteurs (réparation, opérations en masse
+    sans signaux): une requête UPDATE pour tous les projets concernés.
+
+    Args:
+        projects: QuerySet de Project (défaut: tous)
+    """
+    from .models import Milestone, Project
+
+    def count(validated_only=False):
+        milestones = Milestone.objects.filter(project=OuterRef('pk'))
+        if validated_only:
+            milestones = milestones.filter(validated_by_supervisor=True)
+        return Coalesce(
+            Subquery(
+                milestones.order_by().values('project').annotate(value=Count('pk')).values('value'),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    projects = Project.objects.all() if projects is None else projects
+    return projects.update(
+        milestones_total=count(),
+        validated_milestones_count=count(validated_only=True),
+        progress_percentage=_progress(count(), count(validated_only=True)),
+    )
@@ -1,21 +1,50 @@
 # projects/signals.py
 # Signaux pour automatiser les actions sur les projets
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Milestone, Project
+from .models import Milestone, Project, WorkLog
 
 
 @receiver(post_save, sender=Milestone)
 def update_project_progress_on_milestone_change(sender, instance, created, **kwargs):
     """
-    Met à jour automatiquement la progression du projet quand un jalon est modifié.
-    Se déclenche après la sauvegarde d'un jalon.
+    Ajuste les compteurs de jalons et la progression du projet quand un jalon
+    est créé, validé, dévalidé ou change de projet (variation, sans recalcul).
     """
-    project = instance.project
+    from .progress import apply_milestone_delta
     
-    # Recalculer et mettre à jour le pourcentage
-    project.update_progress_from_milestones()
+    validated = int(bool(instance.validated_by_supervisor))
+    stored_project_id = None if created else getattr(instance, '_stored_project_id', None)
+    stored_validated = int(bool(getattr(instance, '_stored_validated', False)))
+    
+    if not created and stored_project_id is None:
+        # Instance non chargée depuis la base: recalcul complet par sécurité
+        instance.project.update_progress_from_milestones()
+    elif stored_project_id is None:
+        apply_milestone_delta(instance.project_id, total=1, validated=validated)
+    elif stored_project_id != instance.project_id:
+        apply_milestone_delta(stored_project_id, total=-1, validated=-stored_validated)
+        apply_milestone_delta(instance.project_id, total=1, validated=validated)
+    else:
+        apply_milestone_delta(instance.project_id, validated=validated - stored_validated)
+    
+    # Nouvel état enregistré (enregistrements successifs de la même instance)
+    instance._stored_project_id = instance.project_id
+    instance._stored_validated = instance.validated_by_supervisor
+
+
+@receiver(post_delete, sender=Milestone)
+def update_project_progress_on_milestone_delete(sender, instance, **kwargs):
+    """Retire le jalon supprimé des compteurs du projet."""
+    from .progress import apply_milestone_delta
+    
+    validated = getattr(instance, '_stored_validated', instance.validated_by_supervisor)
+    apply_milestone_delta(
+        getattr(instance, '_stored_project_id', instance.project_id),
+        total=-1,
+        validated=-int(bool(validated)),
+    )
 
 
 @receiver(pre_save, sender=Milestone)
@@ -43,3 +72,30 @@ def notify_on_milestone_validation(sender, instance, **kwargs):
         
         except Milestone.DoesNotExist:
             pass
+
+
+@receiver(post_save, sender=WorkLog)
+def update_work_log_week_on_save(sender, instance, created, **kwargs):
+    """
+    Ajuste le cumul hebdomadaire du journal quand une entrée est créée ou
+    modifiée (durée, date, visibilité, lecture par l'encadreur).
+    """
+    from .worklog_rollup import apply_worklog_change, rebuild_worklog_weeks
+    
+    current = instance.rollup_state()
+    if not created and not hasattr(instance, '_stored_rollup'):
+        # Instance non chargée depuis la base: recalcul du projet par sécurité
+        rebuild_worklog_weeks(Project.objects.filter(pk=instance.project_id))
+    else:
+        apply_worklog_change(None if created else instance._stored_rollup, current)
+    
+    # Nouvel état enregistré (enregistrements successifs de la même instance)
+    instance._stored_rollup = current
+
+
+@receiver(post_delete, sender=WorkLog)
+def update_work_log_week_on_delete(sender, instance, **kwargs):
+    """Retire l'entrée supprimée du cumul de sa semaine."""
+    from .worklog_rollup import apply_worklog_change
+    
+    apply_worklog_change(getattr(instance, '_stored_rollup', instance.rollup_state()), None)
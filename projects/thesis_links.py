@@ -0,0 +1,42 @@
+# projects/thesis_links.py
+# Liens signés et temporaires de téléchargement du mémoire pour le jury
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils import timezone
+
+SALT = 'projects.thesis-download'
+
+
+def make_thesis_token(project, user):
+    """Jeton signé et horodaté autorisant `user` à télécharger le mémoire de `project`."""
+    return signing.dumps({'project': project.pk, 'user': user.pk}, salt=SALT, compress=True)
+
+
+def read_thesis_token(token):
+    """
+    Vérifie un jeton de téléchargement.
+
+    Returns:
+        tuple: (project_id, user_id)
+
+    Raises:
+        signing.SignatureExpired: lien expiré
+        signing.BadSignature: lien invalide ou modifié
+    """
+    data = signing.loads(token, salt=SALT, max_age=settings.THESIS_LINK_MAX_AGE)
+    return data['project'], data['user']
+
+
+def thesis_download_url(project, user):
+    """URL absolue du lien de téléchargement envoyé par email."""
+    path = reverse('projects:thesis_download', args=[make_thesis_token(project, user)])
+    return settings.SITE_URL.rstrip('/') + path
+
+
+def thesis_link_expiry():
+    """Date d'expiration d'un lien créé maintenant."""
+    return timezone.now() + timedelta(seconds=settings.THESIS_LINK_MAX_AGE)
@@ -0,0 +1,181 @@
+# projects/timeline.py
+# Fil d'activité des projets (commentaires, jalons, livrables, réunions, journal)
+#
+# Chaque type d'événement est une requête values() aux colonnes communes
+# (type, clé, date, projet, résumé, auteur); les requêtes sont réunies par un
+# UNION ALL trié par (date, clé) décroissantes et limité à une page: une page
+# du fil coûte une seule requête, quel que soit l'historique du projet.
+#
+# La pagination est par curseur (config.pagination): la clé d'un événement
+# combine l'id de la ligne et le type (id * nombre de types + rang du type),
+# elle est donc unique dans le fil et sert de départage à date égale.
+
+from django.db import connection
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from config.pagination import decode_cursor, encode_cursor
+
+DEFAULT_PAGE_SIZE = 20
+
+# Longueur des extraits (commentaires, journal de bord)
+SUMMARY_LENGTH = 120
+
+# Types d'événements: (libellé, icône, couleur). L'ordre fixe le rang du type
+# dans la clé: ne pas réordonner, seulement ajouter à la fin.
+EVENT_TYPES = {
+    'comment': ('Commentaire', 'fas fa-comment', 'info'),
+    'milestone': ('Jalon ajouté', 'fas fa-flag', 'secondary'),
+    'milestone_validated': ('Jalon validé', 'fas fa-check-circle', 'primary'),
+    'deliverable': ('Livrable soumis', 'fas fa-file-upload', 'success'),
+    'deliverable_reviewed': ('Livrable révisé', 'fas fa-clipboard-check', 'warning'),
+    'meeting': ('Réunion', 'fas fa-handshake', 'dark'),
+    'worklog': ('Journal de bord', 'fas fa-book', 'light'),
+}
+_RANKS = {kind: rank for rank, kind in enumerate(EVENT_TYPES)}
+
+
+def _full_name(prefix):
+    return Concat(F(f'{prefix}__first_name'), Value(' '), F(f'{prefix}__last_name'), output_field=CharField())
+
+
+def _events(queryset, kind, occurred_at, summary, actor):
+    """
+    Colonnes communes d'un type d'événement, toujours annotées dans le même
+    ordre (l'UNION associe les colonnes par position), sans le tri par défaut
+    du modèle.
+    """
+    return queryset.annotate(
+        kind=Value(kind, output_field=CharField()),
+        key=F('pk') * len(EVENT_TYPES) + _RANKS[kind],
+        occurred_at=F(occurred_at),
+        project_ref=F('project_id'),
+        project_title=F('project__title'),
+        summary=summary,
+        actor=actor,
+    ).filter(occurred_at__isnull=False).order_by().values(
+        'kind', 'key', 'occurred_at', 'project_ref', 'project_title', 'summary', 'actor'
+    )
+
+
+def _branches(projects, include_hidden_logs=False):
+    """Une requête par type d'événement, restreinte aux projets donnés."""
+    from .models import Comment, Deliverable, Meeting, Milestone, WorkLog
+
+    excerpt = lambda field: Substr(field, 1, SUMMARY_LENGTH)
+    no_actor = Value('', output_field=CharField())
+
+    work_logs = WorkLog.objects.filter(project__in=projects)
+    if not include_hidden_logs:
+        work_logs = work_logs.filter(is_visible_to_supervisor=True)
+
+    return [
+        _events(
+            Comment.objects.filter(project__in=projects),
+            'comment', 'created_at', excerpt('content'), _full_name('author'),
+        ),
+        _events(
+            Milestone.objects.filter(project__in=projects),
+            'milestone', 'created_at', F('title'), no_actor,
+        ),
+        _events(
+            Milestone.objects.filter(project__in=projects, validated_by_supervisor=True),
+            'milestone_validated', 'validation_date', F('title'), no_actor,
+        ),
+        _events(
+            Deliverable.objects.filter(project__in=projects),
+            'deliverable', 'submitted_at', F('title'), _full_name('submitted_by'),
+        ),
+        _events(
+            Deliverable.objects.filter(project__in=projects, reviewed_at__isnull=False),
+            'deliverable_reviewed', 'reviewed_at', F('title'), _full_name('reviewed_by'),
+        ),
+        # Réunions: seulement celles qui ont eu lieu (ou auraient dû avoir lieu)
+        _events(
+            Meeting.objects.filter(project__in=projects, scheduled_date__lte=timezone.now()).exclude(status='cancelled'),
+            'meeting', 'scheduled_date', F('title'), _full_name('created_by'),
+        ),
+        _events(
+            work_logs,
+            'worklog', 'created_at', excerpt('activities'), no_actor,
+        ),
+    ]
+
+
+class TimelinePage:
+    """Page du fil d'activité, avec le curseur de la page suivante."""
+
+    def __init__(self, events, has_next):
+        self.events = events
+        # Sans événement, pas de curseur possible: la page est la dernière
+        self.has_next = has_next and bool(events)
+        last = events[-1] if events else None
+        self.next_cursor = encode_cursor(last['occurred_at'], last['key']) if self.has_next else None
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def as_json(self):
+        return {
+            'events': [
+                {
+                    'type': event['kind'],
+                    'label': event['label'],
+                    'icon': event['icon'],
+                    'color': event['color'],
+                    'occurred_at': event['occurred_at'].isoformat(),
+                    'project_id': event['project_ref'],
+                    'project': event['project_title'],
+                    'summary': event['summary'],
+                    'actor': event['actor'],
+                }
+                for event in self.events
+            ],
+            'has_next': self.has_next,
+            'next_cursor': self.next_cursor,
+        }
+
+
+def timeline_page(projects, after=None, per_page=DEFAULT_PAGE_SIZE, include_hidden_logs=False):
+    """
+    Une page du fil d'activité des projets, du plus récent au plus ancien
+    (une requête).
+
+    Args:
+        projects: QuerySet de Project (un projet ou les projets d'un encadreur)
+        after: curseur de la dernière ligne de la page précédente
+        include_hidden_logs: inclure les entrées du journal non partagées
+            avec l'encadreur (consultation par l'étudiant lui-même)
+
+    Returns:
+        TimelinePage: events = [{'kind', 'key', 'occurred_at', 'project_ref',
+        'project_title', 'summary', 'actor', 'label', 'icon', 'color'}, ...]
+    """
+    per_page = max(1, per_page)
+    projects = projects.values('pk')
+    branches = _branches(projects, include_hidden_logs=include_hidden_logs)
+
+    cursor = decode_cursor(after)
+    if cursor:
+        value, key = cursor
+        branches = [
+            branch.filter(Q(occurred_at__lt=value) | Q(occurred_at=value, key__lt=key))
+            for branch in branches
+        ]
+
+    # Là où le moteur le permet, chaque branche est déjà limitée à une page
+    if connection.features.supports_slicing_ordering_in_compound:
+        branches = [branch.order_by('-occurred_at', '-key')[:per_page + 1] for branch in branches]
+
+    first, *others = branches
+    rows = list(first.union(*others, all=True).order_by('-occurred_at', '-key')[:per_page + 1])
+
+    events = rows[:per_page]
+    for event in events:
+        event['label'], event['icon'], event['color'] = EVENT_TYPES[event['kind']]
+        event['actor'] = (event['actor'] or '').strip()
+    return TimelinePage(events, has_next=len(rows) > per_page)
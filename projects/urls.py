@@ -13,12 +13,15 @@ urlpatterns = [
     # Nouvelles vues pour l'encadreur
     path('supervisor/students/', views.supervisor_students_view, name='supervisor_students'),
     path('supervisor/student/<int:student_id>/', views.supervisor_student_detail_view, name='supervisor_student_detail'),
+    path('supervisor/work-logs/', views.supervisor_work_logs_view, name='supervisor_work_logs'),
+    path('supervisor/timeline/', views.supervisor_timeline_view, name='supervisor_timeline'),
     path('<int:pk>/evaluate/', views.project_evaluate_view, name='evaluate'),
     
     # Réunion de cadrage
     path('<int:project_id>/kickoff/', views.project_kickoff_view, name='kickoff'),
     
     path('<int:pk>/', views.project_detail_view, name='detail'),
+    path('<int:pk>/timeline/', views.project_timeline_view, name='timeline'),
     path('<int:pk>/update/', views.project_update_view, name='update'),
     path('<int:project_pk>/milestone/create/', views.milestone_create_view, name='milestone_create'),
     path('milestone/<int:milestone_pk>/update/', views.milestone_update_view, name='milestone_update'),
@@ -26,4 +29,7 @@ urlpatterns = [
     path('<int:project_pk>/deliverable/create/', views.deliverable_create_view, name='deliverable_create'),
     path('<int:project_pk>/deliverable/submit/', views.deliverable_submit_view, name='deliverable_submit'),
     path('deliverable/<int:deliverable_pk>/review/', views.deliverable_review_view, name='deliverable_review'),
+    
+    # Lien signé de téléchargement du mémoire (jury)
+    path('thesis/<str:token>/', views.thesis_download_view, name='thesis_download'),
 ]
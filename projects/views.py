@@ -10,6 +10,7 @@ def project_list_view(request):
     """Liste des projets avec statistiques."""
     from django.db.models import Q, Count, Avg
     from subjects.models import Assignment
+    from .progress import PROGRESS_RANGES
     
     # Filtrer les projets selon le rôle
     if request.user.is_student():
@@ -26,17 +27,26 @@ def project_list_view(request):
     # Appliquer les filtres pour l'admin
     status_filter = request.GET.get('status')
     supervisor_filter = request.GET.get('supervisor')
+    progress_filter = request.GET.get('progress')
+    sort = request.GET.get('sort')
     
     if status_filter:
         projects = projects.filter(status=status_filter)
     if supervisor_filter:
         projects = projects.filter(assignment__subject__supervisor_id=supervisor_filter)
+    if progress_filter in PROGRESS_RANGES:
+        # Avancement stocké: filtre en SQL
+        low, high = PROGRESS_RANGES[progress_filter]
+        projects = projects.filter(progress_percentage__gte=low, progress_percentage__lt=high)
     
     # Sélectionner les relations nécessaires
     projects = projects.select_related(
         'assignment__student',
         'assignment__subject__supervisor'
-    ).order_by('-created_at')
+    ).order_by(*{
+        'progress': ['progress_percentage', '-created_at'],
+        '-progress': ['-progress_percentage', '-created_at'],
+    }.get(sort, ['-created_at']))
     
     # Statistiques pour l'admin
     context = {
@@ -74,6 +84,8 @@ def project_list_view(request):
             'supervisors': supervisors,
             'selected_status': status_filter,
             'selected_supervisor': supervisor_filter,
+            'selected_progress': progress_filter,
+            'selected_sort': sort,
         })
     
     return render(request, 'projects/project_list.html', context)
@@ -95,13 +107,95 @@ def project_detail_view(request, pk):
             return redirect('projects:detail', pk=pk)
     else:
         comment_form = CommentForm()
-    
+
+    # Fil d'activité: première page, la suite est chargée par l'API JSON
+    from .timeline import timeline_page
+    timeline = None
+    if _can_follow_project(request.user, project):
+        timeline = timeline_page(
+            Project.objects.filter(pk=project.pk),
+            include_hidden_logs=_is_project_student(request.user, project),
+        )
+
     return render(request, 'projects/project_detail.html', {
         'project': project,
         'comment_form': comment_form,
+        'timeline': timeline,
     })
 
 
+def _is_project_student(user, project):
+    from communications.notifications import project_students
+    return user in project_students(project)
+
+
+def _can_follow_project(user, project):
+    """Étudiants du projet, encadreurs du sujet et administration."""
+    subject = project.assignment.subject
+    return (
+        user.is_admin_staff()
+        or user.pk in (subject.supervisor_id, subject.co_supervisor_id)
+        or _is_project_student(user, project)
+    )
+
+
+@login_required
+def project_timeline_view(request, pk):
+    """
+    API JSON du fil d'activité d'un projet (défilement infini).
+
+    Paramètres GET: after (curseur de la page précédente), per_page.
+    """
+    from django.http import JsonResponse
+    from .timeline import DEFAULT_PAGE_SIZE, timeline_page
+
+    project = get_object_or_404(
+        Project.objects.select_related('assignment__subject', 'assignment__student'), pk=pk
+    )
+    if not _can_follow_project(request.user, project):
+        return JsonResponse({'error': "Accès non autorisé à ce projet."}, status=403)
+
+    try:
+        per_page = max(1, min(int(request.GET.get('per_page') or DEFAULT_PAGE_SIZE), 100))
+    except ValueError:
+        return JsonResponse({'error': "Paramètres invalides."}, status=400)
+
+    page = timeline_page(
+        Project.objects.filter(pk=project.pk),
+        after=request.GET.get('after'),
+        per_page=per_page,
+        include_hidden_logs=_is_project_student(request.user, project),
+    )
+    return JsonResponse(page.as_json())
+
+
+@login_required
+def supervisor_timeline_view(request):
+    """
+    API JSON du fil d'activité de tous les projets encadrés (défilement infini).
+
+    Paramètres GET: after (curseur de la page précédente), per_page.
+    """
+    from django.db.models import Q
+    from django.http import JsonResponse
+    from .timeline import DEFAULT_PAGE_SIZE, timeline_page
+
+    if not request.user.is_teacher():
+        return JsonResponse({'error': "Accès réservé aux encadreurs."}, status=403)
+
+    try:
+        per_page = max(1, min(int(request.GET.get('per_page') or DEFAULT_PAGE_SIZE), 100))
+    except ValueError:
+        return JsonResponse({'error': "Paramètres invalides."}, status=400)
+
+    projects = Project.objects.filter(
+        Q(assignment__subject__supervisor=request.user)
+        | Q(assignment__subject__co_supervisor=request.user)
+    )
+    page = timeline_page(projects, after=request.GET.get('after'), per_page=per_page)
+    return JsonResponse(page.as_json())
+
+
 @login_required
 def project_update_view(request, pk):
     """Modification d'un projet."""
@@ -211,31 +305,12 @@ def project_create_view(request):
             project = form.save()
             messages.success(request, f"Projet '{project.title}' créé avec succès.")
             
-            # Créer des jalons par défaut
+            # Créer des jalons par défaut (modèles de la filière et du niveau du sujet)
             if not project.milestones.exists():
-                default_milestones = [
-                    {'title': 'Analyse et spécification', 'description': 'Analyse des besoins et rédaction du cahier des charges', 'order': 1},
-                    {'title': 'Conception', 'description': 'Architecture et conception détaillée du système', 'order': 2},
-                    {'title': 'Développement', 'description': 'Implémentation des fonctionnalités principales', 'order': 3},
-                    {'title': 'Tests et validation', 'description': 'Tests unitaires, d\'intégration et validation', 'order': 4},
-                    {'title': 'Documentation et finalisation', 'description': 'Rédaction de la documentation et préparation de la soutenance', 'order': 5},
-                ]
-                
-                from django.utils import timezone
-                from datetime import timedelta
-                start_date = project.start_date or timezone.now().date()
-                
-                for i, milestone_data in enumerate(default_milestones):
-                    Milestone.objects.create(
-                        project=project,
-                        title=milestone_data['title'],
-                        description=milestone_data['description'],
-                        order=milestone_data['order'],
-                        due_date=start_date + timedelta(days=30 * (i + 1)),  # Un mois par jalon
-                        status='pending'
-                    )
-                
-                messages.info(request, "5 jalons par défaut ont été créés. Vous pouvez les modifier.")
+                from .bootstrap import create_default_milestones
+                count = create_default_milestones(project)
+                if count:
+                    messages.info(request, f"{count} jalons par défaut ont été créés. Vous pouvez les modifier.")
             
             return redirect('projects:detail', pk=project.pk)
     else:
@@ -384,70 +459,58 @@ def supervisor_students_view(request):
         messages.error(request, "Vous n'êtes pas autorisé à accéder à cette page.")
         return redirect('home')
     
-    from django.db.models import Avg, Count, Q
-    from subjects.models import Assignment
+    from django.db.models import Count, Q
+    from django.utils import timezone
     
-    # Récupérer tous les projets encadrés
-    projects = Project.objects.filter(
+    today = timezone.now().date()
+    
+    # Récupérer tous les projets encadrés avec leurs compteurs en une seule requête
+    projects = list(Project.objects.filter(
         assignment__subject__supervisor=request.user
     ).select_related(
         'assignment__student',
         'assignment__subject'
-    ).prefetch_related(
-        'milestones',
-        'deliverables'
-    ).order_by('-updated_at')
-    
-    # Statistiques
-    students_count = projects.count()
-    active_projects_count = projects.filter(status='in_progress').count()
-    
-    # Calculer les items en attente
-    pending_milestones = 0
-    pending_deliverables = 0
-    delayed_milestones = 0
-    
-    from django.utils import timezone
-    today = timezone.now().date()
-    
-    for project in projects:
-        # Jalons non validés mais complétés
-        pending_milestones += project.milestones.filter(
-            status='completed',
-            validated_by_supervisor=False
-        ).count()
-        
+    ).annotate(
+        # Jalons non validés mais complétés (totaux et jalons validés: colonnes du projet)
+        pending_milestones_count=Count(
+            'milestones',
+            filter=Q(milestones__status='completed', milestones__validated_by_supervisor=False),
+            distinct=True
+        ),
         # Jalons en retard
-        delayed_milestones += project.milestones.filter(
-            due_date__lt=today
-        ).exclude(status='completed').count()
-        
+        delayed_milestones_count=Count(
+            'milestones',
+            filter=Q(milestones__due_date__lt=today) & ~Q(milestones__status='completed'),
+            distinct=True
+        ),
+        deliverables_total=Count('deliverables', distinct=True),
+        approved_deliverables_count=Count(
+            'deliverables', filter=Q(deliverables__status='approved'), distinct=True
+        ),
         # Livrables soumis non révisés
-        pending_deliverables += project.deliverables.filter(
-            status='submitted'
-        ).count()
-    
+        pending_deliverables_count=Count(
+            'deliverables', filter=Q(deliverables__status='submitted'), distinct=True
+        ),
+    ).order_by('-updated_at'))
+    
+    # Statistiques calculées à partir des compteurs annotés (aucune requête supplémentaire)
+    students_count = len(projects)
+    active_projects_count = sum(1 for project in projects if project.status == 'in_progress')
+    pending_milestones = sum(project.pending_milestones_count for project in projects)
+    delayed_milestones = sum(project.delayed_milestones_count for project in projects)
+    pending_deliverables = sum(project.pending_deliverables_count for project in projects)
     pending_items_count = pending_milestones + pending_deliverables
     
     # Progression moyenne
-    average_progress = projects.aggregate(Avg('progress_percentage'))['progress_percentage__avg'] or 0
+    average_progress = (
+        sum(project.progress_percentage for project in projects) / students_count
+        if students_count else 0
+    )
     
-    # Annoter les projets avec des flags et compteurs
+    # Flags pour le template
     for project in projects:
-        project.milestones_pending = project.milestones.filter(
-            status='completed',
-            validated_by_supervisor=False
-        ).exists()
-        project.deliverables_pending = project.deliverables.filter(
-            status='submitted'
-        ).exists()
-        # Ajouter les compteurs pour le template
-        project.validated_milestones_count = project.milestones.filter(
-            validated_by_supervisor=True
-        ).count()
-        project.approved_deliverables_count = project.deliverables.filter(
-            status='approved'
-        ).count()
+        project.milestones_pending = project.pending_milestones_count > 0
+        project.deliverables_pending = project.pending_deliverables_count > 0
     
     context = {
         'projects': projects,
@@ -456,6 +519,7 @@ def supervisor_students_view(request):
         'pending_items_count': pending_items_count,
         'pending_milestones_count': pending_milestones,
         'pending_deliverables_count': pending_deliverables,
+        'pending_deliverables': pending_deliverables,
         'delayed_milestones': delayed_milestones,
         'average_progress': average_progress,
     }
@@ -463,6 +527,33 @@ def supervisor_students_view(request):
     return render(request, 'projects/supervisor_students.html', context)
 
 
+@login_required
+def supervisor_work_logs_view(request):
+    """Évolution hebdomadaire de l'effort (journal de bord) de tous les étudiants encadrés."""
+    if not request.user.is_teacher():
+        messages.error(request, "Vous n'êtes pas autorisé à accéder à cette page.")
+        return redirect('home')
+    
+    from .worklog_rollup import DEFAULT_TREND_WEEKS, effort_trends
+    
+    try:
+        weeks = min(max(int(request.GET.get('weeks') or DEFAULT_TREND_WEEKS), 2), 26)
+    except ValueError:
+        weeks = DEFAULT_TREND_WEEKS
+    
+    # Une requête: projets encadrés et cumuls hebdomadaires de la période
+    trends = effort_trends(
+        Project.objects.filter(assignment__subject__supervisor=request.user),
+        weeks=weeks,
+    )
+    
+    return render(request, 'projects/supervisor_work_logs.html', {
+        'trends': trends,
+        'weeks': weeks,
+        'week_choices': [4, 8, 12, 26],
+    })
+
+
 @login_required
 def supervisor_student_detail_view(request, student_id):
     """Détail du suivi d'un étudiant par son encadreur."""
@@ -487,9 +578,9 @@ def supervisor_student_detail_view(request, student_id):
     deliverables = project.deliverables.all().order_by('-submitted_at')
     comments = Comment.objects.filter(project=project).order_by('-created_at')[:10]
     
-    # Statistiques
-    total_milestones_count = milestones.count()
-    validated_milestones_count = milestones.filter(validated_by_supervisor=True).count()
+    # Statistiques (compteurs de jalons stockés sur le projet)
+    total_milestones_count = project.milestones_total
+    validated_milestones_count = project.validated_milestones_count
     pending_milestones_count = milestones.filter(
         status='completed',
         validated_by_supervisor=False
@@ -501,29 +592,9 @@ def supervisor_student_detail_view(request, student_id):
     
     comments_count = Comment.objects.filter(project=project).count()
     
-    # Activités récentes (simplifiée)
-    recent_activities = []
-    
-    # Jalons récemment complétés
-    for milestone in milestones.filter(status='completed').order_by('-completed_date')[:3]:
-        recent_activities.append({
-            'type': 'milestone',
-            'type_class': 'primary',
-            'description': f"Jalon complété: {milestone.title}",
-            'created_at': milestone.completed_date or milestone.updated_at,
-        })
-    
-    # Livrables récemment soumis
-    for deliverable in deliverables[:3]:
-        recent_activities.append({
-            'type': 'deliverable',
-            'type_class': 'success',
-            'description': f"Livrable soumis: {deliverable.title}",
-            'created_at': deliverable.submitted_at,
-        })
-    
-    # Trier par date
-    recent_activities = sorted(recent_activities, key=lambda x: x['created_at'], reverse=True)[:5]
+    # Activités récentes: première page du fil d'activité du projet
+    from .timeline import timeline_page
+    recent_activities = timeline_page(Project.objects.filter(pk=project.pk), per_page=5)
     
     # Annoter les jalons
     from django.utils import timezone
@@ -652,6 +723,20 @@ def project_kickoff_view(request, project_id):
         
         messages.success(request, "Réunion de cadrage enregistrée. Le projet est maintenant en cours!")
         
+        # Prochaine réunion: prévenir si l'encadreur s'est déclaré indisponible
+        if next_meeting:
+            from django.utils.dateparse import parse_datetime
+            from users.availability import unavailable_teachers
+            next_date = parse_datetime(next_meeting)
+            if next_date and unavailable_teachers(
+                [request.user.pk], next_date.date(), next_date.time(), 60
+            ):
+                messages.warning(
+                    request,
+                    "Attention : vous n'êtes pas disponible au créneau prévu pour la prochaine réunion "
+                    "(voir Mes disponibilités)."
+                )
+        
         # Notifier l'étudiant
         from communications.models import Notification
         Notification.objects.create(
@@ -673,3 +758,43 @@ def project_kickoff_view(request, project_id):
     }
     
     return render(request, 'projects/kickoff_meeting.html', context)
+
+
+def thesis_download_view(request, token):
+    """
+    Téléchargement du mémoire par un membre du jury via le lien signé reçu
+    par email (sans connexion requise).
+    
+    Le fichier est transmis en flux (FileResponse), sans être chargé en
+    mémoire. Le lien n'est valable que pour un membre actuel du jury.
+    """
+    from django.core import signing
+    from django.http import FileResponse, Http404
+    from django.db.models import Q
+    from defenses.models import Defense
+    from .thesis_links import read_thesis_token
+    
+    try:
+        project_id, user_id = read_thesis_token(token)
+    except signing.SignatureExpired:
+        raise Http404("Ce lien de téléchargement a expiré.")
+    except signing.BadSignature:
+        raise Http404("Lien de téléchargement invalide.")
+    
+    # Le destinataire doit toujours faire partie du jury
+    is_jury_member = Defense.objects.filter(project_id=project_id).filter(
+        Q(defense_jury_members__teacher_id=user_id) | Q(jury_members__user_id=user_id)
+    ).exists()
+    if not is_jury_member:
+        raise Http404("Lien de téléchargement invalide.")
+    
+    project = get_object_or_404(Project, pk=project_id)
+    if not project.thesis_file:
+        raise Http404("Aucun mémoire déposé pour ce projet.")
+    
+    return FileResponse(
+        project.thesis_file.open('rb'),
+        as_attachment=True,
+        filename=f'memoire_{project.pk}.pdf',
+        content_type='application/pdf',
+    )
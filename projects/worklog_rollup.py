@@ -0,0 +1,183 @@
+# projects/worklog_rollup.py
+# Cumuls hebdomadaires du journal de bord
+#
+# Heures, nombre d'entrées et entrées non lues par l'encadreur sont stockés par
+# projet et par semaine ISO (WorkLogWeek). Chaque enregistrement ou suppression
+# d'entrée les ajuste par variation (une requête UPDATE, expressions F), dans
+# la transaction de l'entrée: les totaux de la semaine et l'évolution de
+# l'effort de tous les étudiants se lisent sans agréger le journal.
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, IntegerField, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncWeek
+from django.utils import timezone
+
+# Semaines affichées par défaut dans l'évolution de l'effort
+DEFAULT_TREND_WEEKS = 8
+
+
+def week_start(day):
+    """Lundi de la semaine ISO d'une date."""
+    if isinstance(day, datetime):
+        day = timezone.localtime(day).date() if timezone.is_aware(day) else day.date()
+    return day - timedelta(days=day.weekday())
+
+
+def apply_worklog_delta(project_id, day, hours=0, entries=0, unread=0):
+    """
+    Ajuste le cumul de la semaine d'une date (une requête; deux à la
+    première entrée de la semaine).
+    """
+    from .models import WorkLogWeek
+
+    if not (hours or entries or unread):
+        return
+    week = WorkLogWeek.objects.filter(project_id=project_id, week_start=week_start(day))
+    changes = {
+        'hours': F('hours') + hours,
+        'entries': F('entries') + entries,
+        'unread_count': F('unread_count') + unread,
+    }
+    if week.update(**changes) or entries < 0:
+        # Semaine absente lors d'un retrait: rien à défaire (voir rebuild_worklog_weeks)
+        return
+    try:
+        with transaction.atomic():
+            WorkLogWeek.objects.create(
+                project_id=project_id, week_start=week_start(day),
+                hours=hours, entries=entries, unread_count=unread,
+            )
+    except IntegrityError:
+        # Semaine créée entre-temps par un enregistrement concurrent
+        week.update(**changes)
+
+
+def apply_worklog_change(stored, current):
+    """
+    Reporte le passage d'une entrée de l'état `stored` à l'état `current`
+    ((projet, date, heures, non lue), ou None si absente).
+    """
+    if stored == current:
+        return
+    if stored and current and stored[:2] == current[:2]:
+        # Même projet et même date: une seule variation
+        apply_worklog_delta(
+            current[0], current[1],
+            hours=current[2] - stored[2],
+            unread=int(current[3]) - int(stored[3]),
+        )
+        return
+    if stored:
+        apply_worklog_delta(stored[0], stored[1], hours=-stored[2], entries=-1, unread=-int(stored[3]))
+    if current:
+        apply_worklog_delta(current[0], current[1], hours=current[2], entries=1, unread=int(current[3]))
+
+
+def rebuild_worklog_weeks(projects=None):
+    """
+    Recalcule entièrement les cumuls (réparation, opérations en masse sans
+    signaux): une requête d'agrégation, une suppression et une insertion.
+
+    Args:
+        projects: QuerySet de Project (défaut: tous)
+
+    Returns:
+        int: nombre de semaines enregistrées
+    """
+    from .models import WorkLog, WorkLogWeek
+
+    logs = WorkLog.objects.all()
+    weeks = WorkLogWeek.objects.all()
+    if projects is not None:
+        logs = logs.filter(project__in=projects)
+        weeks = weeks.filter(project__in=projects)
+
+    rows = logs.annotate(week=TruncWeek('date')).values('project_id', 'week').annotate(
+        total_hours=Sum('duration_hours'),
+        total_entries=Sum(Value(1), output_field=IntegerField()),
+        total_unread=Sum(Value(1), filter=Q(is_visible_to_supervisor=True, supervisor_read_at__isnull=True),
+                         output_field=IntegerField()),
+    ).order_by()
+
+    with transaction.atomic():
+        weeks.delete()
+        created = WorkLogWeek.objects.bulk_create([
+            WorkLogWeek(
+                project_id=row['project_id'],
+                week_start=row['week'],
+                hours=row['total_hours'] or 0,
+                entries=row['total_entries'],
+                unread_count=row['total_unread'] or 0,
+            )
+            for row in rows
+        ], batch_size=500)
+    return len(created)
+
+
+def effort_trends(projects, weeks=DEFAULT_TREND_WEEKS, today=None):
+    """
+    Évolution de l'effort des projets sur les dernières semaines (une requête).
+
+    Returns:
+        dict: {
+            'weeks': [lundi, ...] du plus ancien au plus récent,
+            'rows': [{'project', 'student', 'hours': [heures par semaine],
+                      'entries', 'unread', 'average', 'trend'}, ...],
+            'max_hours': plus grand total hebdomadaire (échelle des barres),
+        }
+
+        `trend` compare la dernière semaine écoulée à la moyenne des semaines
+        précédentes: 'up', 'down', 'flat' ou 'none' (aucune entrée).
+    """
+    weeks = max(weeks, 2)
+    current = week_start(today or timezone.localdate())
+    mondays = [current - timedelta(weeks=offset) for offset in range(weeks - 1, -1, -1)]
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=6, decimal_places=1))
+
+    def total(field, **week):
+        lookup = Q(work_log_weeks__week_start__gte=mondays[0], **week)
+        output = DecimalField(max_digits=6, decimal_places=1) if field == 'hours' else IntegerField()
+        default = zero if field == 'hours' else Value(0)
+        return Coalesce(Sum(f'work_log_weeks__{field}', filter=lookup), default, output_field=output)
+
+    annotations = {
+        f'hours_{index}': total('hours', work_log_weeks__week_start=monday)
+        for index, monday in enumerate(mondays)
+    }
+    annotations['entries_total'] = total('entries')
+    annotations['unread_total'] = total('unread_count')
+
+    projects = projects.select_related('assignment__student').annotate(**annotations).order_by(
+        'assignment__student__last_name', 'assignment__student__first_name'
+    )
+
+    rows = []
+    max_hours = Decimal('0')
+    for project in projects:
+        hours = [getattr(project, f'hours_{index}') for index in range(len(mondays))]
+        max_hours = max([max_hours, *hours])
+        # Semaine en cours incomplète: la tendance porte sur les semaines écoulées
+        previous, last = hours[:-2], hours[-2]
+        average = sum(previous) / len(previous) if previous else Decimal('0')
+        if not project.entries_total:
+            trend = 'none'
+        elif last > average * Decimal('1.2'):
+            trend = 'up'
+        elif last < average * Decimal('0.8'):
+            trend = 'down'
+        else:
+            trend = 'flat'
+        rows.append({
+            'project': project,
+            'student': project.assignment.student,
+            'hours': hours,
+            'entries': project.entries_total,
+            'unread': project.unread_total,
+            'average': average,
+            'trend': trend,
+        })
+
+    return {'weeks': mondays, 'rows': rows, 'max_hours': max_hours}
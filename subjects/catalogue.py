@@ -0,0 +1,103 @@
+# subjects/catalogue.py
+# Catalogue des sujets publiés: pages de résultats mises en cache
+#
+# Pendant la période de candidature, tous les étudiants d'un même niveau
+# consultent les mêmes pages avec les mêmes filtres: chaque page est
+# calculée une fois puis servie depuis le cache, jusqu'à la prochaine
+# modification d'un sujet, d'une candidature ou d'une affectation.
+
+import hashlib
+
+from django.core.paginator import Paginator
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from config.cache import bump_version, cached
+
+from .models import Application, Assignment, Subject
+from .search import search_subjects
+
+SUBJECTS_PER_PAGE = 12
+
+# Durée de validité d'une page en cache (secondes)
+SUBJECT_LIST_CACHE_TIMEOUT = 600
+
+FILTER_FIELDS = ('search', 'level', 'filiere', 'type')
+
+
+def invalidate_subject_list():
+    """Invalide toutes les pages du catalogue en cache (appelé par les signaux)."""
+    bump_version('subjects')
+
+
+def _count_by_subject(queryset):
+    """Sous-requête scalaire: nombre de lignes de `queryset` pour le sujet courant."""
+    return Coalesce(Subquery(
+        queryset.filter(subject=OuterRef('pk')).order_by().values('subject').annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def published_subjects(filters, level=None):
+    """
+    Sujets publiés correspondant aux filtres du formulaire SubjectFilterForm.
+
+    Args:
+        filters: dict des valeurs nettoyées du formulaire (search, level, filiere, type)
+        level: niveau imposé (niveau de l'étudiant connecté)
+    """
+    subjects = Subject.objects.filter(status='published').select_related('supervisor', 'co_supervisor')
+
+    if filters.get('search'):
+        # Recherche plein texte, résultats triés par pertinence
+        subjects = search_subjects(subjects, filters['search'])
+    if filters.get('level'):
+        subjects = subjects.filter(level=filters['level'])
+    if filters.get('filiere'):
+        subjects = subjects.filter(filiere=filters['filiere'])
+    if filters.get('type'):
+        subjects = subjects.filter(type=filters['type'])
+    if level:
+        subjects = subjects.filter(level=level)
+
+    # Compteurs en sous-requêtes: pas de GROUP BY, compatible avec le
+    # classement de la recherche plein texte
+    return subjects.annotate(
+        applications_count=_count_by_subject(Application.objects.all()),
+        assigned_students_count=_count_by_subject(Assignment.objects.filter(status='active')),
+    )
+
+
+def get_subject_page(filters, level=None, page_number=None):
+    """
+    Page du catalogue pour des filtres et un niveau donnés, depuis le cache.
+
+    Returns:
+        dict: {'subjects': [Subject, ...], 'count', 'number', 'num_pages',
+               'has_previous', 'has_next', 'previous_page_number', 'next_page_number'}
+    """
+    values = [str(filters.get(field) or '').strip().lower() for field in FILTER_FIELDS]
+    values.append(level or '')
+    filters_key = hashlib.md5('|'.join(values).encode()).hexdigest()
+
+    try:
+        number = max(int(page_number), 1)
+    except (TypeError, ValueError):
+        number = 1
+
+    def compute():
+        paginator = Paginator(published_subjects(filters, level), SUBJECTS_PER_PAGE)
+        page = paginator.get_page(number)
+        return {
+            'subjects': list(page),
+            'count': paginator.count,
+            'number': page.number,
+            'num_pages': paginator.num_pages,
+            'has_previous': page.has_previous(),
+            'has_next': page.has_next(),
+            'previous_page_number': page.number - 1,
+            'next_page_number': page.number + 1,
+        }
+
+    return cached('subjects', f'{filters_key}:{number}', compute, SUBJECT_LIST_CACHE_TIMEOUT)
@@ -0,0 +1,131 @@
+"""
+Commande Django de (re)construction de l'index de recherche des sujets.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --benchmark 10000
+
+Avec --benchmark N, N sujets fictifs sont générés dans une transaction
+annulée afin de comparer la recherche plein texte à l'ancienne recherche
+par icontains.
+"""
+
+import random
+import statistics
+import time as _time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from subjects.models import Subject
+from subjects.search import build_search_document, rebuild_search_index, search_subjects
+
+VOCABULARY = (
+    'réseau réseaux données apprentissage automatique intelligence artificielle '
+    'système systèmes énergétique énergie solaire éolienne sécurité informatique '
+    'télécommunications mobile application web gestion plateforme conception '
+    'réalisation étude optimisation modélisation simulation capteurs embarqué '
+    'contrôle commande béton structure bâtiment hydraulique maintenance '
+    'industrielle qualité environnement procédé thermique mécanique robotique '
+    'véhicule électrique batterie stockage port logistique maritime analyse '
+    'prédiction détection images vision traitement signal cloud blockchain'
+).split()
+
+QUERIES = [
+    'réseaux', 'apprentissage automatique', 'energie solaire', 'Sécurité',
+    'gestion plateforme web', 'béton', 'robot', 'détection images',
+]
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche plein texte des sujets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--benchmark', type=int, metavar='N', help='Mesurer sur N sujets fictifs')
+        parser.add_argument('--repeat', type=int, default=20, help='Répétitions par requête (benchmark)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('   🔎 Index de recherche des sujets'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if not options['benchmark']:
+            count = rebuild_search_index()
+            self.stdout.write(self.style.SUCCESS(f'✅ {count} sujet(s) indexé(s)'))
+            return
+
+        with transaction.atomic():
+            self._generate(options['benchmark'])
+            self._benchmark(options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé (données annulées)'))
+
+    def _generate(self, count):
+        rng = random.Random(42)
+        supervisor = get_user_model().objects.create_user(
+            username='bench_search_teacher', email='bench_search@example.com',
+            password=None, role='teacher', filiere='GIT',
+        )
+
+        # Lexique de remplissage: les termes métier n'apparaissent que dans
+        # une partie des sujets, comme dans un vrai catalogue
+        syllables = ['ba', 'co', 'di', 'fé', 'lu', 'mo', 'na', 'pri', 'ra', 'sé', 'tu', 'vo']
+        filler = list({''.join(rng.sample(syllables, 3)) for _ in range(5000)})
+
+        def sentence(length):
+            return ' '.join(
+                rng.choice(VOCABULARY) if rng.random() < 0.1 else rng.choice(filler)
+                for _ in range(length)
+            )
+
+        subjects = [
+            Subject(
+                title=sentence(6).capitalize(),
+                description=sentence(120),
+                objectives=sentence(40),
+                keywords=', '.join(rng.sample(VOCABULARY, 4)),
+                level='M2',
+                filiere=rng.choice(['GIT', 'GESI', 'GC', 'GM']),
+                supervisor=supervisor,
+            )
+            for _ in range(count)
+        ]
+        for subject in subjects:
+            subject.search_document = build_search_document(subject)
+
+        started = _time.perf_counter()
+        Subject.objects.bulk_create(subjects, batch_size=500)
+        rebuild_search_index()
+        self.stdout.write(
+            f'\n📦 {count} sujets générés et indexés en {_time.perf_counter() - started:.1f} s'
+        )
+
+    def _benchmark(self, repeat):
+        published = Subject.objects.filter(status='published')
+
+        def legacy(query):
+            return list(published.filter(
+                Q(title__icontains=query) |
+                Q(description__icontains=query) |
+                Q(keywords__icontains=query)
+            ).values_list('pk', flat=True)[:20])
+
+        def current(query):
+            return list(search_subjects(published, query).values_list('pk', flat=True)[:20])
+
+        def timing(func, query):
+            samples = []
+            for _ in range(repeat):
+                started = _time.perf_counter()
+                func(query)
+                samples.append(_time.perf_counter() - started)
+            return statistics.median(samples) * 1000
+
+        self.stdout.write(f"\n{'Requête':<28} {'icontains':>12} {'plein texte':>12} {'résultats':>10}")
+        for query in QUERIES:
+            legacy_ms = timing(legacy, query)
+            current_ms = timing(current, query)
+            total = search_subjects(published, query).count()
+            self.stdout.write(f'{query:<28} {legacy_ms:9.1f} ms {current_ms:9.1f} ms {total:>10}')
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:17
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Copie figée de subjects/search.py au moment de cette migration: une
+# évolution de la normalisation ne doit pas modifier la migration.
+FTS_TABLE = 'subjects_subject_fts'
+
+STOP_WORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui
+    ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui
+    sa se ses son sur ta te tes toi ton tu un une vos votre vous c d j l m n s t
+    y est sont etre ete via entre sans sous vers
+""".split())
+
+SUFFIXES = (
+    'issement', 'etique', 'atrice', 'ateur', 'ation', 'ement', 'ance', 'ence',
+    'ique', 'isme', 'iste', 'able', 'euse', 'eur', 'ite', 'ive', 'ie', 'if',
+)
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+INDEXED_FIELDS = ('title', 'keywords', 'description', 'objectives')
+
+
+def _stem(word):
+    if len(word) > 3 and word[-1] in 'sx':
+        word = word[:-1]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    while len(word) > 3 and word[-1] == 'e':
+        word = word[:-1]
+    return word
+
+
+def build_search_document(subject):
+    text = ' '.join(getattr(subject, field) or '' for field in INDEXED_FIELDS)
+    decomposed = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    words = WORD_RE.findall(text.lower())
+    return ' '.join(_stem(word) for word in words if word not in STOP_WORDS and len(word) > 1)
+
+
+def create_search_index(apps, schema_editor):
+    """Crée l'index plein texte propre à la base et indexe les sujets existants."""
+    Subject = apps.get_model('subjects', 'Subject')
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE subjects_subject '
+            'ADD FULLTEXT INDEX subjects_subject_search_ft (search_document)'
+        )
+
+    subjects = list(Subject.objects.all())
+    for subject in subjects:
+        subject.search_document = build_search_document(subject)
+    Subject.objects.bulk_update(subjects, ['search_document'], batch_size=500)
+
+    if vendor == 'sqlite':
+        for subject in subjects:
+            schema_editor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+                [subject.pk, subject.search_document]
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    elif vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE subjects_subject DROP INDEX subjects_subject_search_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subjects', '0006_subject_allows_pair'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='document de recherche'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -147,6 +147,14 @@ class Subject(models.Model):
         help_text='Autres filières pouvant candidater (projets interdisciplinaires)'
     )
     
+    # Texte normalisé pour la recherche plein texte (voir subjects/search.py)
+    search_document = models.TextField(
+        _('document de recherche'),
+        blank=True,
+        default='',
+        editable=False
+    )
+    
     # Métadonnées
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -163,6 +171,20 @@ class Subject(models.Model):
     def __str__(self):
         return f"{self.title} - {self.get_level_display()}"
     
+    def save(self, *args, **kwargs):
+        """Met à jour le document de recherche et l'index plein texte."""
+        from .search import INDEXED_FIELDS, build_search_document, index_subject
+        
+        update_fields = kwargs.get('update_fields')
+        reindex = update_fields is None or bool(set(update_fields) & set(INDEXED_FIELDS))
+        if reindex:
+            self.search_document = build_search_document(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        super().save(*args, **kwargs)
+        if reindex:
+            index_subject(self)
+    
     def is_available(self):
         """Vérifie si le sujet est disponible pour candidature."""
         return self.status == 'published'
@@ -0,0 +1,164 @@
+# subjects/search.py
+# Recherche plein texte dans le catalogue des sujets
+#
+# Le texte indexable d'un sujet (titre, mots-clés, description, objectifs) est
+# normalisé en Python puis stocké dans Subject.search_document:
+# minuscules, accents supprimés, mots vides retirés et racinisation légère du
+# français ("réseaux" -> "reseau", "énergétiques" -> "energ"). La requête de
+# l'utilisateur subit la même normalisation, ce qui rend la recherche
+# insensible aux accents et aux variantes singulier/pluriel.
+#
+# Moteur selon la base:
+# - SQLite: table virtuelle FTS5 `subjects_subject_fts` (rowid = id du sujet),
+#   synchronisée à l'enregistrement et à la suppression d'un sujet;
+# - MySQL: index FULLTEXT sur search_document (toujours à jour);
+# - autres bases: LIKE sur search_document (sans classement).
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'subjects_subject_fts'
+
+# Mots vides ignorés à l'indexation et dans les requêtes
+STOP_WORDS = frozenset("""
+    a au aux avec ce ces dans de des du elle en et eux il je la le les leur lui
+    ma mais me meme mes moi mon ne nos notre nous on ou par pas pour qu que qui
+    sa se ses son sur ta te tes toi ton tu un une vos votre vous c d j l m n s t
+    y est sont etre ete via entre sans sous vers
+""".split())
+
+# Suffixes retirés par la racinisation (du plus long au plus court)
+SUFFIXES = (
+    'issement', 'etique', 'atrice', 'ateur', 'ation', 'ement', 'ance', 'ence',
+    'ique', 'isme', 'iste', 'able', 'euse', 'eur', 'ite', 'ive', 'ie', 'if',
+)
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def strip_accents(text):
+    """Supprime les accents: 'Réseaux énergétiques' -> 'Reseaux energetiques'."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem(word):
+    """Racinisation légère d'un mot français déjà sans accents."""
+    if len(word) > 3 and word[-1] in 'sx':
+        word = word[:-1]
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    while len(word) > 3 and word[-1] == 'e':
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Liste des racines indexables d'un texte."""
+    words = WORD_RE.findall(strip_accents(text or '').lower())
+    return [stem(word) for word in words if word not in STOP_WORDS and len(word) > 1]
+
+
+# Champs du sujet repris dans le document de recherche
+INDEXED_FIELDS = ('title', 'keywords', 'description', 'objectives')
+
+
+def build_search_document(subject):
+    """Texte normalisé indexé pour un sujet."""
+    parts = [getattr(subject, field) for field in INDEXED_FIELDS]
+    return ' '.join(tokenize(' '.join(part or '' for part in parts)))
+
+
+def _uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def index_subject(subject):
+    """Met à jour l'entrée FTS5 d'un sujet (SQLite uniquement)."""
+    if not _uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [subject.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+            [subject.pk, subject.search_document]
+        )
+
+
+def unindex_subject(subject_id):
+    """Retire un sujet de l'index FTS5 (SQLite uniquement)."""
+    if not _uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [subject_id])
+
+
+def rebuild_search_index():
+    """
+    Recalcule search_document pour tous les sujets et reconstruit l'index
+    FTS5 (après un import en masse par bulk_create, par exemple).
+
+    Returns:
+        int: nombre de sujets indexés
+    """
+    from .models import Subject
+
+    subjects = list(Subject.objects.only(*INDEXED_FIELDS))
+    for subject in subjects:
+        subject.search_document = build_search_document(subject)
+    Subject.objects.bulk_update(subjects, ['search_document'], batch_size=500)
+
+    if _uses_fts5():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+                [(subject.pk, subject.search_document) for subject in subjects]
+            )
+    return len(subjects)
+
+
+def search_subjects(queryset, query):
+    """
+    Filtre un QuerySet de sujets par une recherche plein texte.
+
+    Tous les mots de la requête doivent apparaître, chacun pouvant n'être
+    qu'un début de mot (saisie en cours). Le QuerySet retourné est annoté avec
+    `search_rank` (plus grand = plus pertinent) et trié par pertinence.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # Jointure sur la table FTS5: bm25() est calculé pendant la recherche
+        # (négatif, d'autant plus petit que le sujet est pertinent)
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = subjects_subject.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            select={'search_rank': f'-bm25({FTS_TABLE})'},
+        ).order_by('-search_rank', '-created_at')
+
+    if vendor == 'mysql':
+        against = ' '.join(f'+{term}*' for term in terms)
+        return queryset.annotate(
+            search_rank=RawSQL(
+                'MATCH (subjects_subject.search_document) AGAINST (%s IN BOOLEAN MODE)',
+                [against]
+            )
+        ).filter(search_rank__gt=0).order_by('-search_rank', '-created_at')
+
+    # Autres bases: recherche par préfixe de mot, sans classement
+    condition = Q()
+    for term in terms:
+        condition &= Q(search_document__startswith=term) | Q(search_document__contains=f' {term}')
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.db.models import Q, Count
 from django.utils import timezone
 from .models import Subject, Application, Assignment
+from .catalogue import get_subject_page
 from .forms import (
     SubjectCreateForm, SubjectUpdateForm, SubjectFilterForm,
     ApplicationForm, ApplicationReviewForm, AssignmentForm
@@ -14,43 +15,26 @@ from .forms import (
 
 @login_required
 def subject_list_view(request):
-    """Liste des sujets disponibles avec filtres."""
-    subjects = Subject.objects.filter(status='published').select_related('supervisor', 'co_supervisor')
-    
-    # Filtrage
+    """Liste des sujets disponibles avec filtres (pages mises en cache)."""
     filter_form = SubjectFilterForm(request.GET)
-    if filter_form.is_valid():
-        search = filter_form.cleaned_data.get('search')
-        level = filter_form.cleaned_data.get('level')
-        filiere = filter_form.cleaned_data.get('filiere')
-        type_ = filter_form.cleaned_data.get('type')
-        
-        if search:
-            subjects = subjects.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(keywords__icontains=search)
-            )
-        if level:
-            subjects = subjects.filter(level=level)
-        if filiere:
-            subjects = subjects.filter(filiere=filiere)
-        if type_:
-            subjects = subjects.filter(type=type_)
+    filters = filter_form.cleaned_data if filter_form.is_valid() else {}
     
     # Filtrer par niveau de l'étudiant si c'est un étudiant
-    if request.user.is_student():
-        if request.user.level:
-            subjects = subjects.filter(level=request.user.level)
-        # Si pas de niveau défini, montrer tous les sujets avec un message
+    # (si pas de niveau défini, montrer tous les sujets)
+    level = request.user.level if request.user.is_student() else None
+    
+    page = get_subject_page(filters, level, request.GET.get('page'))
     
-    # Annoter avec le nombre de candidatures
-    subjects = subjects.annotate(applications_count=Count('applications'))
+    # Paramètres de filtre à conserver dans les liens de pagination
+    query_params = request.GET.copy()
+    query_params.pop('page', None)
     
     context = {
-        'subjects': subjects,
+        'subjects': page['subjects'],
+        'page': page,
         'filter_form': filter_form,
-        'total_count': subjects.count()
+        'total_count': page['count'],
+        'query_string': query_params.urlencode(),
     }
     return render(request, 'subjects/subject_list.html', context)
 
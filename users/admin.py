@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User, Profile
+from .models import User, Profile, TeacherAvailability
 
 
 @admin.register(User)
@@ -74,3 +74,13 @@ class ProfileAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(TeacherAvailability)
+class TeacherAvailabilityAdmin(admin.ModelAdmin):
+    """Administration des disponibilités des enseignants."""
+    
+    list_display = ['teacher', 'date', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['teacher__username', 'teacher__last_name']
+    ordering = ['date']
@@ -0,0 +1,194 @@
+# users/availability.py
+# Disponibilités des enseignants, stockées en bitsets journaliers
+#
+# Une journée de 7h à 22h est découpée en 60 créneaux de 15 minutes: les
+# disponibilités d'un enseignant pour un jour tiennent dans un entier (bit i =
+# créneau i disponible). "Ces enseignants sont-ils tous libres ?" se résout par
+# un ET bit à bit de leurs masques, et la recherche de créneaux communs d'une
+# durée donnée par quelques décalages du masque commun, sans boucle par créneau.
+#
+# Un enseignant qui n'a rien déclaré pour un jour n'est pas contraint ce
+# jour-là (masque plein): les disponibilités restreignent, elles ne sont pas
+# obligatoires.
+
+from datetime import time, timedelta
+from functools import reduce
+
+from django.db.models import F
+from django.utils import timezone
+
+# Durée d'un créneau (minutes)
+SLOT_MINUTES = 15
+
+# Plage couverte par les bitsets: 7h - 22h
+DAY_START = 7 * 60
+DAY_END = 22 * 60
+SLOTS_PER_DAY = (DAY_END - DAY_START) // SLOT_MINUTES
+
+# Masque d'une journée entièrement disponible
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _slot_time(index):
+    minutes = DAY_START + index * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def window_mask(start_time, end_time):
+    """
+    Masque d'une plage déclarée: créneaux entièrement compris entre
+    start_time et end_time (bornés à la journée).
+    """
+    first = max(-(-(_minutes(start_time) - DAY_START) // SLOT_MINUTES), 0)
+    last = min((_minutes(end_time) - DAY_START) // SLOT_MINUTES, SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def span_mask(start_time, duration):
+    """
+    Masque des créneaux touchés par un événement (début, durée en minutes).
+
+    Returns:
+        int ou None si l'événement déborde de la plage 7h - 22h
+    """
+    start = _minutes(start_time) - DAY_START
+    first = start // SLOT_MINUTES
+    last = -(-(start + duration) // SLOT_MINUTES)
+    if first < 0 or last > SLOTS_PER_DAY:
+        return None
+    return ((1 << (last - first)) - 1) << first
+
+
+def mask_to_windows(mask):
+    """Plages continues d'un masque: [(début, fin), ...] en heures."""
+    windows = []
+    index = 0
+    while mask >> index:
+        if not (mask >> index) & 1:
+            index += 1
+            continue
+        first = index
+        while (mask >> index) & 1:
+            index += 1
+        windows.append((_slot_time(first), _slot_time(index)))
+    return windows
+
+
+def runs(mask, length):
+    """
+    Débuts des suites d'au moins `length` créneaux consécutifs d'un masque:
+    le bit i du résultat vaut 1 si les créneaux i à i + length - 1 sont libres.
+    """
+    result = mask
+    span = 1
+    # Doublement: après chaque étape, le bit i couvre `span` créneaux
+    while span < length:
+        shift = min(span, length - span)
+        result &= result >> shift
+        span += shift
+    return result
+
+
+class AvailabilityIndex:
+    """
+    Disponibilités en mémoire d'un ensemble d'enseignants sur une période.
+
+    masks[(teacher_id, date)] = bitset de la journée (jours déclarés seulement).
+    """
+
+    def __init__(self, masks=None):
+        self.masks = dict(masks or {})
+
+    @classmethod
+    def load(cls, teacher_ids, start_date, end_date):
+        """Charge les disponibilités déclarées de la période (une requête)."""
+        from .models import TeacherAvailability
+
+        rows = TeacherAvailability.objects.filter(
+            teacher_id__in=list(teacher_ids),
+            date__range=(start_date, end_date),
+        ).values_list('teacher_id', 'date', 'slots')
+        return cls({(teacher_id, day): slots for teacher_id, day, slots in rows})
+
+    def mask(self, teacher_id, day):
+        return self.masks.get((teacher_id, day), FULL_DAY)
+
+    def common_mask(self, teacher_ids, day):
+        """Créneaux où tous les enseignants sont disponibles (ET bit à bit)."""
+        return reduce(lambda common, pk: common & self.mask(pk, day), teacher_ids, FULL_DAY)
+
+    def unavailable(self, teacher_ids, day, start_time, duration):
+        """Enseignants qui ne sont pas disponibles sur tout le créneau."""
+        needed = span_mask(start_time, duration)
+        return [
+            pk for pk in teacher_ids
+            if (pk, day) in self.masks and (needed is None or self.masks[(pk, day)] & needed != needed)
+        ]
+
+    def all_free(self, teacher_ids, day, start_time, duration):
+        return not self.unavailable(teacher_ids, day, start_time, duration)
+
+    def common_slots(self, teacher_ids, start_date, end_date, duration, step=SLOT_MINUTES):
+        """
+        Créneaux de `duration` minutes où tous les enseignants sont disponibles.
+
+        Args:
+            step: pas des débuts de créneau (multiple de 15 minutes)
+
+        Returns:
+            list: [(date, heure de début), ...] triés
+        """
+        teacher_ids = list(teacher_ids)
+        length = -(-duration // SLOT_MINUTES)
+        stride = max(step // SLOT_MINUTES, 1)
+        aligned = sum(1 << index for index in range(0, SLOTS_PER_DAY, stride))
+
+        slots = []
+        day = start_date
+        while day <= end_date:
+            starts = runs(self.common_mask(teacher_ids, day), length) & aligned
+            while starts:
+                lowest = starts & -starts
+                slots.append((day, _slot_time(lowest.bit_length() - 1)))
+                starts ^= lowest
+            day += timedelta(days=1)
+        return slots
+
+
+def unavailable_teachers(teacher_ids, day, start_time, duration):
+    """
+    Enseignants (User) indisponibles sur un créneau, selon leurs déclarations.
+
+    Une requête, plus une pour charger les enseignants indisponibles s'il y en a.
+    """
+    from .models import User
+
+    teacher_ids = [pk for pk in set(teacher_ids) if pk]
+    if not teacher_ids:
+        return []
+    index = AvailabilityIndex.load(teacher_ids, day, day)
+    missing = index.unavailable(teacher_ids, day, start_time, duration)
+    if not missing:
+        return []
+    return list(User.objects.filter(pk__in=missing).order_by('last_name', 'first_name'))
+
+
+def declare_availability(teacher, day, start_time, end_time):
+    """Ajoute une plage aux disponibilités d'un jour (OU bit à bit en base)."""
+    from .models import TeacherAvailability
+
+    mask = window_mask(start_time, end_time)
+    availability, created = TeacherAvailability.objects.get_or_create(
+        teacher=teacher, date=day, defaults={'slots': mask}
+    )
+    if not created:
+        TeacherAvailability.objects.filter(pk=availability.pk).update(
+            slots=F('slots').bitor(mask), updated_at=timezone.now()
+        )
+    return mask
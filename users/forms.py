@@ -364,3 +364,68 @@ class ProfileUpdateForm(forms.ModelForm):
             'email_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
             'sms_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
+
+
+class AvailabilityForm(forms.Form):
+    """Formulaire de déclaration d'une plage de disponibilité (enseignant)."""
+    
+    date = forms.DateField(
+        label='<i class="far fa-calendar"></i> Date',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
+    )
+    
+    start_time = forms.TimeField(
+        label='<i class="far fa-clock"></i> De',
+        widget=forms.TimeInput(attrs={'class': 'form-control', 'type': 'time', 'step': 900})
+    )
+    
+    end_time = forms.TimeField(
+        label='<i class="far fa-clock"></i> À',
+        widget=forms.TimeInput(attrs={'class': 'form-control', 'type': 'time', 'step': 900})
+    )
+    
+    repeat_until = forms.DateField(
+        label='<i class="fas fa-repeat"></i> Répéter chaque semaine jusqu\'au',
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        help_text='Optionnel: même plage, même jour de la semaine'
+    )
+    
+    def clean(self):
+        from datetime import timedelta
+        from .availability import DAY_END, DAY_START, window_mask
+        
+        cleaned_data = super().clean()
+        day = cleaned_data.get('date')
+        start_time = cleaned_data.get('start_time')
+        end_time = cleaned_data.get('end_time')
+        repeat_until = cleaned_data.get('repeat_until')
+        
+        if start_time and end_time:
+            if end_time <= start_time:
+                raise forms.ValidationError("L'heure de fin doit être après l'heure de début.")
+            if not window_mask(start_time, end_time):
+                raise forms.ValidationError(
+                    f"La plage doit couvrir au moins 15 minutes entre "
+                    f"{DAY_START // 60}h et {DAY_END // 60}h."
+                )
+        
+        if day and repeat_until:
+            if repeat_until < day:
+                raise forms.ValidationError("La date de fin de répétition doit être après la date.")
+            if repeat_until > day + timedelta(days=180):
+                raise forms.ValidationError("La répétition est limitée à 6 mois.")
+        
+        return cleaned_data
+    
+    def dates(self):
+        """Jours concernés par la déclaration (répétition hebdomadaire incluse)."""
+        from datetime import timedelta
+        
+        day = self.cleaned_data['date']
+        last = self.cleaned_data.get('repeat_until') or day
+        dates = []
+        while day <= last:
+            dates.append(day)
+            day += timedelta(days=7)
+        return dates
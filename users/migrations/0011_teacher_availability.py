@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeacherAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('slots', models.BigIntegerField(default=0, verbose_name='créneaux disponibles')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availabilities', to=settings.AUTH_USER_MODEL, verbose_name='enseignant')),
+            ],
+            options={
+                'verbose_name': 'disponibilité',
+                'verbose_name_plural': 'disponibilités',
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'teacher'], name='users_teach_date_b77191_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='teacheravailability',
+            constraint=models.UniqueConstraint(fields=('teacher', 'date'), name='unique_teacher_availability_day'),
+        ),
+    ]
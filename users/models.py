@@ -220,6 +220,14 @@ class User(AbstractUser):
         verbose_name = _('utilisateur')
         verbose_name_plural = _('utilisateurs')
         ordering = ['-created_at']
+        indexes = [
+            # Pagination par curseur de la liste des utilisateurs
+            models.Index(fields=['-created_at', '-id'], name='users_user_created_id_idx'),
+            # Recherche par préfixe (le matricule et le username sont déjà uniques)
+            models.Index(fields=['last_name'], name='users_user_last_name_idx'),
+            models.Index(fields=['first_name'], name='users_user_first_name_idx'),
+            models.Index(fields=['email'], name='users_user_email_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.get_role_display()})"
@@ -349,3 +357,47 @@ class Profile(models.Model):
     
     def __str__(self):
         return f"Profil de {self.user.get_full_name()}"
+
+
+class TeacherAvailability(models.Model):
+    """
+    Disponibilités déclarées d'un enseignant pour une journée.
+    
+    La journée est découpée en créneaux de 15 minutes (de 7h à 22h); le bit i
+    de `slots` vaut 1 si l'enseignant est disponible sur le créneau i
+    (voir users.availability).
+    """
+    teacher = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='availabilities',
+        verbose_name=_('enseignant')
+    )
+    
+    date = models.DateField(_('date'))
+    
+    slots = models.BigIntegerField(
+        _('créneaux disponibles'),
+        default=0
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _('disponibilité')
+        verbose_name_plural = _('disponibilités')
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['teacher', 'date'], name='unique_teacher_availability_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'teacher']),
+        ]
+    
+    def __str__(self):
+        return f"Disponibilités de {self.teacher.get_full_name()} le {self.date.strftime('%d/%m/%Y')}"
+    
+    def windows(self):
+        """Plages de disponibilité de la journée: [(début, fin), ...]."""
+        from .availability import mask_to_windows
+        return mask_to_windows(self.slots)
@@ -0,0 +1,112 @@
+# users/statistics.py
+# Compteurs des tableaux de bord: une requête par rôle, mise en cache
+# (avec DatabaseCache, un succès coûte deux lectures: versions en un
+# get_many, puis la valeur)
+
+from django.db.models import IntegerField, Q, Subquery
+
+from config.cache import bump_version, cached
+
+# Durée de validité des compteurs en cache (secondes)
+DASHBOARD_CACHE_TIMEOUT = 300
+
+
+class SubqueryCount(Subquery):
+    """Nombre de lignes d'un QuerySet, calculé en sous-requête scalaire."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) _count)'
+    output_field = IntegerField()
+
+
+def count_in_one_query(anchor, **querysets):
+    """
+    Évalue plusieurs count() en une seule requête SQL.
+
+    Chaque QuerySet devient une sous-requête scalaire annotée sur une ligne
+    existante (`anchor`, en pratique l'utilisateur connecté).
+
+    Returns:
+        dict: {nom: nombre}
+    """
+    from .models import User
+
+    names = list(querysets)
+    return User.objects.filter(pk=anchor.pk).annotate(**{
+        name: SubqueryCount(queryset.order_by().values('pk'))
+        for name, queryset in querysets.items()
+    }).values(*names).get()
+
+
+def invalidate_dashboard_statistics():
+    """Invalide tous les compteurs en cache (appelé par les signaux)."""
+    bump_version('dashboard')
+
+
+def invalidate_user_dashboard_statistics(*user_ids):
+    """
+    Invalide les compteurs personnels (messages et notifications non lus)
+    de quelques utilisateurs, sans toucher à ceux des autres.
+    """
+    for user_id in {user_id for user_id in user_ids if user_id}:
+        bump_version(f'dashboard-user:{user_id}')
+
+
+def _cached(key, compute, user=None):
+    # Les compteurs personnels suivent aussi la version de l'utilisateur
+    depends_on = [f'dashboard-user:{user.pk}'] if user is not None else []
+    return cached('dashboard', key, compute, DASHBOARD_CACHE_TIMEOUT, depends_on=depends_on)
+
+
+def get_admin_statistics(user):
+    """Statistiques globales du tableau de bord administration."""
+    from subjects.models import Subject, Application, Assignment
+    from projects.models import Project
+    from defenses.models import Defense
+    from .models import User
+
+    return _cached('admin', lambda: count_in_one_query(
+        user,
+        total_users=User.objects.all(),
+        total_students=User.objects.filter(role='student'),
+        total_supervisors=User.objects.filter(role='teacher'),
+        total_subjects=Subject.objects.all(),
+        total_applications=Application.objects.all(),
+        pending_applications=Application.objects.filter(status='pending'),
+        total_assignments=Assignment.objects.all(),
+        total_projects=Project.objects.all(),
+        total_defenses=Defense.objects.all(),
+    ))
+
+
+def get_teacher_statistics(user):
+    """Compteurs du tableau de bord enseignant."""
+    from subjects.models import Subject, Application, StudentProposal
+    from projects.models import Project
+    from communications.models import Message
+
+    return _cached(f'teacher:{user.pk}', lambda: count_in_one_query(
+        user,
+        my_subjects_count=Subject.objects.filter(supervisor=user),
+        pending_applications_count=Application.objects.filter(
+            subject__supervisor=user, status='pending'
+        ),
+        supervised_projects_count=Project.objects.filter(assignment__subject__supervisor=user),
+        unread_messages=Message.objects.filter(recipient=user, is_read=False),
+        pending_proposals_count=StudentProposal.objects.filter(status='pending').filter(
+            Q(preferred_supervisor_1=user) |
+            Q(preferred_supervisor_2=user) |
+            Q(preferred_supervisor_3=user)
+        ),
+    ), user=user)
+
+
+def get_student_statistics(user):
+    """Compteurs du tableau de bord étudiant."""
+    from subjects.models import Subject, Application
+    from communications.models import Notification
+
+    return _cached(f'student:{user.pk}', lambda: count_in_one_query(
+        user,
+        available_subjects_count=Subject.objects.filter(status='available'),
+        applications_count=Application.objects.filter(student=user),
+        unread_notifications=Notification.objects.filter(user=user, is_read=False),
+    ), user=user)
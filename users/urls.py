@@ -11,6 +11,8 @@ urlpatterns = [
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('profile/', views.profile_view, name='profile'),
     path('profile/edit/', views.profile_edit_view, name='profile_edit'),
+    path('availability/', views.availability_view, name='availability'),
+    path('availability/<int:pk>/delete/', views.availability_delete_view, name='availability_delete'),
     
     # Changement de mot de passe (pour tous)
     path('change-password/', views.change_password_view, name='change_password'),
@@ -6,7 +6,7 @@ from django.contrib.auth.tokens import default_token_generator
 from django.contrib import messages
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.db.models import Count, Q
 from django.core.mail import send_mail, BadHeaderError, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode
@@ -14,6 +14,7 @@ from django.utils.encoding import force_bytes
 from django.http import HttpResponse
 from .forms import UserRegistrationForm, UserLoginForm, UserUpdateForm, ProfileUpdateForm
 from .models import User, Profile
+from config.pagination import keyset_paginate
 
 
 def register_view(request):
@@ -86,37 +87,28 @@ def dashboard_view(request):
     
     if user.is_student():
         # Tableau de bord étudiant - Ajouter les données nécessaires
-        from subjects.models import Subject, Application, Assignment
-        from projects.models import Project
-        from communications.models import Message, Notification
+        from subjects.models import Application, Assignment
+        from .statistics import get_student_statistics
         
         # Affectation de l'étudiant
         assignment = Assignment.objects.filter(student=user).first()
         
-        # Sujets disponibles
-        available_subjects = Subject.objects.filter(status='available')
-        
         # Candidatures de l'étudiant
         applications = Application.objects.filter(student=user)
         
-        # Notifications non lues
-        unread_notifications = Notification.objects.filter(user=user, is_read=False).count()
-        
+        context.update(get_student_statistics(user))
         context.update({
             'assignment': assignment,
-            'available_subjects_count': available_subjects.count(),
             'applications': applications,
-            'applications_count': applications.count(),
-            'unread_notifications': unread_notifications,
         })
         
         return render(request, 'users/dashboard_student.html', context)
         
     elif user.is_teacher():
         # Tableau de bord enseignant - Ajouter les données nécessaires
-        from subjects.models import Subject, Application, Assignment
+        from subjects.models import Subject, Application
         from projects.models import Project
-        from communications.models import Message, Notification
+        from .statistics import get_teacher_statistics
         
         # Sujets proposés par l'encadreur
         my_subjects = Subject.objects.filter(supervisor=user)
@@ -130,60 +122,21 @@ def dashboard_view(request):
         # Projets encadrés
         supervised_projects = Project.objects.filter(assignment__subject__supervisor=user)
         
-        # Messages non lus
-        unread_messages = Message.objects.filter(recipient=user, is_read=False).count()
-        
-        # Propositions reçues en attente
-        from subjects.models import StudentProposal
-        pending_proposals = StudentProposal.objects.filter(
-            status='pending'
-        ).filter(
-            Q(preferred_supervisor_1=user) |
-            Q(preferred_supervisor_2=user) |
-            Q(preferred_supervisor_3=user)
-        )
-        
+        # Compteurs (messages non lus, propositions reçues en attente...)
+        context.update(get_teacher_statistics(user))
         context.update({
             'my_subjects': my_subjects,
-            'my_subjects_count': my_subjects.count(),
             'pending_applications': pending_applications,
-            'pending_applications_count': pending_applications.count(),
             'supervised_projects': supervised_projects,
-            'supervised_projects_count': supervised_projects.count(),
-            'unread_messages': unread_messages,
-            'pending_proposals_count': pending_proposals.count(),
         })
         
         return render(request, 'users/dashboard_supervisor.html', context)
         
     elif user.is_admin_staff():
-        # Tableau de bord administration - Ajouter les statistiques globales
-        from subjects.models import Subject, Application, Assignment
-        from projects.models import Project
-        from defenses.models import Defense
+        # Tableau de bord administration - Statistiques globales (en cache)
+        from .statistics import get_admin_statistics
         
-        # Statistiques globales
-        total_users = User.objects.count()
-        total_students = User.objects.filter(role='student').count()
-        total_supervisors = User.objects.filter(role='supervisor').count()
-        total_subjects = Subject.objects.count()
-        total_applications = Application.objects.count()
-        pending_applications = Application.objects.filter(status='pending').count()
-        total_assignments = Assignment.objects.count()
-        total_projects = Project.objects.count()
-        total_defenses = Defense.objects.count()
-        
-        context.update({
-            'total_users': total_users,
-            'total_students': total_students,
-            'total_supervisors': total_supervisors,
-            'total_subjects': total_subjects,
-            'total_applications': total_applications,
-            'pending_applications': pending_applications,
-            'total_assignments': total_assignments,
-            'total_projects': total_projects,
-            'total_defenses': total_defenses,
-        })
+        context.update(get_admin_statistics(user))
         
         return render(request, 'users/dashboard_admin.html', context)
     elif user.is_jury_member():
@@ -232,6 +185,54 @@ def profile_edit_view(request):
     return render(request, 'users/profile_edit.html', context)
 
 
+@login_required
+def availability_view(request):
+    """Disponibilités déclarées par l'enseignant pour les soutenances et réunions."""
+    from django.utils import timezone
+    from .availability import declare_availability
+    from .forms import AvailabilityForm
+    from .models import TeacherAvailability
+    
+    if not request.user.is_teacher():
+        messages.error(request, "Seuls les enseignants déclarent leurs disponibilités.")
+        return redirect('users:dashboard')
+    
+    if request.method == 'POST':
+        form = AvailabilityForm(request.POST)
+        if form.is_valid():
+            dates = form.dates()
+            for day in dates:
+                declare_availability(
+                    request.user, day, form.cleaned_data['start_time'], form.cleaned_data['end_time']
+                )
+            messages.success(request, f"Disponibilités enregistrées pour {len(dates)} jour(s).")
+            return redirect('users:availability')
+    else:
+        form = AvailabilityForm()
+    
+    availabilities = TeacherAvailability.objects.filter(
+        teacher=request.user, date__gte=timezone.now().date()
+    ).order_by('date')
+    
+    context = {
+        'form': form,
+        'availabilities': availabilities,
+    }
+    return render(request, 'users/availability.html', context)
+
+
+@login_required
+def availability_delete_view(request, pk):
+    """Supprime les disponibilités déclarées d'une journée."""
+    from .models import TeacherAvailability
+    
+    availability = get_object_or_404(TeacherAvailability, pk=pk, teacher=request.user)
+    if request.method == 'POST':
+        availability.delete()
+        messages.success(request, f"Disponibilités du {availability.date.strftime('%d/%m/%Y')} supprimées.")
+    return redirect('users:availability')
+
+
 @login_required
 def user_list_view(request):
     """Liste moderne des utilisateurs avec filtres et recherche."""
@@ -245,51 +246,63 @@ def user_list_view(request):
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     
-    # Base queryset
-    users = User.objects.all().select_related('profile')
+    # Critères de filtre (réutilisés pour le nombre de résultats)
+    criteria = Q()
     
     # Filtrer par rôle
     if role_filter:
-        users = users.filter(role=role_filter)
+        criteria &= Q(role=role_filter)
     
     # Filtrer par filière (pour étudiants et enseignants)
     if filiere_filter:
-        users = users.filter(filiere=filiere_filter) | users.filter(filiere_admin=filiere_filter)
+        criteria &= Q(filiere=filiere_filter) | Q(filiere_admin=filiere_filter)
     
     # Filtrer par statut actif/inactif
     if status_filter == 'active':
-        users = users.filter(is_active=True)
+        criteria &= Q(is_active=True)
     elif status_filter == 'inactive':
-        users = users.filter(is_active=False)
-    
-    # Recherche par nom, email, username
-    if search_query:
-        from django.db.models import Q
-        users = users.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query) |
-            Q(username__icontains=search_query) |
-            Q(matricule__icontains=search_query)
+        criteria &= Q(is_active=False)
+    
+    # Recherche par préfixe (nom, prénom, email, username, matricule):
+    # chaque mot saisi doit commencer l'un des champs indexés
+    for term in search_query.split():
+        criteria &= (
+            Q(first_name__istartswith=term) |
+            Q(last_name__istartswith=term) |
+            Q(email__istartswith=term) |
+            Q(username__istartswith=term) |
+            Q(matricule__istartswith=term)
         )
     
-    # Statistiques
-    stats = {
-        'total': User.objects.count(),
-        'students': User.objects.filter(role='student').count(),
-        'teachers': User.objects.filter(role='teacher').count(),
-        'admin_filiere': User.objects.filter(role='admin_filiere').count(),
-        'admin_general': User.objects.filter(role='admin_general').count(),
-        'active': User.objects.filter(is_active=True).count(),
-        'inactive': User.objects.filter(is_active=False).count(),
-    }
+    # Statistiques et nombre de résultats en une seule requête
+    stats = User.objects.aggregate(
+        total=Count('pk'),
+        students=Count('pk', filter=Q(role='student')),
+        teachers=Count('pk', filter=Q(role='teacher')),
+        admin_filiere=Count('pk', filter=Q(role='admin_filiere')),
+        admin_general=Count('pk', filter=Q(role='admin_general')),
+        active=Count('pk', filter=Q(is_active=True)),
+        inactive=Count('pk', filter=Q(is_active=False)),
+        results=Count('pk', filter=criteria) if criteria else Count('pk'),
+    )
+    
+    # Page courante, par date de création (plus récent en premier)
+    page = keyset_paginate(
+        User.objects.filter(criteria).select_related('profile'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
     
-    # Ordre par date de création (plus récent en premier)
-    users = users.order_by('-created_at')
+    # Paramètres de filtre à conserver dans les liens de pagination
+    query_params = request.GET.copy()
+    query_params.pop('after', None)
+    query_params.pop('before', None)
     
     context = {
-        'users': users,
+        'users': page,
+        'page': page,
         'stats': stats,
+        'query_string': query_params.urlencode(),
         'role_filter': role_filter,
         'filiere_filter': filiere_filter,
         'search_query': search_query,